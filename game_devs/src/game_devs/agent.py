@@ -0,0 +1,25 @@
+"""
+GameDevs Agent
+
+`GameDevsAgent` is the crewAI `Agent` used for the crew's writing agents. Tasks
+that declare `map_reduce` in tasks.yaml are written section by section (see
+integration.py); every other task runs through crewAI's normal agent loop.
+"""
+
+from typing import Any, List, Optional
+
+from crewai import Agent, Task
+
+from game_devs.task import GameDevsTask
+
+
+class GameDevsAgent(Agent):
+    """crewAI Agent that writes map-reduce tasks section by section."""
+
+    def execute_task(self, task: Task, context: Optional[str] = None, tools: Optional[List[Any]] = None) -> str:
+        if isinstance(task, GameDevsTask) and task.writes_in_sections(self):
+            try:
+                return task.write_in_sections(self, context)
+            except Exception as e:
+                print(f"⚠️  {task.name}: section-by-section writing failed ({e}); writing it in one call")
+        return super().execute_task(task, context, tools)
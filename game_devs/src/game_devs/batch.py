@@ -0,0 +1,189 @@
+"""
+Batch GDD Generation for the GameDevs Crew
+
+Runs many `GameDevs().crew().kickoff` calls concurrently from a JSONL or YAML
+file of game specs, with a bounded worker pool, a separate output directory per
+job and a summary of durations and failures at the end. Each crew is built and
+run on a thread of the runner's own executor, sized to `concurrency`: the event
+loop's default executor has at most min(32, cpus + 4) threads.
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+
+from game_devs.crew import GameDevs
+from game_devs.scheduler import DependencyScheduler
+
+
+def load_specs(path: str) -> List[Dict[str, Any]]:
+    """Load game specs from a JSONL file (one object per line) or a YAML list."""
+    with open(path, 'r', encoding='utf-8') as file:
+        if path.endswith(".jsonl"):
+            specs = [json.loads(line) for line in file if line.strip()]
+        elif path.endswith((".yaml", ".yml")):
+            data = yaml.safe_load(file) or []
+            # Accept either a bare list or a mapping with a top-level `specs:` list
+            specs = data.get("specs", []) if isinstance(data, dict) else data
+        else:
+            raise ValueError(f"Unsupported spec file format: {path} (expected .jsonl, .yaml or .yml)")
+
+    for index, spec in enumerate(specs, start=1):
+        if not isinstance(spec, dict):
+            raise ValueError(f"Spec #{index} in {path} is not a mapping")
+
+    return specs
+
+
+def slugify(name: str) -> str:
+    """Filesystem-safe job directory name for a game title."""
+    slug = re.sub(r'[^a-zA-Z0-9]+', '_', name).strip('_').lower()
+    return slug or "game"
+
+
+@dataclass
+class BatchJobResult:
+    """Outcome of a single batch job."""
+
+    job_id: str
+    game: str
+    output_dir: str
+    status: str = "pending"
+    duration: float = 0.0
+    error: Optional[str] = None
+
+
+class BatchRunner:
+    """Runs one crew per spec with at most `concurrency` crews in flight."""
+
+    def __init__(
+        self,
+        specs: List[Dict[str, Any]],
+        concurrency: int = 4,
+        output_root: str = "outputs/batch",
+        parallel: bool = False,
+        crew_factory: Callable[[str], GameDevs] = GameDevs,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.specs = specs
+        self.concurrency = concurrency
+        self.output_root = output_root
+        self.parallel = parallel
+        self.crew_factory = crew_factory
+        self.results: List[BatchJobResult] = []
+        # Threads are started on demand, one per crew in flight
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch-job")
+
+    def run(self) -> List[BatchJobResult]:
+        """Blocking entry point."""
+        try:
+            return asyncio.run(self.run_async())
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Release the executor threads once no more jobs will run."""
+        self.executor.shutdown(wait=False)
+
+    async def run_async(self) -> List[BatchJobResult]:
+        """Run every spec and return the per-job results in input order."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        jobs = []
+
+        for index, inputs in enumerate(self.specs, start=1):
+            job_id = f"{index:03d}_{slugify(inputs['game'])}"
+            result = BatchJobResult(
+                job_id=job_id,
+                game=inputs['game'],
+                output_dir=os.path.join(self.output_root, job_id),
+            )
+            jobs.append(self.run_job(semaphore, result, inputs))
+
+        self.results = list(await asyncio.gather(*jobs))
+        self.write_summary()
+        return self.results
+
+    async def run_job(
+        self, semaphore: asyncio.Semaphore, result: BatchJobResult, inputs: Dict[str, Any]
+    ) -> BatchJobResult:
+        """Run one crew once the semaphore admits it, recording the outcome in `result`."""
+        async with semaphore:
+            print(f"▶️  [{result.job_id}] Starting {result.game}")
+            result.status = "running"
+            start_time = time.perf_counter()
+
+            try:
+                os.makedirs(result.output_dir, exist_ok=True)
+                await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self._kickoff, result.output_dir, inputs
+                )
+                result.status = "completed"
+            except Exception as e:
+                result.status = "failed"
+                result.error = str(e)
+                with open(os.path.join(result.output_dir, "error.log"), 'w', encoding='utf-8') as file:
+                    file.write(traceback.format_exc())
+
+            result.duration = time.perf_counter() - start_time
+            icon = "✅" if result.status == "completed" else "❌"
+            print(f"{icon} [{result.job_id}] {result.status} in {result.duration:.1f}s")
+            return result
+
+    def _kickoff(self, output_dir: str, inputs: Dict[str, Any]) -> None:
+        """Build and run one crew on an executor thread, off the event loop."""
+        crew_base = self.crew_factory(output_dir)
+        try:
+            crew = crew_base.crew()
+            if self.parallel:
+                # An event loop of its own, so the crew's task threads are not shared with other jobs
+                DependencyScheduler(crew).kickoff(inputs=inputs)
+            else:
+                crew.kickoff(inputs=inputs)
+        finally:
+            # Queue workers and the service run job after job; their metrics stay readable
+            crew_base.release()
+
+    def write_summary(self) -> str:
+        """Write batch_summary.json under the output root and return its path."""
+        os.makedirs(self.output_root, exist_ok=True)
+        summary_path = os.path.join(self.output_root, "batch_summary.json")
+        summary = {
+            "concurrency": self.concurrency,
+            "total_jobs": len(self.results),
+            "failed_jobs": sum(1 for result in self.results if result.status == "failed"),
+            "jobs": [asdict(result) for result in self.results],
+        }
+        with open(summary_path, 'w', encoding='utf-8') as file:
+            json.dump(summary, file, indent=2)
+        return summary_path
+
+    def summary_table(self) -> str:
+        """Format the per-job results as a console table."""
+        game_width = max([len(result.game) for result in self.results] + [4])
+        header = f"{'Job':<28} {'Game':<{game_width}} {'Status':<10} {'Duration':>10}"
+        lines = [header, "-" * len(header)]
+
+        for result in self.results:
+            lines.append(
+                f"{result.job_id:<28} {result.game:<{game_width}} {result.status:<10} {result.duration:>9.1f}s"
+            )
+            if result.error:
+                lines.append(f"  ↳ {result.error}")
+
+        completed = sum(1 for result in self.results if result.status == "completed")
+        total_time = sum(result.duration for result in self.results)
+        lines.append("-" * len(header))
+        lines.append(
+            f"{completed}/{len(self.results)} completed, "
+            f"{len(self.results) - completed} failed, {total_time:.1f}s of crew time"
+        )
+        return "\n".join(lines)
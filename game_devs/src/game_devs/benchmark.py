@@ -0,0 +1,382 @@
+"""
+Benchmarks for the GameDevs Crew
+
+`startup` measures how long the command line takes to become useful, each in
+a fresh interpreter so nothing is already imported:
+
+- import:          `import game_devs.main`
+- help:            `python -m game_devs.main --help`
+- crew_import:     `import game_devs.crew` (crewAI, litellm and the tools)
+- first_llm_call:  process start until the crew issues its first LLM request
+
+The first-LLM-call probe runs a normal unattended kickoff in a scratch
+directory and exits as soon as the first `LLMCallStartedEvent` fires, so no
+API key or network access is needed and no existing outputs are touched.
+
+`tools` measures the knowledge tools against synthetic knowledge bases of
+10 to 100k sections, generated in a scratch directory with a fixed seed:
+
+- design_guide_search:  DesignGuideSearchTool over a guide of N sections
+- template_reader:      GDDTemplateReaderTool section lookups (exact titles
+                        and title prefixes) in a template of N headers
+- template_validation:  TemplateValidationTool on a GDD written against that
+                        template, so the document grows with it
+- knowledge_directory:  KnowledgeDirectoryTool on a folder of N/10 files
+- knowledge_search:     KnowledgeSearchTool over the whole synthetic tree
+                        (hybrid keyword and semantic ranking)
+- semantic_search:      the knowledge store's cosine ranking alone
+
+Each tool gets one cold call (files just changed, so parsed forms and indexes
+are rebuilt; for the knowledge store, no persisted indexes either) and `repeats`
+warm calls. Latencies are in milliseconds; peak memory of a cold and a warm
+call is measured with tracemalloc in separate calls so tracing does not skew
+the timings.
+
+Results are appended to `outputs/benchmarks/<suite>.jsonl`, tagged with the
+git commit, and compared with the previous entry.
+"""
+
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+FIRST_CALL_MARKER = "GAMEDEVS_FIRST_LLM_CALL"
+
+STARTUP_COMMANDS: Dict[str, List[str]] = {
+    "import": ["-c", "import game_devs.main"],
+    "help": ["-m", "game_devs.main", "--help"],
+    "crew_import": ["-c", "import game_devs.crew"],
+    "first_llm_call": ["-c", "from game_devs.benchmark import probe_first_llm_call; probe_first_llm_call()"],
+}
+
+
+def probe_first_llm_call() -> None:
+    """Run an unattended kickoff and exit at the first LLM request (benchmark child process)."""
+    from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+    from crewai.utilities.events.llm_events import LLMCallStartedEvent
+
+    def on_first_call(source, event):
+        print(FIRST_CALL_MARKER, flush=True)
+        os._exit(0)
+
+    crewai_event_bus.register_handler(LLMCallStartedEvent, on_first_call)
+
+    from game_devs import main
+
+    sys.argv = ["game_devs", "--review-policy", "auto", "--no-cache"]
+    main.main()
+    # Reaching this point means the run finished without any LLM call
+    os._exit(1)
+
+
+def _time_command(args: List[str], cwd: str, marker: Optional[str] = None) -> float:
+    """Wall-clock seconds for a child interpreter to exit (or to print `marker`)."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1", ANTHROPIC_API_KEY=os.getenv('ANTHROPIC_API_KEY', 'benchmark'))
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, *args], cwd=cwd, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    if marker:
+        for line in process.stdout:
+            if marker in line:
+                elapsed = time.perf_counter() - start
+                process.kill()
+                process.wait()
+                return elapsed
+        process.wait()
+        raise RuntimeError(f"Benchmark child exited ({process.returncode}) before printing {marker}")
+
+    process.communicate()
+    elapsed = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(f"Benchmark command {' '.join(args)} failed with exit code {process.returncode}")
+    return elapsed
+
+
+def run_startup_benchmark(repeats: int = 5, names: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+    """Median/min/max seconds of each startup command over `repeats` cold runs."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="game_devs_bench_") as scratch:
+        for name in names or list(STARTUP_COMMANDS):
+            marker = FIRST_CALL_MARKER if name == "first_llm_call" else None
+            samples = [_time_command(STARTUP_COMMANDS[name], scratch, marker) for _ in range(repeats)]
+            results[name] = {
+                "median": statistics.median(samples),
+                "min": min(samples),
+                "max": max(samples),
+            }
+    return results
+
+
+# Measurements served by the shared knowledge store, whose cold call re-indexes everything
+STORE_MEASUREMENTS = ("knowledge_search", "semantic_search")
+
+TOOL_SIZES = (10, 100, 1_000, 10_000, 100_000)
+
+_DESIGN_WORDS = (
+    "player combat level quest inventory loot enemy boss crafting economy progression skill "
+    "reward narrative story character dialogue world map exploration puzzle platform physics "
+    "camera controls input tutorial difficulty balance multiplayer matchmaking session retention "
+    "monetization audio music art style animation lighting shader performance memory network "
+    "save checkpoint achievement feedback pacing tension mechanic system loop pillar hook"
+).split()
+_SYLLABLES = "ka lo mi ter vus dra nel qui sor fen bal tor ush rin gal pe zo cri mar thu".split()
+
+
+def _vocabulary(size: int, rng: random.Random) -> List[str]:
+    """Design words followed by synthetic terms, so the vocabulary grows with the corpus."""
+    words = list(_DESIGN_WORDS)
+    while len(words) < size:
+        words.append("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return words
+
+
+def _sentence(words: List[str], count: int, rng: random.Random) -> str:
+    # Skewed toward the front of the vocabulary, roughly like word frequencies in real text
+    return " ".join(words[int(len(words) * rng.random() ** 3)] for _ in range(count))
+
+
+def synthetic_guide(sections: int, rng: random.Random) -> str:
+    """Design guide with `sections` headers: chapters of ten topics each."""
+    words = _vocabulary(500 + 2 * sections, rng)
+    lines = ["# Synthetic Game Design Guide", ""]
+    for number in range(sections):
+        if number % 10 == 0:
+            lines += [f"## Chapter {number // 10 + 1}: {_sentence(words, 3, rng).title()}", ""]
+        else:
+            lines += [f"### Topic {number}: {_sentence(words, 3, rng).title()}", ""]
+        lines += [_sentence(words, rng.randint(12, 28), rng) + ".", ""]
+    return "\n".join(lines)
+
+
+def synthetic_template(sections: int, rng: random.Random) -> str:
+    """GDD template with `sections` headers: required (##) sections with ### subsections."""
+    words = _vocabulary(200 + sections, rng)
+    lines = ["# Synthetic GDD Template", ""]
+    for number in range(sections):
+        level = "##" if number % 4 == 0 else "###"
+        lines += [f"{level} Section {number} {_sentence(words, 2, rng).title()}", ""]
+        lines += [f"Describe the {_sentence(words, rng.randint(6, 14), rng)}.", ""]
+    return "\n".join(lines)
+
+
+def synthetic_gdd(template: str, words_per_section: int, rng: random.Random) -> str:
+    """GDD that follows every header of `template`, with generated text in each section."""
+    words = _vocabulary(500, rng)
+    lines = []
+    for line in template.split("\n"):
+        if line.startswith("#"):
+            lines += [line.replace("Template", "Document"), "", _sentence(words, words_per_section, rng) + ".", ""]
+    return "\n".join(lines)
+
+
+def write_knowledge_base(root: str, sections: int, seed: int = 0) -> str:
+    """Write a synthetic knowledge/ tree under `root`; returns the generated GDD."""
+    from game_devs.tools.knowledge import GUIDE_RELATIVE_PATH, TEMPLATE_RELATIVE_PATH
+
+    rng = random.Random(seed)
+    template = synthetic_template(sections, rng)
+    files = {
+        GUIDE_RELATIVE_PATH: synthetic_guide(sections, rng),
+        TEMPLATE_RELATIVE_PATH: template,
+    }
+    for path, content in files.items():
+        full_path = os.path.join(root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w', encoding='utf-8') as file:
+            file.write(content)
+
+    guides = os.path.join(root, "knowledge", "guides")
+    os.makedirs(guides, exist_ok=True)
+    for name in os.listdir(guides):
+        os.remove(os.path.join(guides, name))
+    words = _vocabulary(500, rng)
+    for number in range(max(1, sections // 10)):
+        with open(os.path.join(guides, f"guide_{number:05d}.md"), 'w', encoding='utf-8') as file:
+            file.write(f"# Guide {number}\n\n{_sentence(words, 30, rng)}.\n")
+    return synthetic_gdd(template, 40, rng)
+
+
+def _touch_knowledge(root: str) -> None:
+    """Bump the knowledge files' mtimes so the next call re-parses them (a cold call)."""
+    from game_devs.tools.knowledge import GUIDE_RELATIVE_PATH, TEMPLATE_RELATIVE_PATH
+
+    for path in (GUIDE_RELATIVE_PATH, TEMPLATE_RELATIVE_PATH):
+        full_path = os.path.join(root, path)
+        stat = os.stat(full_path)
+        os.utime(full_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def _peak_kb(call: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    try:
+        call()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def _reset_knowledge_store(root: str) -> None:
+    """Drop the shared knowledge store and its persisted indexes, so the next search indexes everything."""
+    from game_devs.tools.knowledge_store import DEFAULT_INDEX_PATH, reset_knowledge_stores
+
+    reset_knowledge_stores()
+    index_path = os.path.join(root, DEFAULT_INDEX_PATH)
+    if os.path.exists(index_path):
+        os.remove(index_path)
+    shutil.rmtree(os.path.join(os.path.dirname(index_path), "knowledge_vectors"), ignore_errors=True)
+
+
+def _measure_tool(root: str, calls: List[Callable[[], Any]], repeats: int,
+                  reset: Callable[[str], None] = _touch_knowledge) -> Dict[str, float]:
+    """Cold and warm latency (ms) and peak memory (KB) of a tool, cycling through `calls`."""
+    reset(root)
+    start = time.perf_counter()
+    calls[0]()
+    cold = (time.perf_counter() - start) * 1000
+
+    samples = []
+    for number in range(repeats):
+        call = calls[number % len(calls)]
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    reset(root)
+    cold_peak = _peak_kb(calls[0])
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "cold": cold,
+        "peak_kb": _peak_kb(calls[-1]),
+        "cold_peak_kb": cold_peak,
+    }
+
+
+def run_tool_benchmark(sizes: Optional[List[int]] = None, repeats: int = 20,
+                       seed: int = 0) -> Dict[str, Dict[str, float]]:
+    """Latency and memory of each knowledge tool for every knowledge base size."""
+    from game_devs.tools import knowledge
+    from game_devs.tools.knowledge_store import get_knowledge_store
+    from game_devs.tools.template_tools import (
+        DesignGuideSearchTool,
+        GDDTemplateReaderTool,
+        KnowledgeDirectoryTool,
+        KnowledgeSearchTool,
+        TemplateValidationTool,
+    )
+
+    search, reader = DesignGuideSearchTool(), GDDTemplateReaderTool()
+    validation, directory = TemplateValidationTool(), KnowledgeDirectoryTool()
+    knowledge_search = KnowledgeSearchTool()
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="game_devs_tools_bench_") as scratch:
+        # The tools resolve knowledge/ relative to the working directory
+        os.chdir(scratch)
+        knowledge._resolved_paths.clear()
+        try:
+            for size in sizes or TOOL_SIZES:
+                gdd = write_knowledge_base(scratch, size, seed)
+                rng = random.Random(seed)
+                template = knowledge.get_template_model()
+                titles = list(template.sections)
+                picks = [titles[int(len(titles) * rng.random())] for _ in range(8)]
+                words = _vocabulary(500 + 2 * size, random.Random(seed))
+                queries = [_sentence(words, 2, rng) for _ in range(7)] + [f'"{_sentence(words, 2, rng)}"']
+
+                label = f"@{size:,}"
+                measured = {
+                    "design_guide_search": [lambda query=query: search._run(query) for query in queries],
+                    "template_reader": [
+                        lambda title=title, exact=number % 2 == 0: reader._run(section=title if exact else title[:-3])
+                        for number, title in enumerate(picks)
+                    ],
+                    "template_validation": [lambda: validation._run(gdd)],
+                    "knowledge_directory": [lambda: directory._run("guides")],
+                    "knowledge_search": [lambda query=query: knowledge_search._run(query) for query in queries],
+                    "semantic_search": [
+                        lambda query=query: get_knowledge_store().search(query, mode="semantic") for query in queries
+                    ],
+                }
+                for name, calls in measured.items():
+                    print(f"  … {name}{label}", flush=True)
+                    reset = _reset_knowledge_store if name in STORE_MEASUREMENTS else _touch_knowledge
+                    results[f"{name}{label}"] = _measure_tool(scratch, calls, repeats, reset)
+        finally:
+            os.chdir(cwd)
+            knowledge._resolved_paths.clear()
+            _reset_knowledge_store(scratch)
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    """Short commit hash of the checkout the package runs from, if any."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def record_results(path: str, benchmark: str, results: Dict[str, Dict[str, float]], repeats: int) -> Optional[Dict]:
+    """Append a result entry to the history file; returns the previous entry for comparison."""
+    history = [entry for entry in load_history(path) if entry.get("benchmark") == benchmark]
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write(json.dumps({
+            "benchmark": benchmark,
+            "timestamp": datetime.now().isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "repeats": repeats,
+            "results": results,
+        }) + "\n")
+    return history[-1] if history else None
+
+
+def comparison_lines(results: Dict[str, Dict[str, float]], previous: Optional[Dict], unit: str = "s") -> List[str]:
+    """Table of medians with the change against the previous recorded run.
+
+    Results with memory measurements also show the cold call and peak memory.
+    """
+    memory = any("peak_kb" in stats for stats in results.values())
+    width = 10 - len(unit)
+    header = f"  {'Measurement':<28} {'Median':>10} {'Min':>10} {'Max':>10}"
+    if memory:
+        header += f" {'Cold':>10} {'Peak KB':>10} {'Cold KB':>10}"
+    lines = [header + f" {'vs last':>9}"]
+    previous_results = previous["results"] if previous else {}
+    for name, stats in results.items():
+        change = ""
+        before = previous_results.get(name, {}).get("median")
+        if before:
+            change = f"{(stats['median'] - before) / before * 100:+.0f}%"
+        line = f"  {name:<28} " + " ".join(f"{stats[key]:>{width}.3f}{unit}" for key in ("median", "min", "max"))
+        if memory:
+            line += f" {stats.get('cold', 0):>{width}.3f}{unit} {stats.get('peak_kb', 0):>10.0f} {stats.get('cold_peak_kb', 0):>10.0f}"
+        lines.append(f"{line} {change:>9}")
+    return lines
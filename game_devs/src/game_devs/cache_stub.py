@@ -0,0 +1,367 @@
+"""
+Local Anthropic API Stub for Prompt Caching
+
+A stand-in for the Anthropic Messages API (`POST /v1/messages`) that checks
+the `cache_control` breakpoints of every request the way the real API does
+and simulates its prompt cache:
+
+- at most 4 breakpoints per request, only on content blocks, only of type
+  `ephemeral` (with an optional `5m`/`1h` ttl), never on empty text blocks
+- invalid requests are rejected with the API's 400 `invalid_request_error`
+- the prefix up to each breakpoint is cached; a later request whose prefix
+  at a breakpoint, or at one of the 20 block boundaries before it, is cached
+  and at least the model's minimum length (1024 tokens, 2048 for Haiku)
+  reports it as `cache_read_input_tokens`, and the longest new prefix as
+  `cache_creation_input_tokens`
+
+With per-minute limits (`rpm`, `itpm`, `otpm`) it also enforces rate limits
+like the API: token buckets per model, refilled continuously, and a 429
+`rate_limit_error` with a `retry-after` header once a bucket runs dry. An
+`overload_rate` answers that share of requests with a 529 `overloaded_error`.
+
+Agents with the Knowledge Search tool are answered with two tool calls
+before a final answer, so multi-turn agent loops and their rolling breakpoint
+are exercised too. Point the crew at the stub with
+ANTHROPIC_API_BASE=http://127.0.0.1:<port>. `GET /stats` returns the counters.
+Token counts are estimated at four characters per token.
+"""
+
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+CACHE_TTL_SECONDS = {"5m": 300, "1h": 3600}
+MAX_BREAKPOINTS = 4
+# Block boundaries before a breakpoint that are also checked for cache hits
+LOOKBACK_BLOCKS = 20
+
+FINAL_ANSWER = (
+    "Thought: I now can give a great answer\n"
+    "Final Answer: ## Core Concept\n\nStub response from the local prompt cache stub.\n"
+)
+TOOL_QUERIES = ["core gameplay loop", "game design document structure"]
+
+
+def _tokens(value: Any) -> int:
+    return (len(json.dumps(value, sort_keys=True, ensure_ascii=False)) + 3) // 4
+
+
+def _blocks(content: Any) -> List[Any]:
+    if isinstance(content, str):
+        return [{"type": "text", "text": content}]
+    return list(content) if isinstance(content, list) else [content]
+
+
+def _text(content: Any) -> str:
+    return "".join(block.get("text", "") for block in _blocks(content) if isinstance(block, dict))
+
+
+class _Bucket:
+    """Per-minute budget refilled continuously, as the API's rate limiter does."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount: float) -> float:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    def take(self, amount: float) -> None:
+        self.wait_time(0)
+        self.level -= amount
+
+
+class PromptCacheStub:
+    """Validates cache breakpoints and simulates Anthropic's prompt cache and rate limits."""
+
+    def __init__(
+        self,
+        min_tokens: Optional[int] = None,
+        rpm: Optional[int] = None,
+        itpm: Optional[int] = None,
+        otpm: Optional[int] = None,
+        overload_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        # Overrides the per-model minimum cacheable prefix length
+        self.min_tokens = min_tokens
+        # Per-minute requests / input tokens / output tokens of each model (None: unlimited)
+        self.limits = {"requests": rpm, "input_tokens": itpm, "output_tokens": otpm}
+        self.overload_rate = overload_rate
+        self._rng = random.Random(seed)
+        self._buckets: Dict[Tuple[str, str], _Bucket] = {}
+        self._prefixes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0, "rejected": 0, "marked": 0, "hits": 0, "read_tokens": 0, "write_tokens": 0,
+            "rate_limited": 0, "overloaded": 0,
+        }
+        self.errors: List[str] = []
+
+    def minimum_for(self, model: str) -> int:
+        if self.min_tokens is not None:
+            return self.min_tokens
+        return 2048 if "haiku" in model else 1024
+
+    def validate(self, request: Dict[str, Any]) -> List[str]:
+        """Problems the real API would reject the request for."""
+        errors = []
+        if not isinstance(request.get("model"), str):
+            errors.append("model: Field required")
+        if not isinstance(request.get("max_tokens"), int):
+            errors.append("max_tokens: Field required")
+        if not isinstance(request.get("messages"), list) or not request["messages"]:
+            errors.append("messages: at least one message is required")
+            return errors
+
+        located: List[Tuple[str, Any]] = [(f"tools.{i}", tool) for i, tool in enumerate(request.get("tools") or [])]
+        system = request.get("system")
+        if system is not None:
+            located += [(f"system.{i}", block) for i, block in enumerate(_blocks(system))]
+        for i, message in enumerate(request["messages"]):
+            if message.get("role") not in ("user", "assistant"):
+                errors.append(f"messages.{i}.role: Input should be 'user' or 'assistant'")
+            if "cache_control" in message:
+                errors.append(f"messages.{i}.cache_control: Extra inputs are not permitted")
+            located += [(f"messages.{i}.content.{j}", block) for j, block in enumerate(_blocks(message.get("content")))]
+
+        breakpoints = 0
+        for where, block in located:
+            if not isinstance(block, dict) or "cache_control" not in block:
+                continue
+            breakpoints += 1
+            control = block["cache_control"]
+            if not isinstance(control, dict) or control.get("type") != "ephemeral":
+                errors.append(f"{where}.cache_control.type: Input should be 'ephemeral'")
+            elif set(control) - {"type", "ttl"} or control.get("ttl", "5m") not in CACHE_TTL_SECONDS:
+                errors.append(f"{where}.cache_control: only 'type' and a ttl of '5m' or '1h' are allowed")
+            if block.get("type") == "text" and not block.get("text"):
+                errors.append(f"{where}: cache_control cannot be set for empty text blocks")
+        if breakpoints > MAX_BREAKPOINTS:
+            errors.append(f"A maximum of {MAX_BREAKPOINTS} blocks with cache_control may be provided. Found {breakpoints}.")
+        return errors
+
+    def _prefixes_of(self, request: Dict[str, Any]) -> Tuple[List[Tuple[str, int]], List[Tuple[int, float]]]:
+        """(prefix hash, prefix tokens) at every block boundary and (block index, ttl) of each breakpoint."""
+        sequence: List[Any] = list(request.get("tools") or [])
+        if request.get("system") is not None:
+            sequence += _blocks(request["system"])
+        for message in request["messages"]:
+            sequence += [
+                {"role": message["role"], **block}
+                for block in _blocks(message.get("content")) if isinstance(block, dict)
+            ]
+
+        digest, tokens = hashlib.sha256(request["model"].encode('utf-8')), 0
+        prefixes, breakpoints = [], []
+        for index, block in enumerate(sequence):
+            content = {key: value for key, value in block.items() if key != "cache_control"}
+            digest.update(json.dumps(content, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+            tokens += _tokens(content)
+            prefixes.append((digest.hexdigest(), tokens))
+            if block.get("cache_control"):
+                breakpoints.append((index, CACHE_TTL_SECONDS[block["cache_control"].get("ttl", "5m")]))
+        return prefixes, breakpoints
+
+    def usage(self, request: Dict[str, Any], output_tokens: int) -> Dict[str, int]:
+        prefixes, breakpoints = self._prefixes_of(request)
+        total = prefixes[-1][1] if prefixes else 0
+        minimum = self.minimum_for(request["model"])
+        now = time.time()
+        read = write = 0
+        with self._lock:
+            for index, _ in breakpoints:
+                for prefix, tokens in prefixes[max(0, index - LOOKBACK_BLOCKS):index + 1]:
+                    if tokens >= minimum and self._prefixes.get(prefix, 0) > now:
+                        read = max(read, tokens)
+            cacheable = [(prefixes[index], ttl) for index, ttl in breakpoints if prefixes[index][1] >= minimum]
+            if cacheable and cacheable[-1][0][1] > read:
+                write = cacheable[-1][0][1] - read
+            for (prefix, _), ttl in cacheable:
+                self._prefixes[prefix] = now + ttl
+
+            self.stats["requests"] += 1
+            self.stats["marked"] += int(bool(breakpoints))
+            self.stats["hits"] += int(read > 0)
+            self.stats["read_tokens"] += read
+            self.stats["write_tokens"] += write
+        return {
+            "input_tokens": total - read - write,
+            "output_tokens": output_tokens,
+            "cache_creation_input_tokens": write,
+            "cache_read_input_tokens": read,
+        }
+
+    def _bucket(self, model: str, name: str) -> Optional[_Bucket]:
+        if self.limits[name] is None:
+            return None
+        if (model, name) not in self._buckets:
+            self._buckets[model, name] = _Bucket(self.limits[name])
+        return self._buckets[model, name]
+
+    def admit(self, request: Dict[str, Any]) -> Optional[Tuple[int, Dict[str, Any], Dict[str, str]]]:
+        """(status, error body, headers) of a 529 or 429 answer, or None when the request may proceed."""
+        with self._lock:
+            if self.overload_rate and self._rng.random() < self.overload_rate:
+                self.stats["overloaded"] += 1
+                return 529, {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}}, {}
+
+            model = request["model"]
+            needs = {
+                "requests": 1,
+                # Counted like the usage it reports: cache reads and writes included
+                "input_tokens": (self._prefixes_of(request)[0] or [("", 0)])[-1][1],
+                # Output is charged once the answer is known; a drained bucket refuses new requests
+                "output_tokens": 1,
+            }
+            waits = {
+                name: bucket.wait_time(amount) for name, amount in needs.items()
+                if (bucket := self._bucket(model, name)) is not None
+            }
+            exceeded = [name for name, wait in waits.items() if wait > 0]
+            if exceeded:
+                self.stats["rate_limited"] += 1
+                message = f"This request would exceed the rate limit for {model} ({', '.join(exceeded)} per minute)"
+                headers = {"retry-after": str(math.ceil(max(waits.values())))}
+                return 429, {"type": "error", "error": {"type": "rate_limit_error", "message": message}}, headers
+
+            for name in ("requests", "input_tokens"):
+                bucket = self._bucket(model, name)
+                if bucket is not None:
+                    bucket.take(needs[name])
+            return None
+
+    def charge_output(self, model: str, output_tokens: int) -> None:
+        with self._lock:
+            bucket = self._bucket(model, "output_tokens")
+            if bucket is not None:
+                bucket.take(output_tokens)
+
+    def reply(self, request: Dict[str, Any]) -> str:
+        """Two Knowledge Search calls for agents that have the tool, then a final answer."""
+        # Consecutive assistant turns may arrive merged into one message, so count the actions
+        turns = sum(
+            _text(message.get("content")).count("\nAction:") + _text(message.get("content")).startswith("Action:")
+            for message in request["messages"] if message.get("role") == "assistant"
+        )
+        if "Knowledge Search" in _text(request.get("system") or "") and turns < len(TOOL_QUERIES):
+            return (
+                "Thought: I should check the design guide first.\n"
+                "Action: Knowledge Search\n"
+                f"Action Input: {json.dumps({'query': TOOL_QUERIES[turns]})}"
+            )
+        return FINAL_ANSWER
+
+    def reject(self, errors: List[str]) -> Dict[str, Any]:
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["rejected"] += 1
+            self.errors.extend(errors)
+        return {"type": "error", "error": {"type": "invalid_request_error", "message": "; ".join(errors)}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    stub: PromptCacheStub
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        if self.path.rstrip('/') == "/stats":
+            self._send_json(200, {**self.stub.stats, "errors": self.stub.errors[-20:]})
+        else:
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+
+    def do_POST(self) -> None:
+        if not self.path.rstrip('/').endswith("/v1/messages"):
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            self._send_json(400, self.stub.reject(["request body is not valid JSON"]))
+            return
+
+        errors = self.stub.validate(request)
+        if errors:
+            print(f"❌ Rejected {request.get('model')}: {'; '.join(errors)}", flush=True)
+            self._send_json(400, self.stub.reject(errors))
+            return
+
+        refusal = self.stub.admit(request)
+        if refusal:
+            status, body, headers = refusal
+            print(f"🚦 {status} {request['model']}: {body['error']['message']}", flush=True)
+            self._send_json(status, body, headers)
+            return
+
+        text = self.stub.reply(request)
+        usage = self.stub.usage(request, output_tokens=(len(text) + 3) // 4)
+        self.stub.charge_output(request["model"], usage["output_tokens"])
+        print(f"✅ {request['model']}: read {usage['cache_read_input_tokens']}, "
+              f"wrote {usage['cache_creation_input_tokens']}, uncached {usage['input_tokens']}", flush=True)
+        message = {
+            "id": f"msg_stub_{uuid.uuid4().hex[:12]}",
+            "type": "message",
+            "role": "assistant",
+            "model": request["model"],
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": usage,
+        }
+        if request.get("stream"):
+            self._stream(message)
+        else:
+            self._send_json(200, message)
+
+    def _stream(self, message: Dict[str, Any]) -> None:
+        """Server-sent events in the order the Messages API emits them."""
+        text = message["content"][0]["text"]
+        start = dict(message, content=[], stop_reason=None, usage=dict(message["usage"], output_tokens=1))
+        events = [
+            ("message_start", {"type": "message_start", "message": start}),
+            ("content_block_start", {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}),
+            *[
+                ("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                         "delta": {"type": "text_delta", "text": text[i:i + 40]}})
+                for i in range(0, len(text), 40)
+            ],
+            ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+            ("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                               "usage": {"output_tokens": message["usage"]["output_tokens"]}}),
+            ("message_stop", {"type": "message_stop"}),
+        ]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for name, data in events:
+            self.wfile.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+
+def make_server(stub: PromptCacheStub, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """HTTP server answering with `stub`; port 0 picks a free port."""
+    handler = type("PromptCacheStubHandler", (_Handler,), {"stub": stub})
+    return ThreadingHTTPServer((host, port), handler)
@@ -0,0 +1,119 @@
+"""
+Task-Level Checkpoints for the GameDevs Crew
+
+Every task output is written to disk together with the rendered prompt and
+context it ran with, as soon as the task completes. A failed or unsatisfying
+run can then be resumed from any task, reusing the stored outputs of the tasks
+before it instead of paying for them again.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from crewai import Crew, Task
+from crewai.tasks.task_output import TaskOutput
+
+from game_devs.schemas import parse_output
+
+
+def _write_json_atomic(path: str, data: Dict[str, Any]) -> None:
+    """Write JSON through a temporary file so readers never see a partial checkpoint."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class CheckpointStore:
+    """Directory of per-task checkpoints plus a manifest describing the run."""
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, directory: str = "outputs/checkpoints"):
+        self.directory = directory
+
+    def _task_path(self, task_name: str) -> str:
+        return os.path.join(self.directory, f"{task_name}.json")
+
+    def start_run(self, inputs: Dict[str, Any], task_order: List[str], pending: List[str]) -> None:
+        """Record the run inputs and drop stale checkpoints of the tasks about to run."""
+        os.makedirs(self.directory, exist_ok=True)
+        for task_name in pending:
+            if os.path.exists(self._task_path(task_name)):
+                os.remove(self._task_path(task_name))
+
+        _write_json_atomic(os.path.join(self.directory, self.MANIFEST), {
+            "inputs": inputs,
+            "tasks": task_order,
+            "started_at": datetime.now().isoformat(),
+        })
+
+    def save(self, task: Task, output: TaskOutput, extra: Optional[Dict[str, Any]] = None) -> None:
+        """Checkpoint a completed task with its rendered prompt, context and output (plus `extra` fields)."""
+        os.makedirs(self.directory, exist_ok=True)
+        _write_json_atomic(self._task_path(task.name), {
+            **(extra or {}),
+            "task_name": task.name,
+            "agent": output.agent,
+            "description": task.description,
+            "expected_output": task.expected_output,
+            "context": task.prompt_context,
+            "output_file": task.output_file,
+            "raw": output.raw,
+            "completed_at": datetime.now().isoformat(),
+        })
+
+    def load_manifest(self) -> Dict[str, Any]:
+        """Load the manifest of the last run, raising if no run was checkpointed."""
+        path = os.path.join(self.directory, self.MANIFEST)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No checkpointed run found in {self.directory}")
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def load(self, task_name: str) -> Optional[Dict[str, Any]]:
+        """Load a task checkpoint, or None if the task has not completed."""
+        path = self._task_path(task_name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def completed_tasks(self) -> List[str]:
+        """Names of the checkpointed tasks in run order."""
+        manifest = self.load_manifest()
+        return [name for name in manifest["tasks"] if os.path.exists(self._task_path(name))]
+
+    def restore(self, crew: Crew, from_task: str) -> Dict[str, Any]:
+        """
+        Prepare a crew to resume at `from_task`.
+
+        Earlier tasks get their stored outputs attached (so downstream `context`
+        resolves to them) and are removed from the crew's task list. Returns the
+        inputs of the checkpointed run.
+        """
+        manifest = self.load_manifest()
+        task_names = [task.name for task in crew.tasks]
+        if from_task not in task_names:
+            raise ValueError(f"Unknown task '{from_task}'. Available tasks: {', '.join(task_names)}")
+
+        start_index = task_names.index(from_task)
+        for task in crew.tasks[:start_index]:
+            checkpoint = self.load(task.name)
+            if checkpoint is None:
+                raise ValueError(
+                    f"Cannot resume from '{from_task}': no checkpoint for earlier task '{task.name}'"
+                )
+            task.output = TaskOutput(
+                name=task.name,
+                description=checkpoint["description"],
+                expected_output=checkpoint["expected_output"],
+                raw=checkpoint["raw"],
+                pydantic=parse_output(task.output_pydantic, checkpoint["raw"]) if task.output_pydantic else None,
+                agent=checkpoint["agent"],
+            )
+
+        crew.tasks = crew.tasks[start_index:]
+        return manifest["inputs"]
@@ -0,0 +1,323 @@
+"""
+Context Compaction for the GameDevs Crew
+
+By default a task receives the full raw output of every task in its `context`.
+Each context edge can instead be compacted, configured per downstream task in
+tasks.yaml:
+
+    gdd_integration_task:
+      context_compaction:
+        default: full                       # edges not listed below
+        pitch_refinement_task:
+          mode: sections
+          exclude: [Summary of Changes]     # drop sections by header
+        gameplay_refinement_task:
+          mode: budget
+          max_tokens: 3000                  # most relevant sections that fit
+        technical_implementation_task:
+          mode: digest
+          max_tokens: 1200                  # LLM-written digest, cached
+
+Modes:
+- full:      the upstream output unchanged
+- sections:  only sections whose headers match `include` (and not `exclude`)
+- budget:    sections ranked by BM25 relevance to the downstream task's
+             description, added best-first until `max_tokens` is reached and
+             emitted in document order
+- digest:    a summary written by the fast model tier. Digests go through the
+             LLM response cache and are memoized per process, so unchanged
+             upstream outputs are digested once.
+
+Structured outputs (see schemas.py) arrive as compact JSON objects. For them
+`sections` keeps or drops top-level fields by name (`summary_of_changes`
+matches "Summary of Changes"), `budget` ranks fields instead of sections, and
+`digest` falls back to `budget`: the JSON is compact already.
+
+Token counts are estimated at four characters per token. Every compaction
+records the estimated tokens before and after, which the run metrics report
+as context savings. Set CONTEXT_COMPACTION=off to send full context everywhere.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from game_devs.options import MODEL_TIERS
+from game_devs.tools.search_index import SearchIndex
+from game_devs.validation import normalize_header
+
+COMPACTION_MODES = ("full", "sections", "budget", "digest")
+
+# Matches crewAI's divider between the outputs of context tasks
+CONTEXT_DIVIDER = "\n\n----------\n\n"
+
+DEFAULT_DIGEST_TOKENS = 1000
+
+DIGEST_PROMPT = (
+    "Condense the following output of the '{upstream}' stage of a game design pipeline into a "
+    "digest of at most {max_tokens} tokens for the writer of the next stage.\n"
+    "Keep every decision, name, number, mechanic and markdown section heading. Drop rationale, "
+    "repetition, pleasantries and change logs. Answer with the markdown digest only.\n\n"
+    "---\n\n{content}"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def compaction_enabled() -> bool:
+    return os.getenv('CONTEXT_COMPACTION', 'on').lower() != 'off'
+
+
+def compact_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def json_fields(content: str) -> Optional[Dict[str, Any]]:
+    """The fields of a structured output passed as a JSON object, or None for other text."""
+    stripped = content.strip()
+    if not (stripped.startswith('{') and stripped.endswith('}')):
+        return None
+    try:
+        data = json.loads(stripped)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _field_title(key: str) -> str:
+    return key.replace('_', ' ')
+
+
+@dataclass
+class EdgeCompaction:
+    """How one upstream output is passed to a downstream task."""
+
+    mode: str = "full"
+    include: List[str] = field(default_factory=list)
+    exclude: List[str] = field(default_factory=list)
+    max_tokens: Optional[int] = None
+
+    @classmethod
+    def parse(cls, value: Union[str, Dict[str, Any]], edge: str) -> "EdgeCompaction":
+        if isinstance(value, str):
+            value = {"mode": value}
+        if not isinstance(value, dict):
+            raise ValueError(f"Context compaction for '{edge}' must be a mode name or a mapping")
+
+        unknown = set(value) - {"mode", "include", "exclude", "max_tokens"}
+        if unknown:
+            raise ValueError(f"Unknown context compaction option(s) for '{edge}': {', '.join(sorted(unknown))}")
+
+        compaction = cls(
+            mode=value.get("mode", "full"),
+            include=list(value.get("include") or []),
+            exclude=list(value.get("exclude") or []),
+            max_tokens=value.get("max_tokens"),
+        )
+        if compaction.mode not in COMPACTION_MODES:
+            raise ValueError(
+                f"Unknown context compaction mode '{compaction.mode}' for '{edge}'. "
+                f"Choose from: {', '.join(COMPACTION_MODES)}"
+            )
+        if compaction.mode == "budget" and not compaction.max_tokens:
+            raise ValueError(f"Context compaction 'budget' for '{edge}' requires max_tokens")
+        if compaction.mode == "sections" and not (compaction.include or compaction.exclude):
+            raise ValueError(f"Context compaction 'sections' for '{edge}' requires include or exclude")
+        return compaction
+
+
+def parse_compaction(config: Optional[Dict[str, Any]]) -> Dict[str, EdgeCompaction]:
+    """Parse a task's `context_compaction` mapping (upstream task name or `default` -> settings)."""
+    return {edge: EdgeCompaction.parse(value, edge) for edge, value in (config or {}).items()}
+
+
+@dataclass
+class EdgeStats:
+    """Estimated tokens of one context edge before and after compaction."""
+
+    upstream: str
+    mode: str
+    tokens_full: int
+    tokens_sent: int
+    digest_prompt_tokens: int = 0
+    digest_completion_tokens: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _header_level(line: str) -> int:
+    return len(line) - len(line.lstrip('#'))
+
+
+def _split_sections(content: str) -> List[Tuple[int, str, str]]:
+    """(header level, header title, full text) chunks; level 0 is the text before the first header."""
+    chunks: List[Tuple[int, str, List[str]]] = [(0, "", [])]
+    for line in content.split('\n'):
+        stripped = line.strip()
+        if stripped.startswith('#'):
+            chunks.append((_header_level(stripped), stripped.lstrip('#').strip(), [line]))
+        else:
+            chunks[-1][2].append(line)
+    return [(level, title, "\n".join(lines)) for level, title, lines in chunks if level or "\n".join(lines).strip()]
+
+
+def _matches(title: str, names: List[str]) -> bool:
+    key = normalize_header(title)
+    return bool(key) and any(name and (name in key or key in name) for name in names)
+
+
+def select_sections(content: str, include: List[str], exclude: List[str]) -> str:
+    """Keep sections (with their subsections) whose header matches `include` and not `exclude`."""
+    include_keys = [normalize_header(name) for name in include]
+    exclude_keys = [normalize_header(name) for name in exclude]
+
+    fields = json_fields(content)
+    if fields is not None:
+        selected = {
+            key: value for key, value in fields.items()
+            if (not include_keys or _matches(_field_title(key), include_keys))
+            and not _matches(_field_title(key), exclude_keys)
+        }
+        return compact_json(selected) if selected else content
+
+    kept = []
+    # (level, included, excluded) of the headers enclosing the current section
+    ancestors: List[Tuple[int, bool, bool]] = []
+    for level, title, text in _split_sections(content):
+        while ancestors and ancestors[-1][0] >= level:
+            ancestors.pop()
+        included = any(entry[1] for entry in ancestors) or (level > 0 and _matches(title, include_keys))
+        excluded = any(entry[2] for entry in ancestors) or (level > 0 and _matches(title, exclude_keys))
+        if level:
+            ancestors.append((level, included, excluded))
+        if (included or not include_keys) and not excluded:
+            kept.append(text)
+
+    return "\n".join(kept).strip() or content
+
+
+def _chunks(content: str) -> List[Tuple[str, str]]:
+    """(title, text) of the markdown sections and JSON fields of one or more joined outputs."""
+    parts = [(part, json_fields(part)) for part in content.split(CONTEXT_DIVIDER)]
+    if all(fields is None for _, fields in parts):
+        return [(title, text) for _, title, text in _split_sections(content)]
+
+    chunks = []
+    for part, fields in parts:
+        if fields is None:
+            chunks.extend((title, text) for _, title, text in _split_sections(part))
+        else:
+            chunks.extend((_field_title(key), compact_json({key: value})) for key, value in fields.items())
+    return chunks
+
+
+def budget_sections(content: str, max_tokens: int, query: str) -> str:
+    """Most relevant sections (or JSON fields) to `query` that fit in `max_tokens`, in document order."""
+    if estimate_tokens(content) <= max_tokens:
+        return content
+
+    chunks = _chunks(content)
+    index = SearchIndex(chunks)
+    ranked = [doc_id for _, doc_id in index.search(query, top_k=len(chunks))]
+    order = ranked + [doc_id for doc_id in range(len(chunks)) if doc_id not in set(ranked)]
+
+    selected, used = set(), 0
+    for doc_id in order:
+        cost = estimate_tokens(chunks[doc_id][1])
+        if used + cost <= max_tokens:
+            selected.add(doc_id)
+            used += cost
+
+    if not selected:
+        # Not even the most relevant section fits: truncate it to the budget
+        return chunks[order[0]][1][: max_tokens * 4]
+
+    omitted = len(chunks) - len(selected)
+    fields = json_fields(content)
+    if fields is not None:
+        keys = list(fields)
+        kept = {keys[doc_id]: fields[keys[doc_id]] for doc_id in sorted(selected)}
+        if omitted:
+            kept["omitted"] = f"{omitted} less relevant field(s) omitted to fit the context budget"
+        return compact_json(kept)
+    parts = [chunks[doc_id][1] for doc_id in sorted(selected)]
+    if omitted:
+        parts.append(f"[{omitted} less relevant section(s) omitted to fit the context budget]")
+    return "\n".join(parts)
+
+
+class ContextDigester:
+    """Writes LLM digests of upstream outputs on the fast model tier, memoized per process."""
+
+    def __init__(self):
+        self._digests: Dict[str, str] = {}
+        self._llm = None
+        self._lock = threading.Lock()
+
+    def _get_llm(self):
+        with self._lock:
+            if self._llm is None:
+                from game_devs.llm import GameDevsLLM
+                from game_devs.llm_cache import get_response_cache
+
+                self._llm = GameDevsLLM(
+                    model=MODEL_TIERS["fast"],
+                    temperature=0.0,
+                    max_tokens=4000,
+                    response_cache=get_response_cache(),
+                )
+            return self._llm
+
+    def digest(self, content: str, upstream: str, max_tokens: int) -> Tuple[str, int, int]:
+        """Digest text plus the prompt/completion tokens it cost (zero when memoized or cached)."""
+        from crewai.agents.agent_builder.utilities.base_token_process import TokenProcess
+        from crewai.utilities.token_counter_callback import TokenCalcHandler
+
+        key = hashlib.sha256(f"{max_tokens}\0{upstream}\0{content}".encode('utf-8')).hexdigest()
+        cached = self._digests.get(key)
+        if cached is not None:
+            return cached, 0, 0
+
+        usage = TokenProcess()
+        prompt = DIGEST_PROMPT.format(upstream=upstream, max_tokens=max_tokens, content=content)
+        text = self._get_llm().call([{"role": "user", "content": prompt}], callbacks=[TokenCalcHandler(usage)])
+        self._digests[key] = str(text).strip()
+        return self._digests[key], usage.prompt_tokens, usage.completion_tokens
+
+
+digester = ContextDigester()
+
+
+def compact_output(content: str, upstream: str, edge: EdgeCompaction, query: str) -> Tuple[str, EdgeStats]:
+    """Compact one upstream output for a downstream task."""
+    stats = EdgeStats(upstream=upstream, mode=edge.mode, tokens_full=estimate_tokens(content), tokens_sent=0)
+    text = content
+
+    if edge.mode == "sections":
+        text = select_sections(content, edge.include, edge.exclude)
+    elif edge.mode == "budget":
+        text = budget_sections(content, edge.max_tokens, query)
+    elif edge.mode == "digest":
+        max_tokens = edge.max_tokens or DEFAULT_DIGEST_TOKENS
+        if json_fields(content) is not None:
+            stats.mode = "budget"
+            text = budget_sections(content, max_tokens, query)
+        elif estimate_tokens(content) > max_tokens:
+            try:
+                text, stats.digest_prompt_tokens, stats.digest_completion_tokens = digester.digest(
+                    content, upstream, max_tokens
+                )
+            except Exception as e:
+                print(f"⚠️  Digest of {upstream} failed ({e}); using the most relevant sections instead")
+                stats.mode = "budget"
+                text = budget_sections(content, max_tokens, query)
+
+    stats.tokens_sent = estimate_tokens(text)
+    return text, stats
@@ -1,18 +1,54 @@
 from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
+from crewai.project import CrewBase, agent, before_kickoff, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from crewai import LLM
-from typing import List
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.events.event_listener import event_listener
+from functools import cached_property, partial
+from typing import Any, Dict, List, Optional
 import os
 
+from game_devs.agent import GameDevsAgent
+from game_devs.checkpoints import CheckpointStore
+from game_devs.compaction import compaction_enabled
+from game_devs.design_memory import get_design_memory
+from game_devs.incremental import IncrementalPlanner, TaskPlan, incremental_enabled, plan_lines, upstream_tasks
+from game_devs.integration import map_reduce_enabled
+from game_devs.metrics import MetricsCollector
+from game_devs.rate_limit import critical_path_priorities
+from game_devs.routing import ModelRouter
+from game_devs.scheduler import build_task_graph
+from game_devs.schemas import GDD, MechanicsSpec, Pitch, StructuredConverter, TechPlan, structured_outputs_enabled
+from game_devs.streaming import StreamWriter
+from game_devs.task import GameDevsTask
+from game_devs.review import ReviewPolicy
+
+from game_devs.llm import GameDevsLLM
+from game_devs.llm_cache import get_response_cache
+
 # Import template tools for knowledge base integration
 from game_devs.tools.template_tools import (
     GDDTemplateReaderTool,
-    DesignGuideSearchTool,
     KnowledgeDirectoryTool,
+    KnowledgeSearchTool,
     TemplateValidationTool
 )
 
+
+def _forget_memoized(instance: Any) -> None:
+    """Drop `instance` from the caches of crewAI's @agent/@task/@crew methods, which never evict."""
+    for klass in type(instance).__mro__:
+        for attribute in list(vars(klass).values()):
+            code = getattr(attribute, "__code__", None)
+            if code is None or "cache" not in code.co_freevars:
+                continue
+            cache = attribute.__closure__[code.co_freevars.index("cache")].cell_contents
+            if not isinstance(cache, dict):
+                continue
+            # Keys are (args, kwargs) with the crew instance as first argument
+            for key in [key for key in list(cache) if key[0] and key[0][0] is instance]:
+                cache.pop(key, None)
+
+
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
 # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
@@ -31,10 +67,34 @@ class GameDevs():
     # Template tools integration for professional GDD generation
     # https://docs.crewai.com/concepts/agents#agent-tools
 
-    def __init__(self):
+    def __init__(self, output_root: str = "outputs"):
         super().__init__()
+        # Root directory for task output files and logs (per-job roots in batch mode)
+        self.output_root = output_root
+        # Shared on-disk LLM response cache (None when disabled with LLM_CACHE=off)
+        self.response_cache = get_response_cache()
+        # Token streaming to <output_file>.partial and the console (None unless LLM_STREAM=true)
+        self.stream_writer = StreamWriter.from_env()
+        self.stream = self.stream_writer is not None
+        # Per-task model tiers from tasks.yaml (disable with MODEL_ROUTING=off)
+        self.model_router = ModelRouter.from_env(self.response_cache)
+        # Per-task checkpoints so a run can be resumed with `replay --from <task>`
+        self.checkpoints = CheckpointStore(self._output_path("outputs/checkpoints"))
+        # Per-task tokens, latency, tool calls and cost, written to outputs/logs/metrics.json
+        self.metrics = MetricsCollector(self._output_path("outputs/logs/metrics.json"))
+        # Who answers the review checkpoints (human, auto, file or llm)
+        self.review_policy = ReviewPolicy.from_env()
+        # Approved material of earlier runs, shared across runs (None when DESIGN_MEMORY=off)
+        self.design_memory = get_design_memory()
+        self._inputs: Dict[str, Any] = {}
+        # Which tasks must run again and which reuse their checkpoints (INCREMENTAL=off runs all)
+        self.planner = IncrementalPlanner.from_directory(
+            self.checkpoints, os.path.join(os.path.dirname(os.path.abspath(__file__)), "config")
+        )
+        self._fingerprints: Dict[str, str] = {}
         # Initialize template tools for knowledge base access
-        self.design_guide_search = DesignGuideSearchTool()
+        # One search over every file in knowledge/, indexed incrementally and persisted
+        self.knowledge_search = KnowledgeSearchTool()
         self.template_reader = GDDTemplateReaderTool()
         self.knowledge_explorer = KnowledgeDirectoryTool()
         self.template_validator = TemplateValidationTool()
@@ -55,79 +115,102 @@ class GameDevs():
         for directory in output_dirs:
             os.makedirs(directory, exist_ok=True)
 
+    def _output_path(self, path: str) -> str:
+        """Relocate an `outputs/...` path from the YAML config under the configured output root."""
+        if path and self.output_root != "outputs" and path.startswith("outputs/"):
+            return os.path.join(self.output_root, path[len("outputs/"):])
+        return path
+
     # Claude LLM configurations optimized for different agent types
     # Using Haiku 3.5 as default for cost-effective testing
-    @property
+    # Each LLM is built on first use and shared by every agent and task of the crew
+    @cached_property
     def pitch_llm(self):
         """Creative pitch writing - higher temperature for creativity"""
-        return LLM(
+        return GameDevsLLM(
             model="claude-3-5-haiku-20241022",  # Haiku 3.5: Fast and cost-effective
             temperature=0.8,
-            max_tokens=4000
+            max_tokens=4000,
+            stream=self.stream,
+            response_cache=self.response_cache
         )
 
-    @property
+    @cached_property
     def design_llm(self):
         """Gameplay design - balanced creativity and structure"""
-        return LLM(
+        return GameDevsLLM(
             model="claude-3-5-haiku-20241022",  # Haiku 3.5: Fast and cost-effective
             temperature=0.7,
-            max_tokens=6000
+            max_tokens=6000,
+            stream=self.stream,
+            response_cache=self.response_cache
         )
 
-    @property
+    @cached_property
     def technical_llm(self):
         """Technical implementation - lower temperature for precision"""
-        return LLM(
+        return GameDevsLLM(
             model="claude-3-5-haiku-20241022",  # Haiku 3.5: Fast and cost-effective
             temperature=0.3,
-            max_tokens=6000
+            max_tokens=6000,
+            stream=self.stream,
+            response_cache=self.response_cache
         )
 
-    @property
+    @cached_property
     def editorial_llm(self):
         """Editorial and integration - balanced approach"""
-        return LLM(
+        return GameDevsLLM(
             model="claude-3-5-haiku-20241022",  # Haiku 3.5: Fast and cost-effective
             temperature=0.5,
-            max_tokens=8000
+            max_tokens=8000,
+            stream=self.stream,
+            response_cache=self.response_cache
         )
 
     # Production-ready LLM configurations using higher-tier models
-    @property
+    @cached_property
     def production_pitch_llm(self):
         """Production pitch writing with Sonnet 3.5 for better quality"""
-        return LLM(
+        return GameDevsLLM(
             model="claude-3-5-sonnet-20241022",  # Sonnet 3.5: High intelligence
             temperature=0.8,
-            max_tokens=4000
+            max_tokens=4000,
+            stream=self.stream,
+            response_cache=self.response_cache
         )
 
-    @property
+    @cached_property
     def production_design_llm(self):
         """Production gameplay design with Sonnet 3.5"""
-        return LLM(
+        return GameDevsLLM(
             model="claude-3-5-sonnet-20241022",  # Sonnet 3.5: High intelligence
             temperature=0.7,
-            max_tokens=6000
+            max_tokens=6000,
+            stream=self.stream,
+            response_cache=self.response_cache
         )
 
-    @property
+    @cached_property
     def production_technical_llm(self):
         """Production technical implementation with Sonnet 3.5"""
-        return LLM(
+        return GameDevsLLM(
             model="claude-3-5-sonnet-20241022",  # Sonnet 3.5: High intelligence
             temperature=0.3,
-            max_tokens=6000
+            max_tokens=6000,
+            stream=self.stream,
+            response_cache=self.response_cache
         )
 
-    @property
+    @cached_property
     def production_editorial_llm(self):
         """Production editorial with Sonnet 3.5"""
-        return LLM(
+        return GameDevsLLM(
             model="claude-3-5-sonnet-20241022",  # Sonnet 3.5: High intelligence
             temperature=0.5,
-            max_tokens=8000
+            max_tokens=8000,
+            stream=self.stream,
+            response_cache=self.response_cache
         )
 
     def get_model_config(self, use_production_models=False):
@@ -153,12 +236,12 @@ class GameDevs():
         use_production = os.getenv('USE_PRODUCTION_MODELS', 'false').lower() == 'true'
         models = self.get_model_config(use_production)
 
-        return Agent(
+        return GameDevsAgent(
             config=self.agents_config['pitch_writer'],
             verbose=True,
             llm=models['pitch'],
             allow_delegation=True,
-            tools=[self.template_reader, self.design_guide_search, self.knowledge_explorer]
+            tools=[self.template_reader, self.knowledge_search, self.knowledge_explorer]
         )
 
     @agent
@@ -166,12 +249,12 @@ class GameDevs():
         use_production = os.getenv('USE_PRODUCTION_MODELS', 'false').lower() == 'true'
         models = self.get_model_config(use_production)
 
-        return Agent(
+        return GameDevsAgent(
             config=self.agents_config['gameplay_designer'],
             verbose=True,
             llm=models['design'],
             allow_delegation=True,
-            tools=[self.template_reader, self.design_guide_search, self.knowledge_explorer]
+            tools=[self.template_reader, self.knowledge_search, self.knowledge_explorer]
         )
 
     @agent
@@ -179,12 +262,12 @@ class GameDevs():
         use_production = os.getenv('USE_PRODUCTION_MODELS', 'false').lower() == 'true'
         models = self.get_model_config(use_production)
 
-        return Agent(
+        return GameDevsAgent(
             config=self.agents_config['technical_architect'],
             verbose=True,
             llm=models['technical'],
             allow_delegation=True,
-            tools=[self.design_guide_search, self.knowledge_explorer]
+            tools=[self.knowledge_search, self.knowledge_explorer]
         )
 
     @agent
@@ -192,95 +275,245 @@ class GameDevs():
         use_production = os.getenv('USE_PRODUCTION_MODELS', 'false').lower() == 'true'
         models = self.get_model_config(use_production)
 
-        return Agent(
+        return GameDevsAgent(
             config=self.agents_config['chief_editor'],
             verbose=True,
             llm=models['editorial'],
             allow_delegation=True,
-            tools=[self.template_reader, self.design_guide_search, self.knowledge_explorer, self.template_validator]
+            tools=[self.template_reader, self.knowledge_search, self.knowledge_explorer, self.template_validator]
         )
 
+    def _structured(self, schema: type) -> Dict[str, Any]:
+        """Output schema of a design stage (see schemas.py), unless STRUCTURED_OUTPUTS=off."""
+        if not structured_outputs_enabled():
+            return {}
+        return {"output_pydantic": schema, "converter_cls": StructuredConverter}
+
     @task
     def pitch_concept_task(self) -> Task:
-        return Task(
+        return GameDevsTask(
             config=self.tasks_config['pitch_concept_task'],
-            agent=self.pitch_writer()
+            agent=self.pitch_writer(),
+            **self._structured(Pitch)
         )
 
     @task
     def pitch_review_task(self) -> Task:
-        return Task(
+        return self.review_policy.apply(GameDevsTask(
             config=self.tasks_config['pitch_review_task'],
             agent=self.chief_editor()
-        )
+        ), 'pitch_review_task')
 
     @task
     def pitch_refinement_task(self) -> Task:
-        return Task(
+        return GameDevsTask(
             config=self.tasks_config['pitch_refinement_task'],
-            agent=self.pitch_writer()
+            agent=self.pitch_writer(),
+            **self._structured(Pitch)
         )
 
     @task
     def gameplay_mechanics_task(self) -> Task:
-        return Task(
+        return GameDevsTask(
             config=self.tasks_config['gameplay_mechanics_task'],
-            agent=self.gameplay_designer()
+            agent=self.gameplay_designer(),
+            **self._structured(MechanicsSpec)
         )
 
     @task
     def gameplay_review_task(self) -> Task:
-        return Task(
+        return self.review_policy.apply(GameDevsTask(
             config=self.tasks_config['gameplay_review_task'],
             agent=self.chief_editor()
-        )
+        ), 'gameplay_review_task')
 
     @task
     def gameplay_refinement_task(self) -> Task:
-        return Task(
+        return GameDevsTask(
             config=self.tasks_config['gameplay_refinement_task'],
-            agent=self.gameplay_designer()
+            agent=self.gameplay_designer(),
+            **self._structured(MechanicsSpec)
         )
 
     @task
     def technical_implementation_task(self) -> Task:
-        return Task(
+        return GameDevsTask(
             config=self.tasks_config['technical_implementation_task'],
-            agent=self.technical_architect()
+            agent=self.technical_architect(),
+            **self._structured(TechPlan)
         )
 
     @task
     def gdd_integration_task(self) -> Task:
-        return Task(
+        return GameDevsTask(
             config=self.tasks_config['gdd_integration_task'],
-            agent=self.chief_editor()
+            agent=self.chief_editor(),
+            **self._structured(GDD)
         )
 
     @task
     def final_gdd_review_task(self) -> Task:
-        return Task(
+        return self.review_policy.apply(GameDevsTask(
             config=self.tasks_config['final_gdd_review_task'],
             agent=self.chief_editor()
-        )
+        ), 'final_gdd_review_task')
 
     @task
     def final_polish_task(self) -> Task:
-        return Task(
+        return GameDevsTask(
             config=self.tasks_config['final_polish_task'],
-            agent=self.chief_editor()
+            agent=self.chief_editor(),
+            **self._structured(GDD)
+        )
+
+    def plan_run(self, inputs: Dict[str, Any], tasks: Optional[List[Task]] = None) -> List[TaskPlan]:
+        """Fingerprint the tasks about to run and decide which of them may reuse their checkpoints."""
+        tasks = tasks if tasks is not None else self.crew().tasks
+        switches = {
+            "context_compaction": compaction_enabled(),
+            "map_reduce": map_reduce_enabled(),
+            "structured_outputs": structured_outputs_enabled(),
+        }
+        self._fingerprints = {
+            crew_task.name: self.planner.fingerprint(
+                crew_task, inputs, self.model_router.model_for(crew_task), switches
+            )
+            for crew_task in tasks
+        }
+        if incremental_enabled():
+            plans = self.planner.plan(tasks, inputs, self._fingerprints)
+        else:
+            plans = [TaskPlan(crew_task.name, "run", ["incremental runs off"]) for crew_task in tasks]
+
+        for crew_task, plan in zip(tasks, plans):
+            if isinstance(crew_task, GameDevsTask):
+                reusable = self.checkpoints.load(crew_task.name) if plan.action != "run" else None
+                crew_task.track_upstream(upstream_tasks(crew_task, tasks), reusable)
+        return plans
+
+    @before_kickoff
+    def start_checkpoint_run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Plan the run, record its inputs and clear stale checkpoints of the tasks that will run."""
+        tasks = self.crew().tasks
+        plans = self.plan_run(inputs, tasks)
+        if incremental_enabled():
+            for line in plan_lines(plans):
+                print(line)
+        self.checkpoints.start_run(
+            inputs,
+            task_order=[task.name for task in self.tasks],
+            pending=[plan.task for plan in plans if plan.action == "run"],
         )
+        return inputs
+
+    @before_kickoff
+    def start_metrics_run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Reset the task metrics and the model escalations at the start of each kickoff."""
+        self.metrics.start_run()
+        self.model_router.start_run(self.tasks)
+        return inputs
+
+    @before_kickoff
+    def recall_design_memory(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Give the tasks that recall from the design memory the best-matching material of earlier runs."""
+        self._inputs = dict(inputs or {})
+        if self.design_memory is None:
+            return inputs
+        for crew_task in self.tasks:
+            config = crew_task.memory_config if isinstance(crew_task, GameDevsTask) else None
+            if not config or not config.recall:
+                continue
+            recalled = self.design_memory.recall_text(
+                config.recall, self._inputs, config.limit, config.max_tokens,
+                query=f"{crew_task.description}\n{crew_task.expected_output}",
+            )
+            crew_task.set_recalled(recalled)
+            if recalled:
+                print(f"🧠 Design memory: recalled {', '.join(config.recall)} for {crew_task.name}")
+        return inputs
+
+    def _remember(self, task: Task, output: TaskOutput) -> None:
+        config = task.memory_config if isinstance(task, GameDevsTask) else None
+        if self.design_memory is None or not config or not config.store:
+            return
+        # Auto-approvals are boilerplate, not feedback worth recalling
+        if config.store.endswith("_review") and self.review_policy.mode == "auto":
+            return
+        self.design_memory.remember(config.store, self._inputs, output.raw, task.name)
+
+    def _checkpoint_task(self, task: Task, output: TaskOutput) -> None:
+        """Task callback persisting each output as soon as the task completes."""
+        self.checkpoints.save(task, output, {
+            "fingerprint": self._fingerprints.get(task.name),
+            "inputs": self.planner.inputs_of(task, self._inputs),
+            "upstream": task.upstream_digests() if isinstance(task, GameDevsTask) else {},
+        })
+        self._remember(task, output)
 
     @crew
     def crew(self) -> Crew:
         """Creates the GameDevs crew"""
+        for crew_task in self.tasks:
+            if crew_task.output_file:
+                crew_task.output_file = self._output_path(crew_task.output_file)
+                # Structured stages are saved as JSON; markdown is rendered for the final document only
+                if crew_task.output_pydantic and not getattr(crew_task, "render_markdown", False):
+                    crew_task.output_file = f"{os.path.splitext(crew_task.output_file)[0]}.json"
+            crew_task.callback = partial(self._checkpoint_task, crew_task)
+            self.model_router.route(crew_task, self.tasks_config[crew_task.name])
+        # Critical-path tasks go first when calls queue for the shared rate limits
+        priorities = critical_path_priorities(build_task_graph(self.tasks))
+        for crew_task in self.tasks:
+            if isinstance(crew_task, GameDevsTask):
+                crew_task.set_priority(priorities[crew_task.name])
+        self.metrics.track(self.tasks, {
+            name: config.get("agent", "") for name, config in self.planner.tasks_config.items()
+        })
+        if self.stream_writer:
+            self.stream_writer.track(self.tasks)
+
+        log_file = self._output_path("outputs/logs/crew_execution.log")
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+
         return Crew(
             agents=self.agents,
             tasks=self.tasks,
             process=Process.sequential,
             verbose=True,
-            memory=False,  # Disable memory to avoid OpenAI dependency
             planning=False,  # Disable planning to avoid OpenAI dependency
-            # Removed OpenAI embedder - CrewAI will work without embeddings
-            # or you can configure a local embedding model if needed
-            output_log_file="outputs/logs/crew_execution.log"
+            output_log_file=log_file,
+            **self._memory_config(),
         )
+
+    def release(self) -> None:
+        """Let a crew that will not run again be garbage collected (long-running services).
+
+        The process-wide registries of metrics, streaming and model routing, crewAI's
+        memoized @agent/@task/@crew methods and its event listener keep every crew
+        alive otherwise.
+        """
+        tasks = list(getattr(self, "tasks", []))
+        self.metrics.untrack(tasks)
+        self.model_router.untrack(tasks)
+        if self.stream_writer:
+            self.stream_writer.untrack(tasks)
+        _forget_memoized(self)
+        # crewAI's console listener keeps a (finished) span per task it has seen
+        for crew_task in tasks:
+            event_listener.execution_spans.pop(crew_task, None)
+
+    def _memory_config(self) -> Dict[str, Any]:
+        """crewAI memory with the local hashed embedder, when CREW_MEMORY=on.
+
+        Off by default: besides the embeddings, long-term memory asks the LLM to
+        evaluate every task output, which adds a call per task.
+        """
+        if os.getenv('CREW_MEMORY', 'off').lower() != 'on':
+            return {"memory": False}
+        from game_devs.tools.vector_index import local_embedding_function
+
+        print("🧠 Crew memory: on (local embeddings)")
+        return {
+            "memory": True,
+            "embedder": {"provider": "custom", "config": {"embedder": local_embedding_function()}},
+        }
@@ -0,0 +1,279 @@
+"""
+Design Memory for the GameDevs Crew
+
+Approved material from earlier runs, kept in a local SQLite database so a new
+run of a similar game does not start from scratch. Tasks opt in with the
+`design_memory` key of tasks.yaml:
+
+    pitch_refinement_task:
+      design_memory:
+        store: pitch                     # remember this task's output
+    pitch_concept_task:
+      design_memory:
+        recall: [pitch, pitch_review]    # show prior material before writing
+        max_tokens: 1500                 # per recalled entry
+
+Kinds: pitch and mechanics (the refined outputs, i.e. after review) and
+pitch_review, gameplay_review and final_review (the reviewers' feedback).
+
+Entries are keyed by the run's genre, platform and scope. Recall ranks the
+entries of a kind by how well those match (word overlap, genre weighted
+highest; entries of another genre are never recalled) and, among equals,
+newest first. Identical content is stored once. The database is bounded
+like the LLM response cache: least-recently-recalled entries are evicted
+once it grows past its size.
+
+Configured by DESIGN_MEMORY_PATH and DESIGN_MEMORY_MAX_MB; DESIGN_MEMORY=off
+disables it.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from game_devs.compaction import budget_sections, estimate_tokens
+
+MEMORY_KINDS = ("pitch", "pitch_review", "mechanics", "gameplay_review", "final_review")
+
+DEFAULT_MEMORY_PATH = "outputs/memory/design_memory.db"
+DEFAULT_MAX_MB = 64
+
+# How much each input field counts towards the similarity of two runs
+KEY_WEIGHTS = {"genre": 0.6, "platform": 0.25, "scope": 0.15}
+
+RECALL_HEADER = (
+    "Approved material from earlier {genre} projects (reuse what fits this game, "
+    "adapt names and details, and avoid issues the reviews raised):"
+)
+
+
+@dataclass
+class MemoryConfig:
+    """`design_memory` settings of a task in tasks.yaml."""
+
+    store: Optional[str] = None
+    recall: List[str] = field(default_factory=list)
+    limit: int = 1
+    max_tokens: int = 1500
+
+    @classmethod
+    def parse(cls, value: Optional[Dict[str, Any]]) -> Optional["MemoryConfig"]:
+        if value is None:
+            return None
+        if not isinstance(value, dict):
+            raise ValueError("design_memory must be a mapping of settings")
+        unknown = set(value) - {"store", "recall", "limit", "max_tokens"}
+        if unknown:
+            raise ValueError(f"Unknown design_memory option(s): {', '.join(sorted(unknown))}")
+        config = cls(**value)
+        if isinstance(config.recall, str):
+            config.recall = [config.recall]
+        for kind in ([config.store] if config.store else []) + config.recall:
+            if kind not in MEMORY_KINDS:
+                raise ValueError(f"Unknown design_memory kind '{kind}'. Choose from: {', '.join(MEMORY_KINDS)}")
+        if config.limit < 1 or config.max_tokens < 1:
+            raise ValueError("design_memory limit and max_tokens must be positive")
+        return config
+
+
+def _words(value: Any) -> Set[str]:
+    return set(re.findall(r"[a-z0-9]+", str(value or "").lower()))
+
+
+def similarity(inputs: Dict[str, Any], entry: Dict[str, Any]) -> float:
+    """Weighted word overlap (Jaccard) of genre, platform and scope; 0 when the genres share no word."""
+    total = 0.0
+    for name, weight in KEY_WEIGHTS.items():
+        ours, theirs = _words(inputs.get(name)), _words(entry.get(name))
+        overlap = len(ours & theirs) / len(ours | theirs) if ours and theirs else 0.0
+        if name == "genre" and overlap == 0:
+            return 0.0
+        total += weight * overlap
+    return total
+
+
+@dataclass
+class MemoryEntry:
+    """One remembered output."""
+
+    kind: str
+    game: str
+    genre: str
+    platform: str
+    scope: str
+    content: str
+    created_at: float
+    similarity: float = 0.0
+
+
+class DesignMemory:
+    """SQLite-backed, size-bounded store of approved pitches, mechanics and reviews."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_MEMORY_PATH,
+        max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+        max_entries: Optional[int] = None,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.stored = 0
+        self.recalled = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " digest TEXT PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " task TEXT,"
+            " game TEXT,"
+            " genre TEXT,"
+            " platform TEXT,"
+            " scope TEXT,"
+            " content TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_accessed REAL NOT NULL,"
+            " uses INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_kind ON entries (kind)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_accessed ON entries (last_accessed)")
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> "DesignMemory":
+        """Build a memory configured by DESIGN_MEMORY_PATH and DESIGN_MEMORY_MAX_MB."""
+        return cls(
+            path=os.getenv('DESIGN_MEMORY_PATH', DEFAULT_MEMORY_PATH),
+            max_bytes=int(float(os.getenv('DESIGN_MEMORY_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024),
+        )
+
+    def remember(self, kind: str, inputs: Dict[str, Any], content: str, task: str = "") -> bool:
+        """Store an approved output for the run's genre/platform/scope; False if it was already known."""
+        content = content.strip()
+        if not content:
+            return False
+        key = "\n".join([kind, *(str(inputs.get(name) or "") for name in KEY_WEIGHTS), content])
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        now = time.time()
+        with self._lock:
+            known = self._conn.execute("SELECT 1 FROM entries WHERE digest = ?", (digest,)).fetchone()
+            if known:
+                self._conn.execute("UPDATE entries SET last_accessed = ? WHERE digest = ?", (now, digest))
+            else:
+                self._conn.execute(
+                    "INSERT INTO entries (digest, kind, task, game, genre, platform, scope, content, size,"
+                    " created_at, last_accessed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (digest, kind, task, str(inputs.get("game") or ""), str(inputs.get("genre") or ""),
+                     str(inputs.get("platform") or ""), str(inputs.get("scope") or ""), content,
+                     len(content.encode('utf-8')), now, now),
+                )
+                self.stored += 1
+                self._evict()
+            self._conn.commit()
+        return not known
+
+    def recall(self, kind: str, inputs: Dict[str, Any], limit: int = 1) -> List[MemoryEntry]:
+        """The `limit` entries of a kind best matching the run's genre/platform/scope."""
+        with self._lock:
+            # Only the keys are scanned; content is read for the winners
+            rows = self._conn.execute(
+                "SELECT digest, genre, platform, scope, created_at FROM entries WHERE kind = ?", (kind,)
+            ).fetchall()
+            ranked = sorted(
+                (
+                    (similarity(inputs, {"genre": genre, "platform": platform, "scope": scope}), created_at, digest)
+                    for digest, genre, platform, scope, created_at in rows
+                ),
+                reverse=True,
+            )
+            entries = []
+            for score, _, digest in ranked[:limit]:
+                if score <= 0:
+                    break
+                game, genre, platform, scope, content, created_at = self._conn.execute(
+                    "SELECT game, genre, platform, scope, content, created_at FROM entries WHERE digest = ?",
+                    (digest,),
+                ).fetchone()
+                entries.append(MemoryEntry(kind, game, genre, platform, scope, content, created_at, score))
+                self._conn.execute(
+                    "UPDATE entries SET last_accessed = ?, uses = uses + 1 WHERE digest = ?", (time.time(), digest)
+                )
+            self._conn.commit()
+            self.recalled += len(entries)
+            return entries
+
+    def recall_text(self, kinds: List[str], inputs: Dict[str, Any], limit: int = 1,
+                    max_tokens: int = 1500, query: str = "") -> str:
+        """Recalled entries of each kind as one context block, each cut to its most relevant sections."""
+        parts = []
+        for kind in kinds:
+            for entry in self.recall(kind, inputs, limit):
+                content = entry.content
+                if estimate_tokens(content) > max_tokens:
+                    content = budget_sections(content, max_tokens, query)
+                label = kind.replace("_", " ").title()
+                parts.append(f"### {label}: {entry.game} ({entry.genre}, {entry.platform})\n\n{content}")
+        if not parts:
+            return ""
+        return RECALL_HEADER.format(genre=inputs.get("genre") or "similar") + "\n\n" + "\n\n".join(parts)
+
+    def _evict(self) -> None:
+        total_size, count = self._conn.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM entries").fetchone()
+        if total_size <= self.max_bytes and (self.max_entries is None or count <= self.max_entries):
+            return
+
+        rows = self._conn.execute("SELECT digest, size FROM entries ORDER BY last_accessed ASC").fetchall()
+        evicted = []
+        for digest, size in rows:
+            if total_size <= self.max_bytes and (self.max_entries is None or count <= self.max_entries):
+                break
+            evicted.append((digest,))
+            total_size -= size
+            count -= 1
+        self._conn.executemany("DELETE FROM entries WHERE digest = ?", evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        """Store/recall counters for this process plus on-disk usage."""
+        with self._lock:
+            total_size, count = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM entries"
+            ).fetchone()
+        return {
+            "stored": self.stored,
+            "recalled": self.recalled,
+            "entries": count,
+            "size_bytes": total_size,
+        }
+
+    def clear(self) -> None:
+        """Remove every remembered entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+
+_shared_memory: Optional[DesignMemory] = None
+_shared_memory_lock = threading.Lock()
+
+
+def get_design_memory() -> Optional[DesignMemory]:
+    """Process-wide design memory shared by every crew, or None when DESIGN_MEMORY=off."""
+    global _shared_memory
+    if os.getenv('DESIGN_MEMORY', 'on').lower() == 'off':
+        return None
+
+    with _shared_memory_lock:
+        if _shared_memory is None:
+            _shared_memory = DesignMemory.from_env()
+        return _shared_memory
@@ -0,0 +1,192 @@
+"""
+Incremental Regeneration for the GameDevs Crew
+
+Re-running a preset after changing one input (say `platform`) should not pay
+for all ten tasks again. Each task is fingerprinted from what its prompt is
+rendered from:
+
+- its tasks.yaml entry and its agent's agents.yaml entry
+- the values of the `{placeholders}` those entries reference, so changing an
+  input only touches the tasks that mention it
+- the model it runs on, the scripted review it answers with (unattended
+  review policies) and the compaction / map-reduce switches
+
+The fingerprint is stored in the task's checkpoint, together with a digest of
+each upstream output the task consumed. Before kickoff every task is planned:
+
+- reuse:  fingerprint unchanged and every upstream task is reused too
+- check:  fingerprint unchanged, but an upstream task will run; the stored
+          output is reused only if the upstream outputs come out identical
+          (e.g. served by the LLM response cache), otherwise the task runs
+- run:    no checkpoint, or the fingerprint changed
+
+Upstream tasks are the `context:` list of a task, or every earlier task for a
+task without one (as in a sequential crew). The plan is printed before any
+LLM call. Design memory recalls are not part of the fingerprint: new material
+is stored by every run, and it would otherwise invalidate every first draft.
+The knowledge directory is not part of it either.
+
+Set INCREMENTAL=off (or pass --full-run) to run every task.
+"""
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+import yaml
+from crewai import Task
+
+from game_devs.checkpoints import CheckpointStore
+
+PLAN_ACTIONS = ("reuse", "check", "run")
+
+# Bump when the fingerprint recipe changes, so old checkpoints are not trusted
+FINGERPRINT_VERSION = 1
+
+# The placeholders crewAI interpolates into task and agent configs
+PLACEHOLDER = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+def incremental_enabled() -> bool:
+    return os.getenv('INCREMENTAL', 'on').lower() != 'off'
+
+
+def output_digest(raw: str) -> str:
+    return hashlib.sha256((raw or "").encode('utf-8')).hexdigest()[:16]
+
+
+def referenced_inputs(*configs: Optional[Dict[str, Any]]) -> Set[str]:
+    """Names of the `{placeholders}` used anywhere in the given YAML configs."""
+    names: Set[str] = set()
+
+    def visit(value: Any) -> None:
+        if isinstance(value, str):
+            names.update(PLACEHOLDER.findall(value))
+        elif isinstance(value, dict):
+            for item in value.values():
+                visit(item)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                visit(item)
+
+    for config in configs:
+        visit(config)
+    return names
+
+
+def upstream_tasks(task: Task, tasks: List[Task]) -> List[Task]:
+    """The tasks whose outputs reach `task`: its context, or every earlier task without one."""
+    if isinstance(task.context, list):
+        return list(task.context)
+    position = next((number for number, other in enumerate(tasks) if other is task), len(tasks))
+    return tasks[:position]
+
+
+@dataclass
+class TaskPlan:
+    """What happens to one task in an incremental run."""
+
+    task: str
+    action: str
+    reasons: List[str] = field(default_factory=list)
+
+    def line(self) -> str:
+        icon = {"reuse": "♻️ ", "check": "🔎", "run": "▶️ "}[self.action]
+        reasons = f" ({'; '.join(self.reasons)})" if self.reasons else ""
+        return f"  {icon} {self.action:<6} {self.task}{reasons}"
+
+
+class IncrementalPlanner:
+    """Decides which tasks of a crew must run again, from their checkpoints."""
+
+    def __init__(self, checkpoints: CheckpointStore, tasks_config: Dict[str, Any], agents_config: Dict[str, Any]):
+        self.checkpoints = checkpoints
+        # The YAML as written: crewAI replaces agent names and context lists with objects
+        self.tasks_config = tasks_config
+        self.agents_config = agents_config
+
+    @classmethod
+    def from_directory(cls, checkpoints: CheckpointStore, config_dir: str) -> "IncrementalPlanner":
+        """Planner reading tasks.yaml and agents.yaml from `config_dir`."""
+        configs = []
+        for name in ("tasks.yaml", "agents.yaml"):
+            with open(os.path.join(config_dir, name), 'r', encoding='utf-8') as file:
+                configs.append(yaml.safe_load(file) or {})
+        return cls(checkpoints, *configs)
+
+    def _configs(self, task: Task) -> tuple:
+        task_config = self.tasks_config.get(task.name) or {}
+        return task_config, self.agents_config.get(task_config.get("agent")) or {}
+
+    def inputs_of(self, task: Task, inputs: Dict[str, Any]) -> Dict[str, str]:
+        """The input values a task's prompt is rendered from."""
+        names = referenced_inputs(*self._configs(task))
+        return {name: str(inputs.get(name, "")) for name in sorted(names)}
+
+    def fingerprint(self, task: Task, inputs: Dict[str, Any], model: str, switches: Dict[str, Any]) -> str:
+        task_config, agent_config = self._configs(task)
+        llm = getattr(task.agent, "llm", None)
+        recipe = {
+            "version": FINGERPRINT_VERSION,
+            "task": task_config,
+            "agent": agent_config,
+            "inputs": self.inputs_of(task, inputs),
+            "model": model,
+            "temperature": getattr(llm, "temperature", None),
+            # Unattended review policies answer with a fixed review (see review.py)
+            "review": getattr(llm, "review", None),
+            "switches": switches,
+        }
+        payload = json.dumps(recipe, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def plan(self, tasks: List[Task], inputs: Dict[str, Any], fingerprints: Dict[str, str]) -> List[TaskPlan]:
+        """Plan every task of the crew in order; `fingerprints` maps task names to their current fingerprint."""
+        plans: Dict[str, TaskPlan] = {}
+        checkpoints = {task.name: self.checkpoints.load(task.name) for task in tasks}
+        for task in tasks:
+            checkpoint = checkpoints[task.name]
+            if checkpoint is None or not checkpoint.get("fingerprint"):
+                plans[task.name] = TaskPlan(task.name, "run", ["no stored output"])
+                continue
+            if checkpoint["fingerprint"] != fingerprints[task.name]:
+                stored = checkpoint.get("inputs") or {}
+                changed = [
+                    f"{{{name}}} changed" for name, value in self.inputs_of(task, inputs).items()
+                    if name in stored and stored[name] != value
+                ]
+                plans[task.name] = TaskPlan(task.name, "run", changed or ["prompt, model or settings changed"])
+                continue
+
+            consumed = checkpoint.get("upstream") or {}
+            upstream = [other.name for other in upstream_tasks(task, tasks)]
+            if set(consumed) != set(upstream):
+                plans[task.name] = TaskPlan(task.name, "run", ["context tasks changed"])
+                continue
+            # Upstream tasks outside this crew (restored checkpoints) count as reused
+            pending = [name for name in upstream if name in plans and plans[name].action != "reuse"]
+            stale = [
+                name for name in upstream
+                if name not in pending and checkpoints.get(name)
+                and output_digest(checkpoints[name]["raw"]) != consumed[name]
+            ]
+            if stale:
+                plans[task.name] = TaskPlan(task.name, "run", [f"output of {', '.join(stale)} changed since"])
+            elif pending:
+                plans[task.name] = TaskPlan(
+                    task.name, "check", [f"reused unless the output of {', '.join(pending)} changes"]
+                )
+            else:
+                plans[task.name] = TaskPlan(task.name, "reuse")
+        return [plans[task.name] for task in tasks]
+
+
+def plan_lines(plans: List[TaskPlan]) -> List[str]:
+    counts = {action: sum(plan.action == action for plan in plans) for action in PLAN_ACTIONS}
+    return [
+        f"🗺️  Incremental plan: {counts['run']} to run, {counts['check']} to check, {counts['reuse']} to reuse",
+        *(plan.line() for plan in plans),
+    ]
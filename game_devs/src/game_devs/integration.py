@@ -0,0 +1,268 @@
+"""
+Map-Reduce GDD Integration
+
+A single call writing the whole GDD is the longest call of a run and the one
+most likely to hit its output token limit. Tasks that declare `map_reduce` in
+tasks.yaml are written section by section instead:
+
+    gdd_integration_task:
+      map_reduce:
+        context_tokens: 2500   # most relevant upstream context per section
+        workers: 6             # sections drafted concurrently
+        stitch_tier: fast      # model tier of the stitching pass
+
+1. Map: every level-2 section of template.mdx is drafted concurrently by the
+   task's agent model (after model routing), with only the upstream context
+   most relevant to that section. Template sections without a body of their
+   own (e.g. "Game Mechanics") are drafted together with the section after it.
+2. Reduce: the drafts are joined in template order and a stitching pass on
+   the cheap tier returns the title, an executive summary and find/replace
+   fixes for inconsistent names or numbers. Only those edits are generated,
+   so the pass costs a small fraction of rewriting the document. Fixes
+   replace whole words only, and a short or common `find` is skipped.
+
+Section drafts go through the LLM response cache like every other call; they
+are not streamed. Set MAP_REDUCE=off (or pass --no-map-reduce) to write the
+document in a single call.
+"""
+
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from game_devs.compaction import budget_sections
+from game_devs.options import MODEL_TIERS
+from game_devs.tools.knowledge import get_template_model
+
+SECTION_PROMPT = (
+    "You are writing one part of the Game Design Document described in this assignment:\n\n"
+    "{assignment}\n\n"
+    "Write ONLY the following part of the document, following its template structure:\n\n"
+    "{template}\n\n"
+    "Start with the heading(s) shown above, keep their exact wording and level, and fill every "
+    "subsection with concrete, game-specific content. Sections marked (Optional) may be brief. "
+    "Do not add an introduction, conclusion or any other section.\n\n"
+    "Material from earlier stages of the design process:\n\n{context}"
+)
+
+STITCH_PROMPT = (
+    "The Game Design Document below was written section by section by different writers.\n"
+    "Answer with a JSON object only, with these keys:\n"
+    '- "title": the document title (game name followed by "Game Design Document")\n'
+    '- "executive_summary": a 1-2 paragraph executive summary of the whole document\n'
+    '- "replacements": a list of {{"find": ..., "replace": ...}} edits that fix inconsistent '
+    "names, numbers or terminology between sections; each \"find\" must be text copied exactly "
+    "from the document, long enough to match only the text to fix (a phrase, not a lone word or "
+    "number). Use an empty list when the sections are consistent.\n\n"
+    "---\n\n{document}"
+)
+
+_FENCE = re.compile(r"^```[a-zA-Z]*\n(.*)\n```$", re.DOTALL)
+
+# Stitching fixes are applied to whole words only, and only when they are specific:
+# a short or common "find" would rewrite unrelated text across every section
+MIN_REPLACEMENT_LENGTH = 4
+MAX_REPLACEMENT_MATCHES = 8
+
+
+def map_reduce_enabled() -> bool:
+    return os.getenv('MAP_REDUCE', 'on').lower() != 'off'
+
+
+@dataclass
+class MapReduceConfig:
+    """`map_reduce` settings of a task in tasks.yaml."""
+
+    context_tokens: int = 2500
+    workers: int = 6
+    stitch_tier: str = "fast"
+
+    @classmethod
+    def parse(cls, value: Optional[Dict[str, Any]]) -> Optional["MapReduceConfig"]:
+        if value is None:
+            return None
+        if not isinstance(value, dict):
+            raise ValueError("map_reduce must be a mapping of settings")
+        unknown = set(value) - {"context_tokens", "workers", "stitch_tier"}
+        if unknown:
+            raise ValueError(f"Unknown map_reduce option(s): {', '.join(sorted(unknown))}")
+        config = cls(**value)
+        if config.stitch_tier not in MODEL_TIERS:
+            raise ValueError(f"Unknown stitch_tier '{config.stitch_tier}'. Choose from: {', '.join(MODEL_TIERS)}")
+        if config.workers < 1 or config.context_tokens < 1:
+            raise ValueError("map_reduce workers and context_tokens must be positive")
+        return config
+
+
+@dataclass
+class StepStats:
+    """One LLM call of a map-reduce integration."""
+
+    step: str
+    model: str
+    duration: float
+    prompt_tokens: int
+    completion_tokens: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def apply_replacements(body: str, replacements: List[Dict[str, Any]]) -> Tuple[str, int, List[str]]:
+    """Apply the stitching pass's find/replace fixes; returns the body, the number applied and the skipped ones."""
+    applied, skipped = 0, []
+    for replacement in replacements:
+        find, replace = replacement.get("find"), replacement.get("replace")
+        if not find or replace is None:
+            continue
+        find = str(find)
+        # Word boundaries where the text starts or ends with a word character
+        start = r"\b" if re.match(r"\w", find) else ""
+        end = r"\b" if re.search(r"\w$", find) else ""
+        pattern = re.compile(start + re.escape(find) + end)
+        matches = len(pattern.findall(body))
+        if len(find.strip()) < MIN_REPLACEMENT_LENGTH:
+            skipped.append(f"{find!r}: shorter than {MIN_REPLACEMENT_LENGTH} characters")
+        elif matches == 0:
+            skipped.append(f"{find!r}: not found as a whole word")
+        elif matches > MAX_REPLACEMENT_MATCHES:
+            skipped.append(f"{find!r}: {matches} matches, more than {MAX_REPLACEMENT_MATCHES}")
+        else:
+            body = pattern.sub(lambda _: str(replace), body)
+            applied += 1
+    return body, applied, skipped
+
+
+def section_units() -> List[Tuple[str, str]]:
+    """(name, template text) of each drafting unit, in template order."""
+    template = get_template_model()
+    units, pending = [], []
+    for name in template.section_names:
+        text = template.extract(name) or f"## {name}"
+        pending.append((name, text))
+        body = text.split('\n', 1)[1].strip() if '\n' in text else ""
+        if body:
+            # Header-only sections introduce the section that follows them
+            units.append((" / ".join(n for n, _ in pending), "\n\n".join(t for _, t in pending)))
+            pending = []
+    if pending:
+        units.append((" / ".join(n for n, _ in pending), "\n\n".join(t for _, t in pending)))
+    return units
+
+
+def _strip_fences(text: str) -> str:
+    text = str(text).strip()
+    match = _FENCE.match(text)
+    return match.group(1).strip() if match else text
+
+
+def _call(llm: Any, step: str, prompt: str, system: Optional[str] = None) -> Tuple[str, StepStats]:
+    from crewai.agents.agent_builder.utilities.base_token_process import TokenProcess
+    from crewai.utilities.token_counter_callback import TokenCalcHandler
+
+    messages = [{"role": "user", "content": prompt}]
+    if system:
+        messages.insert(0, {"role": "system", "content": system})
+    usage = TokenProcess()
+    start = time.perf_counter()
+    text = llm.call(messages, callbacks=[TokenCalcHandler(usage)])
+    return _strip_fences(text), StepStats(
+        step=step,
+        model=llm.model,
+        duration=time.perf_counter() - start,
+        prompt_tokens=usage.prompt_tokens,
+        completion_tokens=usage.completion_tokens,
+    )
+
+
+class SectionIntegrator:
+    """Drafts a document section by section with one model and stitches it with another."""
+
+    def __init__(self, config: MapReduceConfig):
+        self.config = config
+
+    def draft_section(self, llm: Any, system: str, assignment: str, context: str,
+                      name: str, template: str) -> Tuple[str, StepStats]:
+        relevant = budget_sections(context, self.config.context_tokens, f"{name}\n{template}") if context else ""
+        prompt = SECTION_PROMPT.format(
+            assignment=assignment, template=template, context=relevant or "(no earlier material)"
+        )
+        try:
+            text, stats = _call(llm, name, prompt, system)
+        except Exception as e:
+            print(f"⚠️  Drafting section '{name}' failed ({e}); retrying once")
+            text, stats = _call(llm, name, prompt, system)
+
+        heading = template.split('\n', 1)[0].strip()
+        if not text.lstrip().startswith('#'):
+            text = f"{heading}\n\n{text}"
+        return text, stats
+
+    def stitch(self, stitch_llm: Any, body: str) -> Tuple[str, List[StepStats]]:
+        """Title, executive summary and consistency fixes; the drafts are kept if the pass fails."""
+        title, summary = "Game Design Document", ""
+        try:
+            answer, stats = _call(stitch_llm, "stitch", STITCH_PROMPT.format(document=body))
+        except Exception as e:
+            print(f"⚠️  Stitching pass failed ({e}); keeping the section drafts as written")
+            return f"# {title}\n\n{body}", []
+
+        try:
+            edits = json.loads(answer[answer.find('{'):answer.rfind('}') + 1])
+            title = str(edits.get("title") or title).lstrip('#').strip()
+            summary = str(edits.get("executive_summary") or "").strip()
+            body, applied, skipped = apply_replacements(body, edits.get("replacements") or [])
+            print(f"🧵 Stitched {title}: {applied} consistency fix(es) applied, {len(skipped)} skipped")
+            for reason in skipped:
+                print(f"   ↷ Skipped fix {reason}")
+        except (ValueError, AttributeError, TypeError) as e:
+            print(f"⚠️  Stitching pass returned no usable JSON ({e}); keeping the section drafts as written")
+
+        document = f"# {title}\n\n"
+        if summary:
+            document += f"## Executive Summary\n\n{summary}\n\n"
+        return document + body, [stats]
+
+    def run(self, llm: Any, stitch_llm: Any, system: str, assignment: str,
+            context: str) -> Tuple[str, List[StepStats]]:
+        units = section_units()
+        workers = min(self.config.workers, len(units))
+        print(f"🗺️  Drafting {len(units)} GDD section(s) with {workers} worker(s) on {llm.model}")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gdd-section") as pool:
+            # Worker threads keep the task's rate-limit priority (see rate_limit.py)
+            futures = [
+                pool.submit(contextvars.copy_context().run, self.draft_section, llm, system, assignment,
+                            context, name, template)
+                for name, template in units
+            ]
+            drafts = [future.result() for future in futures]
+            body = "\n\n".join(text for text, _ in drafts)
+            # Also off the task's thread: run metrics account map-reduce calls from the returned stats
+            document, stitch_stats = pool.submit(contextvars.copy_context().run, self.stitch, stitch_llm, body).result()
+        return document, [stats for _, stats in drafts] + stitch_stats
+
+
+# (tier, response cache id) -> stitching LLM, shared by every crew in the process
+_stitch_llms: Dict[Tuple[str, int], Any] = {}
+_stitch_lock = threading.Lock()
+
+
+def stitch_llm_for(tier: str, response_cache: Any) -> Any:
+    from game_devs.llm import GameDevsLLM
+
+    key = (tier, id(response_cache))
+    with _stitch_lock:
+        if key not in _stitch_llms:
+            _stitch_llms[key] = GameDevsLLM(
+                model=MODEL_TIERS[tier],
+                temperature=0.2,
+                max_tokens=2000,
+                response_cache=response_cache,
+            )
+        return _stitch_llms[key]
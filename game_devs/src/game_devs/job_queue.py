@@ -0,0 +1,328 @@
+"""
+Durable Job Queue for Distributed GDD Generation
+
+A SQLite job queue that any number of worker processes (`uv run queue work`,
+see worker.py) on any number of hosts pull game specs from, as long as they
+share the database file and the output root:
+
+- at-least-once delivery: a worker claims a job with a lease (the visibility
+  timeout) and extends it with heartbeats while the crew runs. A job whose
+  lease runs out, because its worker died or lost the storage, becomes
+  claimable again: a job may run more than once but is never lost
+- claim tokens: only the holder of the current lease can ack or fail a job,
+  so a worker that lost its lease cannot overwrite the outcome of the retry
+- retries: a failed attempt is retried after an exponential backoff, up to
+  `max_attempts` (expired leases count as attempts); after that the job stays
+  failed until `queue retry` puts it back
+- every job writes under its own output root, so a retried job picks up the
+  checkpoints of the attempt before it (see incremental.py)
+
+Every state change is one short `BEGIN IMMEDIATE` transaction, so two workers
+never claim the same job. The database keeps SQLite's rollback journal: WAL
+needs shared memory, which network filesystems do not provide. The storage
+must support file locks (a local disk, or NFS with working locks).
+
+Kept free of crewAI imports, so `queue status` starts instantly.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+JOB_STATES = ("queued", "running", "completed", "failed")
+
+DEFAULT_QUEUE_PATH = "outputs/queue/jobs.db"
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_VISIBILITY_TIMEOUT = 300.0
+DEFAULT_RETRY_DELAY = 30.0
+
+
+def worker_name() -> str:
+    """Identity of this worker process: host and pid."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class QueuedJob:
+    """A job as stored in the queue."""
+
+    job_id: str
+    game: str
+    inputs: Dict[str, Any]
+    status: str
+    attempts: int
+    max_attempts: int
+    available_at: float
+    created_at: float
+    worker: Optional[str] = None
+    token: Optional[str] = None
+    lease_expires: Optional[float] = None
+    heartbeat_at: Optional[float] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    duration: Optional[float] = None
+    error: Optional[str] = None
+
+
+COLUMNS = (
+    "job_id, game, inputs, status, attempts, max_attempts, available_at, created_at, worker, token,"
+    " lease_expires, heartbeat_at, started_at, finished_at, duration, error"
+)
+
+
+def _job(row: tuple) -> QueuedJob:
+    values = list(row)
+    values[2] = json.loads(values[2])
+    return QueuedJob(*values)
+
+
+class JobQueue:
+    """SQLite-backed queue of game specs with leases, acks and retries."""
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=60, isolation_level=None)
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY,"
+                " game TEXT NOT NULL,"
+                " inputs TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " max_attempts INTEGER NOT NULL,"
+                " available_at REAL NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " worker TEXT,"
+                " token TEXT,"
+                " lease_expires REAL,"
+                " heartbeat_at REAL,"
+                " started_at REAL,"
+                " finished_at REAL,"
+                " duration REAL,"
+                " error TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, available_at)")
+
+    @classmethod
+    def from_env(cls) -> "JobQueue":
+        """Queue at JOB_QUEUE_PATH."""
+        return cls(os.getenv('JOB_QUEUE_PATH', DEFAULT_QUEUE_PATH))
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def enqueue(self, specs: List[Dict[str, Any]], max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> List[str]:
+        """Add resolved crew inputs as new jobs; returns their ids in order."""
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        from game_devs.batch import slugify
+
+        now = time.time()
+        rows = []
+        for inputs in specs:
+            game = str(inputs["game"])
+            rows.append((f"{uuid.uuid4().hex[:8]}_{slugify(game)}", game,
+                         json.dumps(inputs, ensure_ascii=False), "queued", max_attempts, now, now))
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO jobs (job_id, game, inputs, status, max_attempts, available_at, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return [row[0] for row in rows]
+
+    def _reap(self, conn: sqlite3.Connection, now: float) -> None:
+        """Return jobs with expired leases to the queue, or fail them once out of attempts."""
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', finished_at = ?, token = NULL,"
+            " error = 'lease expired on ' || worker || ' (no attempts left)'"
+            " WHERE status = 'running' AND lease_expires <= ? AND attempts >= max_attempts",
+            (now, now),
+        )
+        conn.execute(
+            "UPDATE jobs SET status = 'queued', available_at = ?, token = NULL,"
+            " error = 'lease expired on ' || worker"
+            " WHERE status = 'running' AND lease_expires <= ?",
+            (now, now),
+        )
+
+    def claim(self, worker: str, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> Optional[QueuedJob]:
+        """Lease the oldest available job to `worker`, or None when nothing is available."""
+        now = time.time()
+        with self._transaction() as conn:
+            self._reap(conn, now)
+            row = conn.execute(
+                f"SELECT {COLUMNS} FROM jobs WHERE status = 'queued' AND available_at <= ?"
+                " ORDER BY available_at, created_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            job = _job(row)
+            job.status, job.worker, job.token = "running", worker, uuid.uuid4().hex
+            job.attempts += 1
+            job.lease_expires, job.heartbeat_at = now + visibility_timeout, now
+            job.started_at = job.started_at or now
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, worker = ?, token = ?, lease_expires = ?,"
+                " heartbeat_at = ?, started_at = ? WHERE job_id = ?",
+                (job.status, job.attempts, job.worker, job.token, job.lease_expires, job.heartbeat_at,
+                 job.started_at, job.job_id),
+            )
+        return job
+
+    def heartbeat(self, job: QueuedJob, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> bool:
+        """Extend the lease of a claimed job; False if the lease was lost to another worker."""
+        now = time.time()
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, heartbeat_at = ?"
+                " WHERE job_id = ? AND token = ? AND status = 'running'",
+                (now + visibility_timeout, now, job.job_id, job.token),
+            ).rowcount
+        return updated == 1
+
+    def ack(self, job: QueuedJob, duration: float) -> bool:
+        """Mark a claimed job completed; False if the lease was lost."""
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET status = 'completed', finished_at = ?, duration = ?, token = NULL,"
+                " lease_expires = NULL, error = NULL WHERE job_id = ? AND token = ? AND status = 'running'",
+                (time.time(), duration, job.job_id, job.token),
+            ).rowcount
+        return updated == 1
+
+    def fail(self, job: QueuedJob, error: str, duration: float = 0.0,
+             retry_delay: float = DEFAULT_RETRY_DELAY) -> Optional[str]:
+        """Record a failed attempt: 'queued' again after a backoff, 'failed' when out of attempts,
+        None if the lease was lost."""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE job_id = ? AND token = ? AND status = 'running'",
+                (job.job_id, job.token),
+            ).fetchone()
+            if row is None:
+                return None
+            attempts, max_attempts = row
+            status = "queued" if attempts < max_attempts else "failed"
+            conn.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, finished_at = ?, duration = ?, error = ?,"
+                " token = NULL, lease_expires = NULL WHERE job_id = ?",
+                (status, now + retry_delay * 2 ** (attempts - 1), now if status == "failed" else None,
+                 duration, error, job.job_id),
+            )
+        return status
+
+    def release(self, job: QueuedJob) -> bool:
+        """Give a claimed job back without using up an attempt (worker shutting down)."""
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = attempts - 1, available_at = ?, token = NULL,"
+                " lease_expires = NULL WHERE job_id = ? AND token = ? AND status = 'running'",
+                (time.time(), job.job_id, job.token),
+            ).rowcount
+        return updated == 1
+
+    def retry(self, job_ids: Optional[List[str]] = None) -> int:
+        """Requeue failed jobs (the given ones, or all) with fresh attempts; returns how many."""
+        now = time.time()
+        query = ("UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?, finished_at = NULL,"
+                 " error = NULL WHERE status = 'failed'")
+        with self._transaction() as conn:
+            if job_ids is None:
+                return conn.execute(query, (now,)).rowcount
+            return sum(conn.execute(query + " AND job_id = ?", (now, job_id)).rowcount for job_id in job_ids)
+
+    def jobs(self, status: Optional[str] = None) -> List[QueuedJob]:
+        """Every job (or those in one state), oldest first."""
+        with self._lock:
+            if status is None:
+                rows = self._conn.execute(f"SELECT {COLUMNS} FROM jobs ORDER BY created_at").fetchall()
+            else:
+                rows = self._conn.execute(
+                    f"SELECT {COLUMNS} FROM jobs WHERE status = ? ORDER BY created_at", (status,)
+                ).fetchall()
+        return [_job(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {state: 0 for state in JOB_STATES}
+        counts.update(dict(rows))
+        return counts
+
+
+def _duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{seconds:02d}s"
+
+
+def dashboard_lines(queue: JobQueue, limit: int = 15, now: Optional[float] = None) -> List[str]:
+    """Counts, throughput, workers and the most recent jobs of a queue."""
+    now = time.time() if now is None else now
+    jobs = queue.jobs()
+    counts = queue.counts()
+    waiting = [job for job in jobs if job.status == "queued" and job.available_at > now]
+    running = [job for job in jobs if job.status == "running"]
+    finished = [job for job in jobs if job.status == "completed" and job.finished_at]
+    recent = [job for job in finished if job.finished_at >= now - 3600]
+    durations = [job.duration for job in finished if job.duration]
+    average = sum(durations) / len(durations) if durations else None
+
+    lines = [
+        f"📋 Job queue {queue.path}",
+        f"  {counts['queued']} queued ({len(waiting)} waiting to retry), {counts['running']} running, "
+        f"{counts['completed']} completed, {counts['failed']} failed",
+    ]
+    if average is not None:
+        workers = len({job.worker for job in running}) or 1
+        eta = (counts["queued"] + counts["running"]) * average / workers
+        lines.append(
+            f"  Throughput: {len(recent)} job(s) in the last hour, {_duration(average)} per job; "
+            f"about {_duration(eta)} left with {workers} worker(s)"
+        )
+    if running:
+        lines.append("  Running:")
+        for job in running:
+            expired = " — lease expired" if job.lease_expires and job.lease_expires <= now else ""
+            lines.append(
+                f"    {job.job_id:<32} {job.worker or '-':<24} attempt {job.attempts}/{job.max_attempts}, "
+                f"heartbeat {_duration(now - job.heartbeat_at) if job.heartbeat_at else '-'} ago{expired}"
+            )
+
+    shown = sorted(jobs, key=lambda job: job.finished_at or job.started_at or job.created_at, reverse=True)[:limit]
+    if shown:
+        lines.append(f"  {'Job':<32} {'Game':<24} {'Status':<10} {'Tries':>5} {'Time':>7}  Error")
+        for job in shown:
+            error = (job.error or "").splitlines()[0][:60] if job.error else ""
+            lines.append(
+                f"  {job.job_id:<32} {job.game[:24]:<24} {job.status:<10} "
+                f"{job.attempts:>2}/{job.max_attempts:<2} {_duration(job.duration):>7}  {error}"
+            )
+    return lines
@@ -0,0 +1,237 @@
+"""
+LLM Wrapper for the GameDevs Crew
+
+`GameDevsLLM` is the crewAI `LLM` used by every GameDevs agent. It keeps the
+standard litellm-backed behaviour and adds the crew's own layers around each
+call, such as the persistent response cache, prompt cache breakpoints
+(see prompt_cache.py), the record/replay backend (see llm_backend.py) and the
+shared rate limiter with 429/529 retries (see rate_limit.py).
+"""
+
+import json
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from crewai import LLM
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+from crewai.utilities.events.llm_events import (
+    LLMCallCompletedEvent,
+    LLMCallStartedEvent,
+    LLMCallType,
+    LLMStreamChunkEvent,
+)
+
+from game_devs.llm_backend import (
+    LLMRecorder,
+    LLMReplayer,
+    RecordedCall,
+    UsageCapture,
+    get_llm_backend,
+    system_fingerprint,
+)
+from game_devs.compaction import estimate_tokens
+from game_devs.llm_cache import LLMResponseCache, request_key
+from game_devs.prompt_cache import (
+    PromptCacheUsage,
+    count_breakpoints,
+    mark_cache_breakpoints,
+    prompt_caching_enabled,
+)
+from game_devs.rate_limit import (
+    RateLimitWaitEvent,
+    backoff_delay,
+    current_priority,
+    get_rate_limiter,
+    retry_after,
+    status_of,
+)
+
+
+class GameDevsLLM(LLM):
+    """crewAI LLM with an optional on-disk response cache, prompt cache breakpoints, record/replay
+    and shared rate limits."""
+
+    def __init__(
+        self,
+        model: str,
+        response_cache: Optional[LLMResponseCache] = None,
+        prompt_caching: Optional[bool] = None,
+        **kwargs,
+    ):
+        super().__init__(model=model, **kwargs)
+        self.response_cache = response_cache
+        # Anthropic cache_control breakpoints (PROMPT_CACHE=off disables them)
+        self.prompt_caching = prompt_caching_enabled() if prompt_caching is None else prompt_caching
+
+    def _prepare_completion_params(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+    ) -> Dict[str, Any]:
+        params = super()._prepare_completion_params(messages, tools)
+        if self.prompt_caching and self.is_anthropic:
+            params["messages"] = mark_cache_breakpoints(params["messages"])
+        return params
+
+    def _with_cache_usage(self, messages: List[Dict[str, str]], callbacks: Optional[List[Any]]) -> Optional[List[Any]]:
+        """Callbacks plus a reporter of prompt cache usage when the request carries breakpoints."""
+        if not (self.prompt_caching and self.is_anthropic):
+            return callbacks
+        breakpoints = count_breakpoints(mark_cache_breakpoints(self._format_messages_for_provider(messages)))
+        if not breakpoints:
+            return callbacks
+        return [*(callbacks or []), PromptCacheUsage(self, self.model, breakpoints)]
+
+    def _answer_locally(
+        self,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[dict]],
+        response: str,
+        delay: float = 0.0,
+    ) -> str:
+        """Emit the usual call events for an answer that did not come from the provider."""
+        crewai_event_bus.emit(self, event=LLMCallStartedEvent(messages=messages, tools=tools))
+        if self.stream:
+            # Streaming listeners receive the answer in chunks spread over the delay
+            chunks = [response[i:i + 40] for i in range(0, len(response), 40)] or [response]
+            for chunk in chunks:
+                if delay:
+                    time.sleep(delay / len(chunks))
+                crewai_event_bus.emit(self, event=LLMStreamChunkEvent(chunk=chunk))
+        elif delay:
+            time.sleep(delay)
+        crewai_event_bus.emit(self, event=LLMCallCompletedEvent(response=response, call_type=LLMCallType.LLM_CALL))
+        return response
+
+    def _replay(
+        self,
+        replayer: LLMReplayer,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[dict]],
+        callbacks: Optional[List[Any]],
+    ) -> str:
+        key = request_key(super()._prepare_completion_params(messages, tools))
+        recorded, delay = replayer.lookup(key, self.model, messages)
+        response = self._answer_locally(messages, tools, recorded.response, delay)
+        if recorded.usage:
+            from litellm.types.utils import Usage
+
+            usage = Usage(
+                prompt_tokens=recorded.usage.get("prompt_tokens", 0),
+                completion_tokens=recorded.usage.get("completion_tokens", 0),
+                total_tokens=recorded.usage.get("prompt_tokens", 0) + recorded.usage.get("completion_tokens", 0),
+                cache_read_input_tokens=recorded.usage.get("cache_read_input_tokens", 0),
+                cache_creation_input_tokens=recorded.usage.get("cache_creation_input_tokens", 0),
+            )
+            for callback in callbacks or []:
+                if hasattr(callback, "log_success_event"):
+                    callback.log_success_event(kwargs={}, response_obj={"usage": usage}, start_time=0, end_time=0)
+        return response
+
+    def _call_provider(
+        self,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[dict]],
+        callbacks: Optional[List[Any]],
+        available_functions: Optional[Dict[str, Any]],
+    ) -> Union[str, Any]:
+        """Send the call within the model's shared rate limits, retrying 429 and 529 answers."""
+        rate_limiter = get_rate_limiter()
+        limiter = rate_limiter.for_model(self.model) if rate_limiter else None
+        if limiter is None:
+            return super().call(messages, tools, callbacks, available_functions)
+
+        input_tokens = estimate_tokens(json.dumps([messages, tools or []], default=str, ensure_ascii=False))
+        output_tokens = limiter.output_reservation(self.max_tokens)
+        priority = current_priority.get()
+        waited, retries, order = 0.0, 0, None
+        while True:
+            ticket = limiter.acquire(input_tokens, output_tokens, priority, order)
+            order, waited = ticket.order, waited + ticket.waited
+            usage = UsageCapture()
+            try:
+                response = super().call(messages, tools, [*(callbacks or []), usage], available_functions)
+            except Exception as e:
+                limiter.refund(ticket)
+                status = status_of(e)
+                if status is None or retries >= rate_limiter.max_retries:
+                    raise
+                delay = retry_after(e)
+                delay = backoff_delay(retries) if delay is None else delay + backoff_delay(0)
+                print(f"🚦 {self.model.split('/')[-1]} answered {status}; retrying in {delay:.1f}s "
+                      f"({retries + 1}/{rate_limiter.max_retries})")
+                limiter.back_off(status, delay)
+                retries += 1
+                continue
+            # litellm's prompt tokens leave out cache writes, which count towards the input limit too
+            used = usage.usage.get("prompt_tokens", 0) + usage.usage.get("cache_creation_input_tokens", 0)
+            limiter.settle(ticket, used or None, usage.usage.get("completion_tokens"))
+            if waited > 0.001 or retries:
+                crewai_event_bus.emit(self, event=RateLimitWaitEvent(
+                    model=self.model, waited=waited, retries=retries, queue_depth=ticket.queue_depth,
+                ))
+            return response
+
+    def _record(
+        self,
+        recorder: LLMRecorder,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[dict]],
+        callbacks: Optional[List[Any]],
+        available_functions: Optional[Dict[str, Any]],
+    ) -> Union[str, Any]:
+        params = super()._prepare_completion_params(messages, tools)
+        usage = UsageCapture()
+        start = time.perf_counter()
+        response = self._call_provider(messages, tools, [*(callbacks or []), usage], available_functions)
+        latency = time.perf_counter() - start
+
+        # Tool-executing calls return tool results rather than model text, so only text is recorded
+        if isinstance(response, str) and response and not available_functions:
+            recorder.record(RecordedCall(
+                key=request_key(params),
+                model=self.model,
+                system=system_fingerprint(messages),
+                messages=params["messages"],
+                response=response,
+                latency=round(latency, 3),
+                usage=usage.usage,
+                recorded_at=time.time(),
+            ))
+            if self.response_cache is not None:
+                self.response_cache.put(request_key(params), response, model=self.model)
+        return response
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> Union[str, Any]:
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        callbacks = self._with_cache_usage(messages, callbacks)
+
+        # Recorded runs make every call for real; replayed runs never reach the provider
+        backend = get_llm_backend()
+        if isinstance(backend, LLMReplayer):
+            return self._replay(backend, messages, tools, callbacks)
+        if isinstance(backend, LLMRecorder):
+            return self._record(backend, messages, tools, callbacks, available_functions)
+
+        # Tool-executing calls return tool results rather than model text, so never cache them
+        if self.response_cache is None or available_functions:
+            return self._call_provider(messages, tools, callbacks, available_functions)
+
+        # Keyed without cache breakpoints: they never change the answer
+        key = request_key(super()._prepare_completion_params(messages, tools))
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            # Emit the usual events so listeners see cache hits like any other call
+            return self._answer_locally(messages, tools, cached)
+
+        response = self._call_provider(messages, tools, callbacks, available_functions)
+        if isinstance(response, str) and response:
+            self.response_cache.put(key, response, model=self.model)
+        return response
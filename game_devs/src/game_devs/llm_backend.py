@@ -0,0 +1,268 @@
+"""
+Record/Replay LLM Backend
+
+Every GameDevs run normally talks to the Anthropic API. For profiling and
+regression runs the calls of `GameDevsLLM` can instead be recorded once and
+served back offline:
+
+- live:    the default, calls go to the provider
+- record:  calls go to the provider (response cache lookups are skipped, so
+           every call is real) and each request, response, latency and token
+           usage is appended to a JSONL recording
+- replay:  calls are answered from the recording without any network access;
+           token usage and prompt cache usage are reported as recorded, so
+           run metrics look like those of the recorded run
+
+Requests are matched by the same content hash as the response cache. A
+request that changed since it was recorded (e.g. after a prompt tweak) is
+answered with the next unused recording of the same model and system prompt
+and counted as a loose match; a request with nothing left to match fails
+with `ReplayMissError`.
+
+Replayed answers are instant unless a latency model is given:
+
+    none                 no delay
+    recorded[:SCALE]     the recorded duration, optionally scaled
+    fixed:SECONDS        the same delay for every call
+    uniform:MIN,MAX      uniformly distributed delays
+    lognormal:MEDIAN,SIGMA
+
+Configured by LLM_BACKEND, LLM_RECORDING, LLM_REPLAY_LATENCY and
+LLM_REPLAY_SEED (or --llm-backend, --recording and --replay-latency).
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from litellm.integrations.custom_logger import CustomLogger
+
+from game_devs.options import DEFAULT_RECORDING_PATH, LLM_BACKENDS
+
+LATENCY_MODELS = ("none", "recorded", "fixed", "uniform", "lognormal")
+
+USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "cache_read_input_tokens", "cache_creation_input_tokens")
+
+
+class ReplayMissError(RuntimeError):
+    """A replayed request has no recorded answer."""
+
+
+def system_fingerprint(messages: List[Dict[str, Any]]) -> str:
+    """Hash of the system prompt, which identifies the agent (or helper) making a call."""
+    system = "".join(
+        str(message.get("content") or "") for message in messages if message.get("role") == "system"
+    )
+    return hashlib.sha256(system.encode('utf-8')).hexdigest()[:16]
+
+
+@dataclass
+class LatencyModel:
+    """Simulated duration of a replayed call."""
+
+    kind: str = "none"
+    params: Tuple[float, ...] = ()
+
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> "LatencyModel":
+        """Parse `kind[:a[,b]]`, e.g. `uniform:0.5,2`."""
+        kind, _, values = (spec or "none").strip().partition(':')
+        kind = kind.lower()
+        if kind not in LATENCY_MODELS:
+            raise ValueError(f"Unknown replay latency '{spec}'. Choose from: {', '.join(LATENCY_MODELS)}")
+        try:
+            params = tuple(float(value) for value in values.split(',') if value.strip())
+        except ValueError:
+            raise ValueError(f"Replay latency '{spec}' has non-numeric parameters")
+
+        expected = {"none": (0,), "recorded": (0, 1), "fixed": (1,), "uniform": (2,), "lognormal": (2,)}[kind]
+        if len(params) not in expected:
+            raise ValueError(f"Replay latency '{kind}' takes {' or '.join(map(str, expected))} parameter(s)")
+        if any(value < 0 for value in params):
+            raise ValueError(f"Replay latency '{spec}' must not be negative")
+        if kind == "uniform" and params[0] > params[1]:
+            raise ValueError(f"Replay latency '{spec}': MIN is larger than MAX")
+        return cls(kind=kind, params=params)
+
+    def sample(self, recorded: float, rng: random.Random) -> float:
+        if self.kind == "recorded":
+            return recorded * (self.params[0] if self.params else 1.0)
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        return 0.0
+
+
+@dataclass
+class RecordedCall:
+    """One recorded LLM call."""
+
+    key: str
+    model: str
+    system: str
+    messages: List[Dict[str, Any]]
+    response: str
+    latency: float
+    usage: Dict[str, int] = field(default_factory=dict)
+    recorded_at: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class UsageCapture(CustomLogger):
+    """Success callback that keeps the usage crewAI reports after a call."""
+
+    def __init__(self):
+        self.usage: Dict[str, int] = {}
+
+    def log_success_event(self, kwargs: Dict[str, Any], response_obj: Dict[str, Any], start_time: Any, end_time: Any) -> None:
+        usage = response_obj.get("usage") if isinstance(response_obj, dict) else None
+        if usage is None:
+            return
+        for name in USAGE_FIELDS:
+            value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+            if value:
+                self.usage[name] = int(value)
+
+
+class LLMRecorder:
+    """Appends every call to a JSONL recording."""
+
+    mode = "record"
+
+    def __init__(self, path: str = DEFAULT_RECORDING_PATH):
+        self.path = path
+        self.recorded = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def record(self, call: RecordedCall) -> None:
+        line = json.dumps(call.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+            self.recorded += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": self.mode, "path": self.path, "recorded": self.recorded}
+
+
+class LLMReplayer:
+    """Answers calls from a JSONL recording."""
+
+    mode = "replay"
+
+    def __init__(self, path: str = DEFAULT_RECORDING_PATH, latency: Optional[LatencyModel] = None, seed: int = 0):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No LLM recording at {path}; record one with --llm-backend record")
+        self.path = path
+        self.latency = latency or LatencyModel()
+        self.exact = 0
+        self.loose = 0
+        self.misses = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._calls: List[RecordedCall] = []
+        self._by_key: Dict[str, List[int]] = defaultdict(list)
+        self._by_agent: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        self._used = set()
+
+        with open(path, encoding="utf-8") as file:
+            for number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    call = RecordedCall(**json.loads(line))
+                except (ValueError, TypeError) as e:
+                    raise ValueError(f"{path}:{number}: not a recorded LLM call ({e})")
+                self._by_key[call.key].append(len(self._calls))
+                self._by_agent[(call.model, call.system)].append(len(self._calls))
+                self._calls.append(call)
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def lookup(self, key: str, model: str, messages: List[Dict[str, Any]]) -> Tuple[RecordedCall, float]:
+        """The recorded call answering a request and the simulated delay before answering."""
+        with self._lock:
+            unused = [index for index in self._by_key.get(key, []) if index not in self._used]
+            if unused or key in self._by_key:
+                # Identical requests are answered in recorded order, repeating the last answer
+                index = unused[0] if unused else self._by_key[key][-1]
+                self.exact += 1
+            else:
+                candidates = [
+                    index for index in self._by_agent.get((model, system_fingerprint(messages)), [])
+                    if index not in self._used
+                ]
+                if not candidates:
+                    self.misses += 1
+                    raise ReplayMissError(
+                        f"No recorded {model} call matches this request ({len(self._calls)} recorded in "
+                        f"{self.path}); re-record with --llm-backend record"
+                    )
+                index = candidates[0]
+                self.loose += 1
+            self._used.add(index)
+            call = self._calls[index]
+            return call, self.latency.sample(call.latency, self._rng)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "path": self.path,
+            "recorded": len(self._calls),
+            "exact": self.exact,
+            "loose": self.loose,
+            "misses": self.misses,
+        }
+
+
+LLMBackend = Union[LLMRecorder, LLMReplayer]
+
+_shared_backend: Optional[LLMBackend] = None
+_shared_backend_config: Optional[Tuple[str, ...]] = None
+_shared_backend_lock = threading.Lock()
+
+
+def backend_mode() -> str:
+    mode = os.getenv('LLM_BACKEND', 'live').lower()
+    if mode not in LLM_BACKENDS:
+        raise ValueError(f"Unknown LLM_BACKEND '{mode}'. Choose from: {', '.join(LLM_BACKENDS)}")
+    return mode
+
+
+def get_llm_backend() -> Optional[LLMBackend]:
+    """Process-wide recorder or replayer configured by the environment, or None for live calls."""
+    global _shared_backend, _shared_backend_config
+    mode = backend_mode()
+    if mode == "live":
+        return None
+
+    config = (
+        mode,
+        os.getenv('LLM_RECORDING', DEFAULT_RECORDING_PATH),
+        os.getenv('LLM_REPLAY_LATENCY', 'none'),
+        os.getenv('LLM_REPLAY_SEED', '0'),
+    )
+    with _shared_backend_lock:
+        if _shared_backend is None or _shared_backend_config != config:
+            if mode == "record":
+                _shared_backend = LLMRecorder(config[1])
+            else:
+                _shared_backend = LLMReplayer(config[1], LatencyModel.parse(config[2]), int(config[3]))
+            _shared_backend_config = config
+        return _shared_backend
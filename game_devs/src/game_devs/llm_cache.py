@@ -0,0 +1,154 @@
+"""
+Persistent LLM Response Cache for the GameDevs Crew
+
+Stores Claude responses on disk keyed by a hash of the full completion request
+(model, sampling parameters and every message, including the agent system
+prompt and rendered task prompt). Re-running a preset only pays for the calls
+whose requests actually changed. Entries are evicted least-recently-used once
+the cache grows past its size or entry limits.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Request parameters that do not influence the generated text
+NON_CONTENT_PARAMS = {"api_key", "api_base", "base_url", "api_version", "timeout", "stream", "stream_options"}
+
+DEFAULT_CACHE_PATH = "outputs/cache/llm_responses.db"
+DEFAULT_MAX_MB = 256
+
+
+def request_key(params: Dict[str, Any]) -> str:
+    """Content address of a completion request."""
+    content = {key: value for key, value in params.items() if key not in NON_CONTENT_PARAMS}
+    payload = json.dumps(content, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed, size-bounded LRU cache of LLM responses."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+        max_entries: Optional[int] = None,
+        bypass: bool = False,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        # Bypass skips lookups but still stores fresh responses
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT,"
+            " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_accessed ON responses (last_accessed)")
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> "LLMResponseCache":
+        """Build a cache configured by LLM_CACHE_PATH, LLM_CACHE_MAX_MB and LLM_CACHE_BYPASS."""
+        return cls(
+            path=os.getenv('LLM_CACHE_PATH', DEFAULT_CACHE_PATH),
+            max_bytes=int(float(os.getenv('LLM_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024),
+            bypass=os.getenv('LLM_CACHE_BYPASS', 'false').lower() == 'true',
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a request key and mark it recently used."""
+        if self.bypass:
+            self.misses += 1
+            return None
+
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_accessed = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str, model: str = "") -> None:
+        """Store a response and evict least-recently-used entries over the limits."""
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, last_accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        total_size, count = self._conn.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM responses").fetchone()
+        if total_size <= self.max_bytes and (self.max_entries is None or count <= self.max_entries):
+            return
+
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_accessed ASC").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total_size <= self.max_bytes and (self.max_entries is None or count <= self.max_entries):
+                break
+            evicted.append((key,))
+            total_size -= size
+            count -= 1
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus on-disk usage."""
+        with self._lock:
+            total_size, count = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM responses"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": count,
+            "size_bytes": total_size,
+        }
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+
+_shared_cache: Optional[LLMResponseCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache shared by every crew, or None when LLM_CACHE=off."""
+    global _shared_cache
+    if os.getenv('LLM_CACHE', 'on').lower() == 'off':
+        return None
+
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = LLMResponseCache.from_env()
+        return _shared_cache
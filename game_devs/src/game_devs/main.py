@@ -3,10 +3,24 @@ import sys
 import warnings
 import argparse
 import os
+import json
+import time
 from datetime import datetime
 from typing import Dict, Any
 
-from game_devs.crew import GameDevs
+from game_devs.llm_cache import get_response_cache
+from game_devs.options import (
+    DEFAULT_RECORDING_PATH,
+    LLM_BACKENDS,
+    MODEL_PRICING,
+    MODEL_TIERS,
+    REVIEW_POLICIES,
+)
+from game_devs.validation import DEFAULT_PATTERN, summary_lines, validate_paths
+
+# The crew modules import crewAI and litellm, which take seconds to load. They are
+# imported inside the commands that run a crew so `--help`, argument errors and
+# `validate` return immediately.
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -136,11 +150,50 @@ def parse_arguments():
     )
 
     parser.add_argument(
-        "--production-models",
+        "--parallel",
+        action="store_true",
+        help="Run tasks as a dependency graph, executing independent tasks concurrently"
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream LLM tokens to <output_file>.partial as they arrive"
+    )
+
+    parser.add_argument(
+        "--stream-console",
         action="store_true",
-        help="Use production-grade Claude models (Sonnet 3.5) instead of cost-effective testing models (Haiku 3.5)"
+        help="Also echo streamed tokens to the console (implies --stream)"
+    )
+
+    parser.add_argument(
+        "--review-policy",
+        choices=REVIEW_POLICIES,
+        default="human",
+        help="Who answers the review checkpoints: human (stdin), auto (approve), file (scripted feedback) or llm (Chief Editor)"
+    )
+
+    parser.add_argument(
+        "--review-feedback",
+        type=str,
+        help="YAML/JSON file of review feedback keyed by review task name (used with --review-policy=file)"
     )
 
+    parser.add_argument(
+        "--full-run",
+        action="store_true",
+        help="Run every task, instead of reusing stored outputs of tasks whose prompts and inputs are unchanged"
+    )
+
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Print which tasks would run and which would reuse their stored outputs, then exit"
+    )
+
+    add_pipeline_flags(parser)
+
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -173,8 +226,164 @@ def get_inputs_from_args(args) -> Dict[str, Any]:
     else:
         return get_default_inputs()
 
-def print_workflow_info():
+def get_inputs_from_spec(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a batch spec to input configuration, starting from its `game_type` preset."""
+    presets = {
+        "default": get_default_inputs,
+        "casual-rts": get_casual_rts_inputs,
+        "puzzle-platformer": get_puzzle_platformer_inputs,
+        "roguelike": get_roguelike_inputs,
+    }
+    game_type = spec.get("game_type", "default")
+    if game_type not in presets:
+        raise ValueError(f"Unknown game_type '{game_type}' in batch spec")
+
+    inputs = presets[game_type]()
+    inputs.update({key: value for key, value in spec.items() if key != "game_type"})
+    return inputs
+
+# --flag -> (environment toggle, value, help) of the pipeline options every crew-running command accepts
+PIPELINE_TOGGLES = {
+    "--production-models": (
+        "USE_PRODUCTION_MODELS", "true",
+        "Use production-grade Claude models (Sonnet 3.5) instead of cost-effective testing models (Haiku 3.5)",
+    ),
+    "--no-model-routing": (
+        "MODEL_ROUTING", "off",
+        "Ignore the per-task model tiers in tasks.yaml and run every task on its agent's model",
+    ),
+    "--no-context-compaction": (
+        "CONTEXT_COMPACTION", "off", "Pass every upstream output in full, ignoring context_compaction in tasks.yaml",
+    ),
+    "--no-map-reduce": (
+        "MAP_REDUCE", "off", "Write the GDD in a single call instead of drafting template sections concurrently",
+    ),
+    "--no-structured-outputs": (
+        "STRUCTURED_OUTPUTS", "off", "Pass markdown between stages instead of JSON objects of the stage schemas",
+    ),
+    "--memory": (
+        "CREW_MEMORY", "on", "Enable crewAI memory backed by local embeddings (adds an evaluation call per task)",
+    ),
+    "--no-cache": ("LLM_CACHE", "off", "Disable the on-disk LLM response cache"),
+    "--refresh-cache": (
+        "LLM_CACHE_BYPASS", "true", "Skip cache lookups but store fresh responses (forces new LLM calls)",
+    ),
+    "--no-design-memory": (
+        "DESIGN_MEMORY", "off", "Neither recall nor store approved pitches, mechanics and reviews of earlier runs",
+    ),
+}
+
+def add_pipeline_flags(parser: argparse.ArgumentParser):
+    """Add the model, cache, backend and rate-limit options shared by every command that runs crews."""
+    for flag, (_, _, help_text) in PIPELINE_TOGGLES.items():
+        parser.add_argument(flag, action="store_true", help=help_text)
+    parser.add_argument(
+        "--no-rate-limit",
+        action="store_true",
+        help="Send LLM calls without queueing for the per-model rate limits or retrying 429/529 answers"
+    )
+    parser.add_argument(
+        "--llm-backend",
+        choices=LLM_BACKENDS,
+        default="live",
+        help="live: call the provider, record: also save every call, replay: answer offline from a recording"
+    )
+    parser.add_argument(
+        "--recording",
+        type=str,
+        help=f"LLM recording file for --llm-backend record/replay (default: {DEFAULT_RECORDING_PATH})"
+    )
+    parser.add_argument(
+        "--replay-latency",
+        type=str,
+        help="Simulated latency of replayed calls: none, recorded[:SCALE], fixed:S, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA"
+    )
+
+def apply_pipeline_flags(args):
+    """Export the options of `add_pipeline_flags` for crews built afterwards.
+
+    Raises ValueError (or OSError) for an unusable recording or RATE_LIMITS setting.
+    """
+    for flag, (variable, value, _) in PIPELINE_TOGGLES.items():
+        if getattr(args, flag[2:].replace('-', '_')):
+            os.environ[variable] = value
+    configure_llm_backend(args.llm_backend, args.recording, args.replay_latency)
+    configure_rate_limits(not args.no_rate_limit)
+
+def configure_review_policy(review_policy: str, review_feedback: str = None):
+    """Select the review policy for the crew via environment variables."""
+    if review_policy == "file" and not review_feedback:
+        raise ValueError("--review-feedback is required when using --review-policy=file")
+
+    os.environ['REVIEW_POLICY'] = review_policy
+    if review_feedback:
+        os.environ['REVIEW_FEEDBACK_FILE'] = review_feedback
+
+def configure_streaming(stream: bool, console: bool = False):
+    """Enable token streaming to partial output files (and the console) for crews built afterwards."""
+    if stream or console:
+        os.environ['LLM_STREAM'] = 'true'
+    if console:
+        os.environ['STREAM_CONSOLE'] = 'true'
+
+def configure_llm_backend(backend: str, recording: str = None, latency: str = None):
+    """Select live, recorded or replayed LLM calls for crews built afterwards."""
+    os.environ['LLM_BACKEND'] = backend
+    if recording:
+        os.environ['LLM_RECORDING'] = recording
+    if latency:
+        os.environ['LLM_REPLAY_LATENCY'] = latency
+    if backend == "replay":
+        from game_devs.llm_backend import get_llm_backend
+
+        # Fail before any crew is built if the recording or latency model is unusable
+        get_llm_backend()
+
+def configure_rate_limits(enabled: bool):
+    """Turn the shared LLM rate limiter on or off and check RATE_LIMITS before any crew is built."""
+    if not enabled:
+        os.environ['RATE_LIMIT'] = 'off'
+        return
+    from game_devs.rate_limit import get_rate_limiter
+
+    get_rate_limiter()
+
+def print_rate_limit_stats():
+    """Print queueing and 429/529 retries of the shared rate limiter."""
+    from game_devs.rate_limit import get_rate_limiter, summary_lines
+
+    rate_limiter = get_rate_limiter()
+    if rate_limiter is None:
+        return
+    for line in summary_lines(rate_limiter.stats()):
+        print(line)
+
+def print_llm_backend_stats():
+    """Print what the record/replay backend did during the run."""
+    from game_devs.llm_backend import get_llm_backend
+
+    backend = get_llm_backend()
+    if backend is None:
+        return
+    stats = backend.stats()
+    if stats["mode"] == "record":
+        print(f"📼 Recorded {stats['recorded']} LLM call(s) to {stats['path']}")
+    else:
+        print(f"📼 Replayed {stats['exact'] + stats['loose']} of {stats['recorded']} recorded LLM call(s) "
+              f"from {stats['path']} ({stats['exact']} exact, {stats['loose']} loose match(es))")
+
+def print_workflow_info(review_policy: str = "human"):
     """Print information about the human review workflow."""
+    if review_policy != "human":
+        print("\n" + "="*80)
+        print(f"🎮 CREWAI GAMEDEVS - UNATTENDED WORKFLOW (review policy: {review_policy})")
+        print("="*80)
+        print()
+        print("Review checkpoints are answered automatically; review artifacts are saved to outputs/review/.")
+        print("="*80)
+        print()
+        return
+
     print("\n" + "="*80)
     print("🎮 CREWAI GAMEDEVS - HUMAN REVIEW WORKFLOW")
     print("="*80)
@@ -197,15 +406,22 @@ def print_model_info(use_production_models: bool):
     """Print information about the Claude models being used."""
     print("🤖 Claude Model Configuration:")
     if use_production_models:
-        print("  Model: Claude Sonnet 3.5 (claude-3-5-sonnet-20241022)")
+        model = "claude-3-5-sonnet-20241022"
+        print(f"  Model: Claude Sonnet 3.5 ({model})")
         print("  Tier: Production-grade quality")
-        print("  Cost: $3/MTok input, $15/MTok output")
-        print("  Features: High intelligence, superior reasoning")
     else:
-        print("  Model: Claude Haiku 3.5 (claude-3-5-haiku-20241022)")
+        model = "claude-3-5-haiku-20241022"
+        print(f"  Model: Claude Haiku 3.5 ({model})")
         print("  Tier: Cost-effective testing")
-        print("  Cost: $0.80/MTok input, $4/MTok output")
+    input_price, output_price = MODEL_PRICING[model]
+    print(f"  Cost: ${input_price:.2f}/MTok input, ${output_price:.2f}/MTok output")
+    if use_production_models:
+        print("  Features: High intelligence, superior reasoning")
+    else:
         print("  Features: Fast responses, good quality")
+    if os.getenv('MODEL_ROUTING', 'on').lower() != 'off':
+        tiers = ", ".join(f"{tier}={model}" for tier, model in MODEL_TIERS.items())
+        print(f"  Routing: per-task tiers from tasks.yaml override the model above ({tiers})")
     print()
 
 def main():
@@ -214,16 +430,22 @@ def main():
         # Parse command line arguments
         args = parse_arguments()
 
-        # Set production models environment variable
-        if args.production_models:
-            os.environ['USE_PRODUCTION_MODELS'] = 'true'
+        # Models, cache, design memory, LLM backend and rate limits
+        apply_pipeline_flags(args)
+        configure_streaming(args.stream, args.stream_console)
+
+        # Select who answers the review checkpoints
+        configure_review_policy(args.review_policy, args.review_feedback)
+
+        if args.full_run:
+            os.environ['INCREMENTAL'] = 'off'
 
         # Setup output directories
         print("Setting up output directories...")
         setup_output_directories()
 
         # Print workflow information
-        print_workflow_info()
+        print_workflow_info(args.review_policy)
 
         # Print model information
         print_model_info(args.production_models)
@@ -243,7 +465,10 @@ def main():
         print()
 
         # Environment check
-        if not os.getenv('ANTHROPIC_API_KEY'):
+        if args.llm_backend == "replay":
+            print("📼 Replaying recorded LLM calls; no API key or network access needed")
+            print()
+        elif not os.getenv('ANTHROPIC_API_KEY'):
             print("⚠️  WARNING: ANTHROPIC_API_KEY environment variable not found.")
             print("   Please set your Anthropic API key to use Claude models.")
             print("   Example: export ANTHROPIC_API_KEY=your_api_key_here")
@@ -251,14 +476,29 @@ def main():
 
         # Initialize and run the crew
         print("🚀 Starting GameDevs CrewAI workflow...")
-        print("Note: This workflow includes human review points where you'll be prompted for feedback.")
+        if args.review_policy == "human":
+            print("Note: This workflow includes human review points where you'll be prompted for feedback.")
         print()
 
-        crew = GameDevs().crew()
+        from game_devs.crew import GameDevs
+        from game_devs.scheduler import DependencyScheduler
+
+        crew_base = GameDevs()
+        crew = crew_base.crew()
+        if args.plan:
+            from game_devs.incremental import plan_lines
+
+            for line in plan_lines(crew_base.plan_run(inputs, crew.tasks)):
+                print(line)
+            return
+        scheduler = DependencyScheduler(crew) if args.parallel else None
 
         # Start the crew with proper input handling
         start_time = datetime.now()
-        result = crew.kickoff(inputs=inputs)
+        if scheduler:
+            result = scheduler.kickoff(inputs=inputs)
+        else:
+            result = crew.kickoff(inputs=inputs)
         end_time = datetime.now()
 
         # Print results
@@ -266,6 +506,22 @@ def main():
         print("🎉 WORKFLOW COMPLETED SUCCESSFULLY!")
         print("="*80)
         print(f"⏱️  Total execution time: {end_time - start_time}")
+        if scheduler and scheduler.report:
+            for line in scheduler.report.summary_lines():
+                print(line)
+        for line in crew_base.metrics.summary_lines():
+            print(line)
+        response_cache = get_response_cache()
+        if response_cache:
+            cache_stats = response_cache.stats()
+            print(f"💾 LLM cache: {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es), "
+                  f"{cache_stats['entries']} entries ({cache_stats['size_bytes'] / (1024 * 1024):.1f} MB)")
+        if crew_base.design_memory:
+            memory_stats = crew_base.design_memory.stats()
+            print(f"🧠 Design memory: {memory_stats['recalled']} recalled, {memory_stats['stored']} stored, "
+                  f"{memory_stats['entries']} entries ({memory_stats['size_bytes'] / (1024 * 1024):.1f} MB)")
+        print_rate_limit_stats()
+        print_llm_backend_stats()
         print(f"📁 Output files saved to: outputs/")
         print(f"📋 Final GDD: outputs/final/{inputs['game']}_final_gdd.md")
         print(f"📝 Execution log: outputs/logs/crew_execution.log")
@@ -286,5 +542,452 @@ def main():
             traceback.print_exc()
         sys.exit(1)
 
+def run():
+    """Entry point for `crewai run` / the `run_crew` script."""
+    main()
+
+def train():
+    """Train the crew for a given number of iterations: `train <n_iterations> <filename>`."""
+    from game_devs.crew import GameDevs
+
+    try:
+        GameDevs().crew().train(
+            n_iterations=int(sys.argv[1]),
+            filename=sys.argv[2],
+            inputs=get_default_inputs()
+        )
+    except Exception as e:
+        raise Exception(f"An error occurred while training the crew: {e}")
+
+def test():
+    """Test the crew and report scores: `test <n_iterations> <eval_llm>`."""
+    from game_devs.crew import GameDevs
+
+    try:
+        GameDevs().crew().test(
+            n_iterations=int(sys.argv[1]),
+            eval_llm=sys.argv[2],
+            inputs=get_default_inputs()
+        )
+    except Exception as e:
+        raise Exception(f"An error occurred while testing the crew: {e}")
+
+def replay():
+    """Resume the last checkpointed run from a given task, reusing earlier task outputs."""
+    parser = argparse.ArgumentParser(description="GameDevs CrewAI - Resume a run from a checkpointed task")
+    parser.add_argument("task", nargs="?", help="Task name to resume from (same as --from)")
+    parser.add_argument("--from", dest="from_task", help="Task name to resume from, e.g. final_polish_task")
+    parser.add_argument("--output-root", default="outputs", help="Output root of the run to resume")
+    parser.add_argument("--list", action="store_true", help="List checkpointed tasks and exit")
+    add_pipeline_flags(parser)
+    parser.add_argument("--parallel", action="store_true", help="Run the remaining tasks as a dependency graph")
+    parser.add_argument("--stream", action="store_true", help="Stream LLM tokens to <output_file>.partial")
+    parser.add_argument("--stream-console", action="store_true", help="Also echo streamed tokens to the console")
+    parser.add_argument("--review-policy", choices=REVIEW_POLICIES, default="human",
+                        help="Who answers the remaining review checkpoints")
+    parser.add_argument("--review-feedback", help="Review feedback file for --review-policy=file")
+    args = parser.parse_args()
+
+    # Resuming from a task means running it and everything after it again
+    os.environ['INCREMENTAL'] = 'off'
+    configure_streaming(args.stream, args.stream_console)
+
+    try:
+        apply_pipeline_flags(args)
+        configure_review_policy(args.review_policy, args.review_feedback)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
+
+    from game_devs.crew import GameDevs
+    from game_devs.scheduler import DependencyScheduler
+
+    crew_base = GameDevs(output_root=args.output_root)
+    crew = crew_base.crew()
+
+    try:
+        if args.list:
+            completed = set(crew_base.checkpoints.completed_tasks())
+            print(f"📌 Checkpoints in {crew_base.checkpoints.directory}:")
+            for task in crew.tasks:
+                print(f"  {'✓' if task.name in completed else '·'} {task.name}")
+            return
+
+        from_task = args.from_task or args.task
+        if not from_task:
+            parser.error("a task name is required (use --from <task_name>)")
+
+        inputs = crew_base.checkpoints.restore(crew, from_task)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
+
+    print(f"🔁 Resuming '{inputs['game']}' from {from_task} ({len(crew.tasks)} task(s) to run)")
+    start_time = datetime.now()
+    if args.parallel:
+        result = DependencyScheduler(crew).kickoff(inputs=inputs)
+    else:
+        result = crew.kickoff(inputs=inputs)
+    print(f"⏱️  Replay execution time: {datetime.now() - start_time}")
+    for line in crew_base.metrics.summary_lines():
+        print(line)
+    print_llm_backend_stats()
+    print(result)
+
+def batch():
+    """Generate GDDs for every spec in a JSONL/YAML file with a bounded worker pool."""
+    parser = argparse.ArgumentParser(description="GameDevs CrewAI - Batch GDD generation")
+    parser.add_argument("spec_file", help="JSONL or YAML file of game specs")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum number of crews running at once")
+    parser.add_argument("--output-root", default="outputs/batch", help="Directory for per-job output folders")
+    add_pipeline_flags(parser)
+    parser.add_argument("--parallel", action="store_true", help="Run each crew's tasks as a dependency graph")
+    parser.add_argument("--stream", action="store_true", help="Stream LLM tokens to each job's <output_file>.partial")
+    parser.add_argument("--review-policy", choices=REVIEW_POLICIES, default="auto",
+                        help="Who answers the review checkpoints (stdin prompts from concurrent jobs would interleave)")
+    parser.add_argument("--review-feedback", help="Review feedback file for --review-policy=file")
+    args = parser.parse_args()
+
+    configure_streaming(args.stream)
+
+    from game_devs.batch import BatchRunner, load_specs
+
+    try:
+        apply_pipeline_flags(args)
+        configure_review_policy(args.review_policy, args.review_feedback)
+        specs = [get_inputs_from_spec(spec) for spec in load_specs(args.spec_file)]
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
+
+    print(f"🚀 Running {len(specs)} GDD job(s) with concurrency {args.concurrency}")
+    print_model_info(args.production_models)
+
+    runner = BatchRunner(
+        specs,
+        concurrency=args.concurrency,
+        output_root=args.output_root,
+        parallel=args.parallel,
+    )
+    results = runner.run()
+
+    print("\n" + "="*80)
+    print("📦 BATCH SUMMARY")
+    print("="*80)
+    print(runner.summary_table())
+    print_rate_limit_stats()
+    print_llm_backend_stats()
+    print(f"📁 Job outputs saved to: {args.output_root}/")
+    print("="*80)
+
+    if any(result.status == "failed" for result in results):
+        sys.exit(1)
+
+def serve():
+    """Serve GDD jobs over HTTP from a warm process (see service.py)."""
+    parser = argparse.ArgumentParser(description="GameDevs CrewAI - GDD service")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (0 picks a free port)")
+    parser.add_argument("--concurrency", type=int, default=2, help="Maximum number of crews running at once")
+    parser.add_argument("--max-queued", type=int, default=100, help="Waiting jobs before submissions get 503")
+    parser.add_argument("--max-finished", type=int, default=500,
+                        help="Finished jobs kept in memory (their outputs stay on disk)")
+    parser.add_argument("--output-root", default="outputs/service", help="Directory for per-job output folders")
+    add_pipeline_flags(parser)
+    parser.add_argument("--parallel", action="store_true", help="Run each crew's tasks as a dependency graph")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream LLM tokens to <output_file>.partial and to the job event streams")
+    parser.add_argument("--review-policy", choices=[policy for policy in REVIEW_POLICIES if policy != "human"],
+                        default="auto", help="Who answers the review checkpoints (no one is at stdin)")
+    parser.add_argument("--review-feedback", help="Review feedback file for --review-policy=file")
+    args = parser.parse_args()
+
+    configure_streaming(args.stream)
+
+    started = datetime.now()
+    from game_devs.service import GDDService, make_server
+
+    try:
+        apply_pipeline_flags(args)
+        configure_review_policy(args.review_policy, args.review_feedback)
+        service = GDDService(
+            get_inputs_from_spec,
+            concurrency=args.concurrency,
+            max_queued=args.max_queued,
+            max_finished=args.max_finished,
+            output_root=args.output_root,
+            parallel=args.parallel,
+        )
+        server = make_server(service, args.host, args.port)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
+
+    print_model_info(args.production_models)
+    service.start()
+    url = f"http://{server.server_address[0]}:{server.server_address[1]}"
+    print(f"🔥 Warmed up in {(datetime.now() - started).total_seconds():.1f}s "
+          f"(crew, tools and knowledge index {service.warmup_seconds:.1f}s)")
+    print(f"🌐 GDD service listening on {url} ({args.concurrency} crew(s) at once, outputs in {args.output_root}/)")
+    print(f"   Submit a job with: curl -X POST {url}/jobs -d '{{\"game_type\": \"roguelike\"}}'")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down; running jobs are abandoned, finished outputs stay on disk")
+    finally:
+        server.server_close()
+        service.stop()
+        print_rate_limit_stats()
+        print_llm_backend_stats()
+
+def queue():
+    """Enqueue game specs, run queue workers and watch progress of the shared job queue (see job_queue.py)."""
+    from game_devs.job_queue import (
+        DEFAULT_MAX_ATTEMPTS,
+        DEFAULT_QUEUE_PATH,
+        DEFAULT_RETRY_DELAY,
+        DEFAULT_VISIBILITY_TIMEOUT,
+        JobQueue,
+        dashboard_lines,
+    )
+
+    parser = argparse.ArgumentParser(description="GameDevs CrewAI - Distributed job queue")
+    parser.add_argument("--db", default=os.getenv('JOB_QUEUE_PATH', DEFAULT_QUEUE_PATH),
+                        help=f"Queue database on storage every worker shares (default: JOB_QUEUE_PATH or {DEFAULT_QUEUE_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="Enqueue every spec of a JSONL or YAML file")
+    add.add_argument("spec_file", help="JSONL or YAML file of game specs")
+    add.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                     help=f"Attempts per job before it is given up (default: {DEFAULT_MAX_ATTEMPTS})")
+
+    work = commands.add_parser("work", help="Claim jobs and run the crew for each until stopped")
+    work.add_argument("--concurrency", type=int, default=1, help="Maximum number of crews this worker runs at once")
+    work.add_argument("--output-root", default="outputs/queue/jobs",
+                      help="Directory for per-job output folders, shared by every worker")
+    work.add_argument("--visibility-timeout", type=float, default=DEFAULT_VISIBILITY_TIMEOUT,
+                      help="Seconds without a heartbeat before another worker may take a job over")
+    work.add_argument("--retry-delay", type=float, default=DEFAULT_RETRY_DELAY,
+                      help="Seconds before a failed job is retried, doubled on every further attempt")
+    work.add_argument("--poll", type=float, default=5.0, help="Seconds between claims while the queue is empty")
+    work.add_argument("--exit-when-empty", action="store_true", help="Stop once no job is queued or running")
+    add_pipeline_flags(work)
+    work.add_argument("--parallel", action="store_true", help="Run each crew's tasks as a dependency graph")
+    work.add_argument("--review-policy", choices=[policy for policy in REVIEW_POLICIES if policy != "human"],
+                      default="auto", help="Who answers the review checkpoints (no one is at stdin)")
+    work.add_argument("--review-feedback", help="Review feedback file for --review-policy=file")
+
+    status = commands.add_parser("status", help="Show job counts, throughput, workers and recent jobs")
+    status.add_argument("--watch", type=float, help="Redraw every N seconds until Ctrl-C")
+    status.add_argument("--limit", type=int, default=15, help="Recent jobs to list (default: 15)")
+
+    retry = commands.add_parser("retry", help="Requeue failed jobs with fresh attempts")
+    retry.add_argument("job_ids", nargs="*", help="Jobs to requeue (default: every failed job)")
+    args = parser.parse_args()
+
+    try:
+        job_queue = JobQueue(args.db)
+        if args.command == "add":
+            from game_devs.batch import load_specs
+
+            specs = [get_inputs_from_spec(spec) for spec in load_specs(args.spec_file)]
+            job_ids = job_queue.enqueue(specs, max_attempts=args.max_attempts)
+            print(f"📥 Enqueued {len(job_ids)} job(s) in {args.db} (up to {args.max_attempts} attempt(s) each)")
+            for job_id in job_ids:
+                print(f"  {job_id}")
+        elif args.command == "retry":
+            requeued = job_queue.retry(args.job_ids or None)
+            print(f"🔁 Requeued {requeued} failed job(s)")
+        elif args.command == "status":
+            while True:
+                lines = dashboard_lines(job_queue, limit=args.limit)
+                if args.watch:
+                    # Clear the terminal before every redraw
+                    print(f"\033[2J\033[H🕒 {datetime.now():%H:%M:%S}")
+                print("\n".join(lines))
+                if not args.watch:
+                    break
+                try:
+                    time.sleep(args.watch)
+                except KeyboardInterrupt:
+                    break
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
+    if args.command != "work":
+        return
+
+    from game_devs.worker import QueueWorker
+
+    try:
+        apply_pipeline_flags(args)
+        configure_review_policy(args.review_policy, args.review_feedback)
+        worker = QueueWorker(
+            job_queue,
+            output_root=args.output_root,
+            concurrency=args.concurrency,
+            parallel=args.parallel,
+            visibility_timeout=args.visibility_timeout,
+            retry_delay=args.retry_delay,
+            poll_interval=args.poll,
+            exit_when_empty=args.exit_when_empty,
+        )
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
+
+    print(f"👷 Worker {worker.name} pulling from {args.db} ({args.concurrency} crew(s) at once, "
+          f"outputs in {args.output_root}/)")
+    print_model_info(args.production_models)
+    worker.run()
+    print(f"🏁 Queue drained: {worker.completed} job(s) completed, {worker.failed} given up by this worker")
+    print_rate_limit_stats()
+    print_llm_backend_stats()
+
+def validate():
+    """Validate generated GDDs against the template structure, in parallel."""
+    parser = argparse.ArgumentParser(description="GameDevs CrewAI - Validate GDD structure")
+    parser.add_argument("paths", nargs="*", default=["outputs"], help="Files or directories to validate (default: outputs)")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN, help=f"Comma-separated file name patterns inside directories (default: {DEFAULT_PATTERN})")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--json", dest="json_file", help="Write the full per-document results to a JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Print the full report for every invalid document")
+    args = parser.parse_args()
+
+    try:
+        results, elapsed = validate_paths(args.paths, pattern=args.pattern, workers=args.workers)
+    except FileNotFoundError as e:
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
+
+    if not results:
+        print(f"ℹ️  No documents matching '{args.pattern}' found in: {', '.join(args.paths)}")
+        return
+
+    print("\n".join(summary_lines(results, elapsed)))
+
+    if args.verbose:
+        for result in results:
+            if not result.is_valid:
+                print(f"\n📄 {result.path}")
+                print(result.to_report())
+
+    if args.json_file:
+        with open(args.json_file, 'w', encoding='utf-8') as file:
+            json.dump([result.to_dict() for result in results], file, indent=2)
+        print(f"📁 Results saved to: {args.json_file}")
+
+    if not all(result.is_valid for result in results):
+        sys.exit(1)
+
+def benchmark():
+    """Run a benchmark suite and append its results to the history under outputs/benchmarks/."""
+    from game_devs.benchmark import TOOL_SIZES, comparison_lines, record_results
+
+    parser = argparse.ArgumentParser(description="GameDevs CrewAI - Benchmarks")
+    parser.add_argument("suite", choices=["startup", "tools"],
+                        help="startup: import time, --help and time to first LLM call; "
+                             "tools: knowledge tool latency and memory on synthetic knowledge bases")
+    parser.add_argument("--repeats", type=int,
+                        help="Cold runs per measurement (startup, default: 5) or warm calls per tool (tools, default: 20)")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in TOOL_SIZES),
+                        help="Comma-separated knowledge base sizes in sections for the tools suite")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic knowledge bases")
+    parser.add_argument("--history", help="Results history file (default: outputs/benchmarks/<suite>.jsonl)")
+    args = parser.parse_args()
+
+    history = args.history or f"outputs/benchmarks/{args.suite}.jsonl"
+    try:
+        if args.suite == "startup":
+            from game_devs.benchmark import run_startup_benchmark
+
+            repeats = args.repeats or 5
+            print(f"⏱️  Running startup benchmark ({repeats} cold run(s) per measurement)...")
+            results, unit = run_startup_benchmark(repeats=repeats), "s"
+        else:
+            from game_devs.benchmark import run_tool_benchmark
+
+            sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+            if not sizes or min(sizes) < 1:
+                raise ValueError("--sizes must list positive section counts")
+            repeats = args.repeats or 20
+            print(f"⏱️  Running tools benchmark ({repeats} warm call(s) per tool, sizes: "
+                  f"{', '.join(f'{size:,}' for size in sizes)})...")
+            results, unit = run_tool_benchmark(sizes=sizes, repeats=repeats, seed=args.seed), "ms"
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
+
+    previous = record_results(history, args.suite, results, repeats)
+    print("\n".join(comparison_lines(results, previous, unit=unit)))
+    print(f"📁 Results appended to: {history}")
+
+def cache_stub():
+    """Serve the local Anthropic API stub that validates prompt cache markers, or run a crew against it."""
+    import subprocess
+    import tempfile
+    import threading
+
+    from game_devs.cache_stub import PromptCacheStub, make_server
+
+    parser = argparse.ArgumentParser(description="GameDevs CrewAI - Prompt cache stub")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (0 picks a free port)")
+    parser.add_argument("--min-tokens", type=int, help="Minimum cacheable prefix (default: 1024, 2048 for Haiku)")
+    parser.add_argument("--rpm", type=int, help="Requests per minute per model before answering 429 (default: unlimited)")
+    parser.add_argument("--itpm", type=int, help="Input tokens per minute per model (default: unlimited)")
+    parser.add_argument("--otpm", type=int, help="Output tokens per minute per model (default: unlimited)")
+    parser.add_argument("--overload-rate", type=float, default=0.0,
+                        help="Share of requests answered with 529 overloaded (0-1)")
+    parser.add_argument("--seed", type=int, help="Seed of the simulated overloads")
+    parser.add_argument("--check", action="store_true",
+                        help="Run an unattended crew against the stub in a scratch directory and report")
+    parser.add_argument("--unpaced", action="store_true",
+                        help="With --check, do not give the crew the stub's limits, so it runs into 429s and retries")
+    args = parser.parse_args()
+
+    stub = PromptCacheStub(
+        min_tokens=args.min_tokens, rpm=args.rpm, itpm=args.itpm, otpm=args.otpm,
+        overload_rate=args.overload_rate, seed=args.seed,
+    )
+    server = make_server(stub, args.host, 0 if args.check and args.port == 8765 else args.port)
+    url = f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+    if not args.check:
+        print(f"🧪 Prompt cache stub listening on {url}")
+        print(f"   Run the crew against it with: ANTHROPIC_API_BASE={url} ANTHROPIC_API_KEY=stub LLM_CACHE=off")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print(f"\n📊 {json.dumps(stub.stats)}")
+        return
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"🧪 Running an unattended crew against the prompt cache stub at {url}")
+    with tempfile.TemporaryDirectory(prefix="game_devs_cache_check_") as scratch:
+        if os.path.isdir("knowledge"):
+            os.symlink(os.path.abspath("knowledge"), os.path.join(scratch, "knowledge"))
+        # Paced: the crew's rate limiter knows the stub's limits; unlimited ones become budgets it never reaches
+        limits = [None, None, None] if args.unpaced else [args.rpm, args.itpm, args.otpm]
+        budget = "/".join(str(limit or 10 ** 9) for limit in limits)
+        env = dict(os.environ, ANTHROPIC_API_BASE=url, ANTHROPIC_API_KEY="stub", LLM_CACHE="off",
+                   RATE_LIMIT="on", RATE_LIMITS=f"claude={budget}")
+        returncode = subprocess.call(
+            [sys.executable, "-m", "game_devs.main", "--review-policy", "auto"], cwd=scratch, env=env
+        )
+    server.shutdown()
+
+    stats = stub.stats
+    print(f"📊 Stub: {stats['requests']} request(s), {stats['marked']} with breakpoints, "
+          f"{stats['hits']} cache hit(s), {stats['read_tokens']} tokens read, "
+          f"{stats['write_tokens']} written, {stats['rejected']} rejected, "
+          f"{stats['rate_limited']} rate limited (429), {stats['overloaded']} overloaded (529)")
+    for error in stub.errors[:10]:
+        print(f"  ❌ {error}")
+    if returncode != 0 or stats["rejected"] or not stats["marked"]:
+        print("❌ Prompt cache check failed")
+        sys.exit(1)
+    print("✅ Prompt cache markers accepted")
+
 if __name__ == "__main__":
     main()
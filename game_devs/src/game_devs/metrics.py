@@ -0,0 +1,476 @@
+"""
+Per-Task Usage Metrics for the GameDevs Crew
+
+Listens to the crewAI event bus and records, for every task of a crew, the
+input/output tokens, LLM call count and latency, tool calls, time spent
+waiting for rate limits and the cost of the run computed from `MODEL_PRICING`. Metrics are rewritten to
+`outputs/logs/metrics.json` as each task finishes, so a failed run still shows
+where its time and money went, and `summary_lines()` renders the end-of-run
+table.
+
+LLM and tool events carry no task reference. They are attributed to the task
+running on the emitting thread, which holds for sequential, parallel
+(`--parallel`) and batch runs because every task executes on a single thread.
+"""
+
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from crewai import Task
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+from crewai.utilities.events.llm_events import (
+    LLMCallCompletedEvent,
+    LLMCallFailedEvent,
+    LLMCallStartedEvent,
+    LLMStreamChunkEvent,
+)
+from crewai.utilities.events.task_events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent
+from crewai.utilities.events.tool_usage_events import ToolUsageErrorEvent, ToolUsageFinishedEvent
+
+from game_devs.checkpoints import _write_json_atomic
+from game_devs.options import MODEL_PRICING, MODEL_TIERS
+from game_devs.prompt_cache import PromptCacheUsageEvent
+from game_devs.rate_limit import RateLimitWaitEvent
+
+
+def model_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """USD cost of a token count, or None for models without a known price."""
+    pricing = MODEL_PRICING.get(model.split("/")[-1])
+    if pricing is None:
+        return None
+    input_price, output_price = pricing
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def prompt_cache_cost(model: str, read_tokens: int, write_tokens: int) -> Optional[float]:
+    """Cost difference of prompt caching: reads are billed at 10% and writes at 125% of the input price.
+
+    Cache reads are already part of the prompt tokens (priced in full by `model_cost`); cache
+    writes are not.
+    """
+    pricing = MODEL_PRICING.get(model.split("/")[-1])
+    if pricing is None:
+        return None
+    return (write_tokens * 1.25 - read_tokens * 0.9) * pricing[0] / 1_000_000
+
+
+@dataclass
+class TaskMetrics:
+    """Usage of one task execution."""
+
+    task: str
+    agent: str
+    model: str
+    # The agent's agents.yaml key ('chief_editor'); roles are rendered with the inputs
+    agent_name: str = ""
+    status: str = "running"
+    started_at: str = ""
+    duration: float = 0.0
+    # Seconds from task start to the first streamed token (streaming runs only)
+    time_to_first_token: Optional[float] = None
+    attempts: int = 1
+    llm_calls: int = 0
+    llm_latency: float = 0.0
+    prompt_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    completion_tokens: int = 0
+    tool_calls: int = 0
+    tool_errors: int = 0
+    tool_cache_hits: int = 0
+    # Estimated context tokens before/after compaction, per upstream task (see compaction.py)
+    context_tokens_full: int = 0
+    context_tokens_sent: int = 0
+    context_edges: List[Dict[str, Any]] = field(default_factory=list)
+    # Tokens spent writing context digests on the fast tier (included in cost)
+    digest_tokens: int = 0
+    # Calls with prompt cache breakpoints that read from / missed the provider's prompt cache
+    prompt_cache_hits: int = 0
+    prompt_cache_misses: int = 0
+    prompt_cache_read_tokens: int = 0
+    prompt_cache_write_tokens: int = 0
+    # Seconds queued for the shared rate limits and 429/529 retries (see rate_limit.py)
+    rate_limit_wait: float = 0.0
+    rate_limit_retries: int = 0
+    # Section drafts and stitching pass of map-reduce writing (included in the totals above)
+    map_reduce_steps: List[Dict[str, Any]] = field(default_factory=list)
+    cost: Optional[float] = None
+    _start: float = field(default=0.0, repr=False)
+    _usage_at_start: Any = field(default=None, repr=False)
+    _llm_started: float = field(default=0.0, repr=False)
+    # Model that served the current attempt (guardrail retries may switch models)
+    _attempt_model: str = field(default="", repr=False)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {key: value for key, value in asdict(self).items() if not key.startswith("_")}
+        data["total_tokens"] = self.total_tokens
+        return data
+
+
+def _agent_usage(task: Task):
+    token_process = getattr(task.agent, "_token_process", None)
+    return token_process.get_summary() if token_process else None
+
+
+class MetricsCollector:
+    """Collects `TaskMetrics` for the tasks of one crew and persists them as JSON."""
+
+    def __init__(self, path: str = "outputs/logs/metrics.json"):
+        self.path = path
+        self.records: List[TaskMetrics] = []
+        self.run_started_at: Optional[str] = None
+        self._run_start = 0.0
+        self._lock = threading.Lock()
+        # Task name -> agents.yaml key of its agent
+        self._agent_names: Dict[str, str] = {}
+
+    def track(self, tasks: List[Task], agent_names: Optional[Dict[str, str]] = None) -> None:
+        """Attribute the events of these tasks to this collector; `agent_names` maps task names to agent keys."""
+        _ensure_handlers()
+        self._agent_names.update(agent_names or {})
+        with _registry_lock:
+            for task in tasks:
+                _collectors[str(task.id)] = self
+
+    def untrack(self, tasks: List[Task]) -> None:
+        """Stop attributing events of these tasks, releasing the registry's reference to this collector."""
+        with _registry_lock:
+            for task in tasks:
+                if _collectors.get(str(task.id)) is self:
+                    del _collectors[str(task.id)]
+
+    def start_run(self) -> None:
+        self.records = []
+        self.run_started_at = datetime.now().isoformat()
+        self._run_start = time.perf_counter()
+
+    def task_started(self, task: Task) -> TaskMetrics:
+        model = getattr(getattr(task.agent, "llm", None), "model", "") or ""
+        record = TaskMetrics(
+            task=task.name or task.description[:40],
+            agent=task.agent.role.strip() if task.agent else "",
+            model=model,
+            agent_name=self._agent_names.get(task.name or "", ""),
+            started_at=datetime.now().isoformat(),
+            _start=time.perf_counter(),
+            _usage_at_start=_agent_usage(task),
+        )
+        self._record_context(record, task)
+        with self._lock:
+            self.records.append(record)
+        return record
+
+    def task_reused(self, task: Task) -> None:
+        """A task served from its checkpoint by an incremental run: no LLM calls, no cost."""
+        record = TaskMetrics(
+            task=task.name or task.description[:40],
+            agent=task.agent.role.strip() if task.agent else "",
+            model="-",
+            agent_name=self._agent_names.get(task.name or "", ""),
+            status="reused",
+            started_at=datetime.now().isoformat(),
+        )
+        with self._lock:
+            self.records.append(record)
+        self.save()
+
+    def _record_context(self, record: TaskMetrics, task: Task) -> None:
+        """Context compaction of the task's inputs, including what its digests cost."""
+        for stats in getattr(task, "compaction_stats", []):
+            record.context_edges.append(stats.to_dict())
+            record.context_tokens_full += stats.tokens_full
+            record.context_tokens_sent += stats.tokens_sent
+            record.digest_tokens += stats.digest_prompt_tokens + stats.digest_completion_tokens
+            cost = model_cost(MODEL_TIERS["fast"], stats.digest_prompt_tokens, stats.digest_completion_tokens)
+            if cost:
+                record.cost = (record.cost or 0.0) + cost
+
+    def task_retried(self, task: Task, record: TaskMetrics) -> None:
+        """A guardrail retry re-starts the task; account the previous attempt separately."""
+        self._close_attempt(task, record)
+        record.attempts += 1
+
+    def llm_started(self, record: TaskMetrics, model: str) -> None:
+        record._llm_started = time.perf_counter()
+        if model and model != record._attempt_model:
+            if record._attempt_model or record.llm_calls:
+                record.model = f"{record.model} → {model}"
+            else:
+                record.model = model
+            record._attempt_model = model
+
+    def _close_attempt(self, task: Task, record: TaskMetrics) -> None:
+        usage = _agent_usage(task)
+        start = record._usage_at_start
+        if usage is None or start is None:
+            return
+        prompt_tokens = usage.prompt_tokens - start.prompt_tokens
+        completion_tokens = usage.completion_tokens - start.completion_tokens
+        record.prompt_tokens += prompt_tokens
+        record.cached_prompt_tokens += usage.cached_prompt_tokens - start.cached_prompt_tokens
+        record.completion_tokens += completion_tokens
+        cost = model_cost(record._attempt_model or record.model, prompt_tokens, completion_tokens)
+        if cost is not None:
+            record.cost = (record.cost or 0.0) + cost
+        record._usage_at_start = usage
+
+    def prompt_cache_used(self, record: TaskMetrics, event: PromptCacheUsageEvent) -> None:
+        if event.cache_read_tokens:
+            record.prompt_cache_hits += 1
+        else:
+            record.prompt_cache_misses += 1
+        record.prompt_cache_read_tokens += event.cache_read_tokens
+        record.prompt_cache_write_tokens += event.cache_write_tokens
+        cost = prompt_cache_cost(event.model, event.cache_read_tokens, event.cache_write_tokens)
+        if cost:
+            record.cost = (record.cost or 0.0) + cost
+
+    def _record_map_reduce(self, record: TaskMetrics, task: Task) -> None:
+        """Section drafts run on worker threads, outside the agent's token accounting."""
+        steps = getattr(task, "map_reduce_stats", [])
+        if steps and not record._attempt_model:
+            record.model = steps[0].model
+        for step in steps:
+            record.map_reduce_steps.append(step.to_dict())
+            record.llm_calls += 1
+            record.llm_latency += step.duration
+            record.prompt_tokens += step.prompt_tokens
+            record.completion_tokens += step.completion_tokens
+            cost = model_cost(step.model, step.prompt_tokens, step.completion_tokens)
+            if cost is not None:
+                record.cost = (record.cost or 0.0) + cost
+
+    def task_finished(self, task: Task, record: TaskMetrics, status: str) -> None:
+        record.status = status
+        record.duration = time.perf_counter() - record._start
+        self._close_attempt(task, record)
+        self._record_map_reduce(record, task)
+        self.save()
+
+    def totals(self) -> Dict[str, Any]:
+        records = list(self.records)
+        costs = [record.cost for record in records if record.cost is not None]
+        return {
+            "tasks": len(records),
+            "llm_calls": sum(record.llm_calls for record in records),
+            "llm_latency": sum(record.llm_latency for record in records),
+            "prompt_tokens": sum(record.prompt_tokens for record in records),
+            "completion_tokens": sum(record.completion_tokens for record in records),
+            "total_tokens": sum(record.total_tokens for record in records),
+            "tool_calls": sum(record.tool_calls for record in records),
+            "context_tokens_full": sum(record.context_tokens_full for record in records),
+            "context_tokens_sent": sum(record.context_tokens_sent for record in records),
+            "digest_tokens": sum(record.digest_tokens for record in records),
+            "prompt_cache_hits": sum(record.prompt_cache_hits for record in records),
+            "prompt_cache_misses": sum(record.prompt_cache_misses for record in records),
+            "prompt_cache_read_tokens": sum(record.prompt_cache_read_tokens for record in records),
+            "prompt_cache_write_tokens": sum(record.prompt_cache_write_tokens for record in records),
+            "rate_limit_wait": sum(record.rate_limit_wait for record in records),
+            "rate_limit_retries": sum(record.rate_limit_retries for record in records),
+            "cost": sum(costs) if costs else None,
+        }
+
+    def by_agent(self) -> Dict[str, Dict[str, Any]]:
+        """Totals per agent, keyed by its agents.yaml key (its role for agents without one)."""
+        agents: Dict[str, Dict[str, Any]] = {}
+        for record in list(self.records):
+            totals = agents.setdefault(record.agent_name or record.agent, {
+                "tasks": 0, "llm_calls": 0, "llm_latency": 0.0, "total_tokens": 0, "tool_calls": 0, "cost": 0.0,
+            })
+            totals["tasks"] += 1
+            totals["llm_calls"] += record.llm_calls
+            totals["llm_latency"] += record.llm_latency
+            totals["total_tokens"] += record.total_tokens
+            totals["tool_calls"] += record.tool_calls
+            totals["cost"] += record.cost or 0.0
+        return agents
+
+    def save(self) -> None:
+        """Rewrite the metrics file with every task recorded so far."""
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            _write_json_atomic(self.path, {
+                "run_started_at": self.run_started_at,
+                "wall_clock": time.perf_counter() - self._run_start if self._run_start else None,
+                "totals": self.totals(),
+                "agents": self.by_agent(),
+                "tasks": [record.to_dict() for record in self.records],
+            })
+
+    def summary_lines(self) -> List[str]:
+        """Per-task table sorted by cost, then per-agent totals."""
+        records = sorted(self.records, key=lambda record: (record.cost or 0.0, record.duration), reverse=True)
+        lines = [
+            "💰 Task Metrics (most expensive first):",
+            f"  {'Task':<30} {'Model':<27} {'Calls':>5} {'In tok':>8} {'Out tok':>8} "
+            f"{'LLM s':>7} {'Tools':>5} {'Time s':>7} {'Cost $':>8}",
+        ]
+        for record in records:
+            cost = f"{record.cost:.4f}" if record.cost is not None else "n/a"
+            lines.append(
+                f"  {record.task[:30]:<30} {record.model.split('/')[-1][:27]:<27} {record.llm_calls:>5} "
+                f"{record.prompt_tokens:>8} {record.completion_tokens:>8} {record.llm_latency:>7.1f} "
+                f"{record.tool_calls:>5} {record.duration:>7.1f} {cost:>8}"
+            )
+
+        totals = self.totals()
+        reused = [record.task for record in records if record.status == "reused"]
+        if reused:
+            lines.append(f"  Reused from checkpoints: {', '.join(reused)}")
+        total_cost = f"${totals['cost']:.4f}" if totals["cost"] is not None else "n/a"
+        lines.append(
+            f"  Total: {totals['llm_calls']} LLM call(s), {totals['prompt_tokens']} input / "
+            f"{totals['completion_tokens']} output tokens, {totals['tool_calls']} tool call(s), cost {total_cost}"
+        )
+        if totals["context_tokens_full"]:
+            saved = totals["context_tokens_full"] - totals["context_tokens_sent"]
+            lines.append(
+                f"  Context: ≈{totals['context_tokens_sent']} of ≈{totals['context_tokens_full']} tokens sent "
+                f"(saved ≈{saved}, {saved / totals['context_tokens_full'] * 100:.0f}%), "
+                f"digests used {totals['digest_tokens']} tokens"
+            )
+        cached_calls = [record for record in records if record.prompt_cache_hits or record.prompt_cache_misses]
+        if cached_calls:
+            lines.append(
+                f"  Prompt cache: {totals['prompt_cache_hits']} hit(s), {totals['prompt_cache_misses']} miss(es), "
+                f"{totals['prompt_cache_read_tokens']} tokens read, {totals['prompt_cache_write_tokens']} written"
+            )
+            for record in cached_calls:
+                lines.append(
+                    f"    {record.task[:30]:<30} {record.prompt_cache_hits:>3} hit(s) {record.prompt_cache_misses:>3} "
+                    f"miss(es) {record.prompt_cache_read_tokens:>8} read {record.prompt_cache_write_tokens:>8} written"
+                )
+        if totals["rate_limit_wait"] or totals["rate_limit_retries"]:
+            waited = ", ".join(
+                f"{record.task} {record.rate_limit_wait:.1f}s" for record in records if record.rate_limit_wait
+            )
+            lines.append(
+                f"  Rate limits: {totals['rate_limit_wait']:.1f}s queued ({waited or 'none'}), "
+                f"{totals['rate_limit_retries']} 429/529 retr{'y' if totals['rate_limit_retries'] == 1 else 'ies'}"
+            )
+        for agent, agent_totals in sorted(self.by_agent().items(), key=lambda item: -item[1]["cost"]):
+            lines.append(
+                f"  {agent:<24} {agent_totals['tasks']} task(s), {agent_totals['total_tokens']} tokens, "
+                f"{agent_totals['llm_latency']:.1f}s LLM, ${agent_totals['cost']:.4f}"
+            )
+        lines.append(f"  Saved to: {self.path}")
+        return lines
+
+
+# Task id -> collector, shared by every crew in the process (batch runs many)
+_collectors: Dict[str, MetricsCollector] = {}
+_registry_lock = threading.Lock()
+_handlers_registered = False
+# The task metrics record of the task running on this thread
+_current = threading.local()
+
+
+def record_reused(task: Task) -> None:
+    """Record a reused task with the collector tracking it, if any."""
+    collector = _collectors.get(str(task.id))
+    if collector is not None:
+        collector.task_reused(task)
+
+
+def _current_record() -> Optional[TaskMetrics]:
+    return getattr(_current, "record", None)
+
+
+def _on_task_started(source: Any, event: TaskStartedEvent) -> None:
+    task = event.task or source
+    record, collector = _current_record(), getattr(_current, "collector", None)
+    if record is not None and collector is not None and getattr(_current, "task", None) is task:
+        collector.task_retried(task, record)
+        return
+
+    collector = _collectors.get(str(getattr(task, "id", "")))
+    _current.record = collector.task_started(task) if collector else None
+    _current.collector = collector
+    _current.task = task
+
+
+def _on_task_finished(source: Any, event: Any) -> None:
+    record, collector = _current_record(), getattr(_current, "collector", None)
+    if record is None or collector is None:
+        return
+    status = "failed" if isinstance(event, TaskFailedEvent) else "completed"
+    collector.task_finished(event.task or source, record, status)
+    _current.record = None
+    _current.collector = None
+    _current.task = None
+
+
+def _on_llm_started(source: Any, event: LLMCallStartedEvent) -> None:
+    record, collector = _current_record(), getattr(_current, "collector", None)
+    if record is not None and collector is not None:
+        collector.llm_started(record, getattr(source, "model", "") or "")
+
+
+def _on_llm_finished(source: Any, event: Any) -> None:
+    record = _current_record()
+    if record is not None and record._llm_started:
+        record.llm_calls += 1
+        record.llm_latency += time.perf_counter() - record._llm_started
+        record._llm_started = 0.0
+
+
+def _on_stream_chunk(source: Any, event: LLMStreamChunkEvent) -> None:
+    record = _current_record()
+    if record is not None and record.time_to_first_token is None:
+        record.time_to_first_token = time.perf_counter() - record._start
+
+
+def _on_prompt_cache_usage(source: Any, event: PromptCacheUsageEvent) -> None:
+    record, collector = _current_record(), getattr(_current, "collector", None)
+    if record is not None and collector is not None:
+        collector.prompt_cache_used(record, event)
+
+
+def _on_rate_limit_wait(source: Any, event: RateLimitWaitEvent) -> None:
+    record = _current_record()
+    if record is not None:
+        record.rate_limit_wait += event.waited
+        record.rate_limit_retries += event.retries
+
+
+def _on_tool_finished(source: Any, event: ToolUsageFinishedEvent) -> None:
+    record = _current_record()
+    if record is not None:
+        record.tool_calls += 1
+        record.tool_cache_hits += int(event.from_cache)
+
+
+def _on_tool_error(source: Any, event: ToolUsageErrorEvent) -> None:
+    record = _current_record()
+    if record is not None:
+        record.tool_calls += 1
+        record.tool_errors += 1
+
+
+def _ensure_handlers() -> None:
+    """Register the event handlers once per process; the event bus has no unregister."""
+    global _handlers_registered
+    with _registry_lock:
+        if _handlers_registered:
+            return
+        crewai_event_bus.register_handler(TaskStartedEvent, _on_task_started)
+        crewai_event_bus.register_handler(TaskCompletedEvent, _on_task_finished)
+        crewai_event_bus.register_handler(TaskFailedEvent, _on_task_finished)
+        crewai_event_bus.register_handler(LLMCallStartedEvent, _on_llm_started)
+        crewai_event_bus.register_handler(LLMCallCompletedEvent, _on_llm_finished)
+        crewai_event_bus.register_handler(LLMCallFailedEvent, _on_llm_finished)
+        crewai_event_bus.register_handler(LLMStreamChunkEvent, _on_stream_chunk)
+        crewai_event_bus.register_handler(PromptCacheUsageEvent, _on_prompt_cache_usage)
+        crewai_event_bus.register_handler(RateLimitWaitEvent, _on_rate_limit_wait)
+        crewai_event_bus.register_handler(ToolUsageFinishedEvent, _on_tool_finished)
+        crewai_event_bus.register_handler(ToolUsageErrorEvent, _on_tool_error)
+        _handlers_registered = True
@@ -0,0 +1,37 @@
+"""
+Option Tables for the GameDevs Crew
+
+Review policies, LLM backends, model tiers, prices and rate limits used by both the command line
+and the crew modules. Kept free of crewAI imports so `main.py` can build its
+argument parser and answer `--help` without loading crewAI and litellm.
+"""
+
+from typing import Dict, Tuple
+
+REVIEW_TASKS = ("pitch_review_task", "gameplay_review_task", "final_gdd_review_task")
+
+REVIEW_POLICIES = ("human", "auto", "file", "llm")
+
+# Where LLM calls are answered from (see llm_backend.py)
+LLM_BACKENDS = ("live", "record", "replay")
+
+DEFAULT_RECORDING_PATH = "outputs/recordings/llm_calls.jsonl"
+
+# Model tiers selectable per task with `model_tier` / `escalation_tier` in tasks.yaml
+MODEL_TIERS: Dict[str, str] = {
+    "fast": "claude-3-5-haiku-20241022",
+    "strong": "claude-3-5-sonnet-20241022",
+}
+
+# USD per million (input, output) tokens
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "claude-3-5-haiku-20241022": (0.80, 4.00),
+    "claude-3-5-sonnet-20241022": (3.00, 15.00),
+}
+
+# Per-minute (requests, input tokens, output tokens) budgets, matched against model names
+# (see rate_limit.py); Anthropic's tier 1 limits, override with RATE_LIMITS
+MODEL_RATE_LIMITS: Dict[str, Tuple[int, int, int]] = {
+    "haiku": (50, 50_000, 10_000),
+    "sonnet": (50, 40_000, 8_000),
+}
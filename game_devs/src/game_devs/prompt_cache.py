@@ -0,0 +1,120 @@
+"""
+Provider-Side Prompt Caching for the GameDevs Crew
+
+Every call of a crewAI agent starts with the same prefix: the agent's system
+prompt (role, goal, backstory, tool descriptions and answer format), then the
+task prompt (description and expected output before the upstream context),
+then the growing scratchpad of the agent loop, which includes template text
+pulled in by the knowledge tools. `GameDevsLLM` marks that prefix for
+Anthropic prompt caching with `cache_control` breakpoints:
+
+- the system prompt, which is shared by every task and call of an agent
+- the latest message once a conversation has assistant turns, so each
+  iteration of the agent loop reads the previous iteration's prefix from
+  the cache
+
+Cache writes cost 25% more than plain input tokens and reads 90% less, so a
+task prompt sent only once is not marked. Anthropic ignores breakpoints on
+prefixes shorter than the model's minimum (1024 tokens for Sonnet, 2048 for
+Haiku).
+
+Usage reported by the provider is emitted as a `PromptCacheUsageEvent` after
+each call; the run metrics turn it into per-task hit/miss counts and price
+cache reads and writes. Set PROMPT_CACHE=off to send unmarked prompts.
+Run `cache_stub` to exercise the markers against a local stand-in for the
+Anthropic API (see cache_stub.py).
+"""
+
+import copy
+import os
+from typing import Any, Dict, List
+
+from crewai.utilities.events.base_events import BaseEvent
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+from litellm.integrations.custom_logger import CustomLogger
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# Anthropic accepts at most this many cache_control blocks per request
+MAX_BREAKPOINTS = 4
+
+
+def prompt_caching_enabled() -> bool:
+    return os.getenv('PROMPT_CACHE', 'on').lower() != 'off'
+
+
+class PromptCacheUsageEvent(BaseEvent):
+    """Prompt cache usage of one LLM call, as reported by the provider."""
+
+    type: str = "prompt_cache_usage"
+    model: str
+    breakpoints: int
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+
+
+def _mark(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a message whose last content block carries a cache breakpoint."""
+    marked = dict(message)
+    content = message.get("content")
+    if isinstance(content, str):
+        marked["content"] = [{"type": "text", "text": content, "cache_control": dict(CACHE_CONTROL)}]
+    elif isinstance(content, list) and content:
+        blocks = copy.deepcopy(content)
+        blocks[-1]["cache_control"] = dict(CACHE_CONTROL)
+        marked["content"] = blocks
+    return marked
+
+
+def count_breakpoints(messages: List[Dict[str, Any]]) -> int:
+    count = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list):
+            count += sum(1 for block in content if isinstance(block, dict) and "cache_control" in block)
+    return count
+
+
+def mark_cache_breakpoints(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Messages with cache breakpoints after the system prompt and, in multi-turn calls, the latest message."""
+    marked = list(messages)
+    positions = []
+    system = [index for index, message in enumerate(marked) if message.get("role") == "system"]
+    if system:
+        positions.append(system[-1])
+    if any(message.get("role") == "assistant" for message in marked) and marked[-1].get("role") != "system":
+        positions.append(len(marked) - 1)
+
+    for index in positions[:MAX_BREAKPOINTS - count_breakpoints(marked)]:
+        if marked[index].get("content"):
+            marked[index] = _mark(marked[index])
+    return marked
+
+
+def _usage_value(usage: Any, key: str) -> int:
+    value = usage.get(key) if isinstance(usage, dict) else getattr(usage, key, None)
+    return int(value or 0)
+
+
+class PromptCacheUsage(CustomLogger):
+    """Success callback that reports the prompt cache usage of a call.
+
+    Like crewAI's token counter, it only handles the usage dict crewAI passes after
+    the call; litellm's own logging (with a response object) is ignored.
+    """
+
+    def __init__(self, source: Any, model: str, breakpoints: int):
+        self.source = source
+        self.model = model
+        self.breakpoints = breakpoints
+
+    def log_success_event(self, kwargs: Dict[str, Any], response_obj: Dict[str, Any], start_time: Any, end_time: Any) -> None:
+        usage = response_obj.get("usage") if isinstance(response_obj, dict) else None
+        if usage is None:
+            return
+        crewai_event_bus.emit(self.source, event=PromptCacheUsageEvent(
+            model=self.model,
+            breakpoints=self.breakpoints,
+            cache_read_tokens=_usage_value(usage, "cache_read_input_tokens"),
+            cache_write_tokens=_usage_value(usage, "cache_creation_input_tokens"),
+        ))
@@ -0,0 +1,394 @@
+"""
+Shared Rate Limiting for Claude Calls
+
+Every crew in the process (batch runs, `--parallel` waves, map-reduce section
+drafts, context digests) spends the same Anthropic rate limits, which are set
+per model. Before a call goes to the provider, `GameDevsLLM` takes its share
+from three token buckets of the call's model:
+
+- requests per minute
+- input tokens per minute, estimated from the prompt (four characters per token,
+  calibrated by the usage reported so far, plus a little headroom)
+- output tokens per minute, reserved at the model's average answer so far
+  (capped by max_tokens)
+
+Both estimates are corrected with the reported usage once the call returns.
+Buckets start full and refill continuously, so short bursts go through at once.
+
+Calls that have to wait queue per model by priority, then arrival. Priorities
+come from the task graph of each crew: tasks on its critical path (no slack)
+go first and, among them, the ones with the most work still behind them, so
+a batch finishes sooner than with first-come-first-served and off-path work
+never delays the path that sets the run's duration.
+
+A 429 (rate limited) or 529 (overloaded) answer pauses the model's queue for
+the `retry-after` the API asks for, or an exponential backoff with full jitter
+when it gives none, and the call is retried up to RATE_LIMIT_RETRIES times.
+Pausing the queue makes every concurrent call back off together instead of
+retrying in lockstep.
+
+Budgets come from MODEL_RATE_LIMITS (options.py) and can be overridden with
+RATE_LIMITS, e.g. `haiku=50/50000/10000,sonnet=50/40000/8000` (requests / input
+tokens / output tokens per minute, matched against the model name).
+RATE_LIMIT=off disables limiting and retries.
+"""
+
+import heapq
+import itertools
+import math
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from crewai.utilities.events.base_events import BaseEvent
+
+from game_devs.options import MODEL_RATE_LIMITS
+
+DEFAULT_MAX_RETRIES = 6
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+# Output reserved for the first call of a model, before any answer length is known
+INITIAL_OUTPUT_RESERVATION = 1024
+# Headroom on input estimates, so a call sent as soon as the bucket allows is not refused
+ESTIMATE_HEADROOM = 0.05
+
+RETRYABLE_STATUS = {429: "rate_limited", 529: "overloaded"}
+
+# (slack, -remaining tasks): lower runs first; calls outside a task use the default
+Priority = Tuple[int, int]
+DEFAULT_PRIORITY: Priority = (0, 0)
+
+current_priority: ContextVar[Priority] = ContextVar("game_devs_llm_priority", default=DEFAULT_PRIORITY)
+
+
+class RateLimitWaitEvent(BaseEvent):
+    """Time a call spent waiting for its model's rate limits, and the retries it needed."""
+
+    type: str = "rate_limit_wait"
+    model: str
+    waited: float = 0.0
+    retries: int = 0
+    queue_depth: int = 0
+
+
+@dataclass
+class ModelBudget:
+    """Per-minute limits of one model."""
+
+    requests: int
+    input_tokens: int
+    output_tokens: int
+
+    @classmethod
+    def parse(cls, value: str) -> "ModelBudget":
+        parts = value.split("/")
+        if len(parts) != 3:
+            raise ValueError(f"Rate limit '{value}' must be requests/input tokens/output tokens per minute")
+        budget = cls(*(int(float(part)) for part in parts))
+        if min(budget.requests, budget.input_tokens, budget.output_tokens) <= 0:
+            raise ValueError(f"Rate limit '{value}' must be positive")
+        return budget
+
+
+def parse_rate_limits(spec: str) -> Dict[str, ModelBudget]:
+    """`pattern=requests/input/output,...` as budgets keyed by model name pattern."""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        pattern, _, value = item.partition("=")
+        if not value:
+            raise ValueError(f"Rate limit '{item}' must look like model=requests/input/output")
+        budgets[pattern.strip()] = ModelBudget.parse(value.strip())
+    return budgets
+
+
+def critical_path_priorities(graph: Dict[str, List[str]]) -> Dict[str, Priority]:
+    """Priority of each task of a dependency graph (task -> tasks it depends on), one unit of work per task."""
+    finish: Dict[str, int] = {}
+    remaining: Dict[str, int] = {}
+    dependents: Dict[str, List[str]] = {name: [] for name in graph}
+    for name, dependencies in graph.items():
+        for dependency in dependencies:
+            dependents.setdefault(dependency, []).append(name)
+
+    def earliest_finish(name: str) -> int:
+        if name not in finish:
+            finish[name] = 1 + max((earliest_finish(dep) for dep in graph.get(name, [])), default=0)
+        return finish[name]
+
+    def work_left(name: str) -> int:
+        if name not in remaining:
+            remaining[name] = 1 + max((work_left(dep) for dep in dependents.get(name, [])), default=0)
+        return remaining[name]
+
+    length = max((earliest_finish(name) for name in graph), default=0)
+    return {
+        name: (length - (earliest_finish(name) + work_left(name) - 1), -work_left(name))
+        for name in graph
+    }
+
+
+def status_of(error: BaseException) -> Optional[int]:
+    """429 or 529 when the error is a rate limit or overload answer worth retrying."""
+    status = getattr(error, "status_code", None)
+    if status in RETRYABLE_STATUS:
+        return status
+    # litellm maps 529 (and overloaded_error bodies) to a generic 500 InternalServerError
+    if "overloaded" in str(error).lower():
+        return 529
+    return None
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the API asked to wait before retrying, if it said."""
+    for headers in (getattr(error, "litellm_response_headers", None),
+                    getattr(getattr(error, "response", None), "headers", None)):
+        value = headers.get("retry-after") if headers else None
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def backoff_delay(attempt: int, rng: random.Random = random) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (0-based)."""
+    return rng.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+class TokenBucket:
+    """Continuously refilled bucket holding up to one minute of budget."""
+
+    def __init__(self, per_minute: float, now: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available; more than the capacity waits for a full bucket."""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float, now: float) -> None:
+        """Remove `amount` (negative gives it back); the level may go below zero as debt."""
+        self._refill(now)
+        self.level = min(self.capacity, self.level - amount)
+
+
+@dataclass
+class Ticket:
+    """A granted call: what it reserved and how long it waited."""
+
+    model: str
+    estimated_input: int
+    input_tokens: int
+    output_tokens: int
+    priority: Priority
+    order: int
+    waited: float = 0.0
+    queue_depth: int = 0
+
+
+class ModelLimiter:
+    """Priority queue in front of the request, input and output token buckets of one model."""
+
+    def __init__(self, model: str, budget: ModelBudget):
+        now = time.monotonic()
+        self.model = model
+        self.budget = budget
+        self.requests = TokenBucket(budget.requests, now)
+        self.input_tokens = TokenBucket(budget.input_tokens, now)
+        self.output_tokens = TokenBucket(budget.output_tokens, now)
+        self._queue: List[Tuple[Priority, int]] = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._paused_until = 0.0
+        self._answered = 0
+        self._answer_tokens = 0
+        self._input_estimated = 0
+        self._input_reported = 0
+        self.counters = {
+            "calls": 0, "waited_calls": 0, "wait_seconds": 0.0, "max_wait": 0.0,
+            "max_queue_depth": 0, "queue_depth_total": 0, "rate_limited": 0, "overloaded": 0, "retries": 0,
+        }
+
+    def output_reservation(self, max_tokens: Optional[int]) -> int:
+        """Output reserved up front: the average answer so far, capped by max_tokens."""
+        with self._cond:
+            average = self._answer_tokens // self._answered if self._answered else INITIAL_OUTPUT_RESERVATION
+        return min(average, max_tokens) if max_tokens else average
+
+    def _input_reservation(self, estimate: int) -> int:
+        ratio = self._input_reported / self._input_estimated if self._input_estimated else 1.0
+        return math.ceil(estimate * ratio * (1 + ESTIMATE_HEADROOM))
+
+    def _wait_time(self, ticket: Ticket, now: float) -> float:
+        return max(
+            self._paused_until - now,
+            self.requests.wait_time(1, now),
+            self.input_tokens.wait_time(ticket.input_tokens, now),
+            self.output_tokens.wait_time(ticket.output_tokens, now),
+        )
+
+    def acquire(self, input_tokens: int, output_tokens: int, priority: Priority = DEFAULT_PRIORITY,
+                order: Optional[int] = None) -> Ticket:
+        """Block until the call may go out; only the head of the queue takes from the buckets.
+
+        `input_tokens` is the rough estimate of the prompt. A retry passes its first ticket's `order`
+        to keep its place among calls of the same priority.
+        """
+        with self._cond:
+            ticket = Ticket(self.model, input_tokens, self._input_reservation(input_tokens), output_tokens,
+                            priority, next(self._order) if order is None else order)
+            entry = (priority, ticket.order)
+            heapq.heappush(self._queue, entry)
+            # Calls queued ahead of this one
+            ticket.queue_depth = len(self._queue) - 1
+            self.counters["max_queue_depth"] = max(self.counters["max_queue_depth"], ticket.queue_depth)
+            self.counters["queue_depth_total"] += ticket.queue_depth
+            start = time.monotonic()
+            while True:
+                now = time.monotonic()
+                if self._queue[0] == entry:
+                    wait = self._wait_time(ticket, now)
+                    if wait <= 0:
+                        break
+                    self._cond.wait(timeout=wait)
+                else:
+                    self._cond.wait()
+
+            heapq.heappop(self._queue)
+            self.requests.take(1, now)
+            self.input_tokens.take(ticket.input_tokens, now)
+            self.output_tokens.take(output_tokens, now)
+            ticket.waited = now - start
+            self.counters["calls"] += 1
+            if ticket.waited > 0.001:
+                self.counters["waited_calls"] += 1
+                self.counters["wait_seconds"] += ticket.waited
+                self.counters["max_wait"] = max(self.counters["max_wait"], ticket.waited)
+            # The next caller in line recomputes its wait
+            self._cond.notify_all()
+            return ticket
+
+    def settle(self, ticket: Ticket, input_tokens: Optional[int], output_tokens: Optional[int]) -> None:
+        """Correct a ticket's reservations with what the call used (None keeps the reservation)."""
+        with self._cond:
+            now = time.monotonic()
+            if input_tokens is not None:
+                self.input_tokens.take(input_tokens - ticket.input_tokens, now)
+                self._input_estimated += ticket.estimated_input
+                self._input_reported += input_tokens
+            if output_tokens is not None:
+                self.output_tokens.take(output_tokens - ticket.output_tokens, now)
+                self._answered += 1
+                self._answer_tokens += output_tokens
+            self._cond.notify_all()
+
+    def refund(self, ticket: Ticket) -> None:
+        """Give back the reservations of a call the API refused."""
+        with self._cond:
+            now = time.monotonic()
+            self.input_tokens.take(-ticket.input_tokens, now)
+            self.output_tokens.take(-ticket.output_tokens, now)
+            self._cond.notify_all()
+
+    def back_off(self, status: int, delay: float) -> None:
+        """Pause every call of this model after a 429/529 answer."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self.counters[RETRYABLE_STATUS[status]] += 1
+            self.counters["retries"] += 1
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            counters = dict(self.counters)
+            counters["queue_depth"] = len(self._queue)
+        arrivals = counters["calls"] + counters["queue_depth"]
+        counters["mean_queue_depth"] = counters.pop("queue_depth_total") / arrivals if arrivals else 0.0
+        return counters
+
+
+class RateLimiter:
+    """One `ModelLimiter` per model, with budgets matched by model name."""
+
+    def __init__(self, budgets: Dict[str, ModelBudget], max_retries: int = DEFAULT_MAX_RETRIES):
+        self.budgets = budgets
+        self.max_retries = max_retries
+        self._limiters: Dict[str, ModelLimiter] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        """Budgets from MODEL_RATE_LIMITS, overridden by RATE_LIMITS; retries from RATE_LIMIT_RETRIES."""
+        budgets = {pattern: ModelBudget(*limits) for pattern, limits in MODEL_RATE_LIMITS.items()}
+        budgets.update(parse_rate_limits(os.getenv('RATE_LIMITS', '')))
+        return cls(budgets, max_retries=int(os.getenv('RATE_LIMIT_RETRIES', DEFAULT_MAX_RETRIES)))
+
+    def budget_for(self, model: str) -> Optional[ModelBudget]:
+        """The budget of the longest pattern contained in the model name (provider prefix ignored)."""
+        name = model.split("/")[-1]
+        matches = [pattern for pattern in self.budgets if pattern in name]
+        return self.budgets[max(matches, key=len)] if matches else None
+
+    def for_model(self, model: str) -> Optional[ModelLimiter]:
+        """The shared limiter of a model, or None for models without a budget."""
+        with self._lock:
+            if model not in self._limiters:
+                budget = self.budget_for(model)
+                if budget is None:
+                    return None
+                self._limiters[model] = ModelLimiter(model, budget)
+            return self._limiters[model]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {model: limiter.stats() for model, limiter in limiters.items()}
+
+
+def rate_limiting_enabled() -> bool:
+    return os.getenv('RATE_LIMIT', 'on').lower() != 'off'
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Process-wide rate limiter shared by every LLM, or None when RATE_LIMIT=off."""
+    global _shared_limiter
+    if not rate_limiting_enabled():
+        return None
+
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter.from_env()
+        return _shared_limiter
+
+
+def summary_lines(stats: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Per-model waits, queue depth and 429/529 retries."""
+    lines = []
+    for model, counters in stats.items():
+        if not counters["calls"]:
+            continue
+        lines.append(
+            f"🚦 Rate limits {model.split('/')[-1]}: {counters['calls']} call(s), "
+            f"{counters['waited_calls']} waited {counters['wait_seconds']:.1f}s (max {counters['max_wait']:.1f}s), "
+            f"queue depth max {counters['max_queue_depth']} / mean {counters['mean_queue_depth']:.1f}, "
+            f"{counters['rate_limited']} × 429, {counters['overloaded']} × 529, {counters['retries']} retries"
+        )
+    return lines
@@ -0,0 +1,113 @@
+"""
+Review Policies for the GameDevs Crew
+
+`pitch_review_task`, `gameplay_review_task` and `final_gdd_review_task` pause for
+human input by default. A review policy decides who answers those checkpoints
+so runs can go end to end unattended (batch, CI) while still producing the
+review artifacts the refinement tasks consume as context:
+
+- human:   prompt on stdin (the default workflow)
+- auto:    approve every stage as-is without calling the LLM
+- file:    use reviewer feedback loaded from a per-run YAML/JSON file
+- llm:     let the Chief Editor agent write the review itself
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Union
+
+import yaml
+from crewai import Agent, Task
+from crewai.llms.base_llm import BaseLLM
+
+from game_devs.options import REVIEW_POLICIES, REVIEW_TASKS
+
+AUTO_APPROVAL = (
+    "Approval status: APPROVED\n\n"
+    "The reviewer approved this stage without requested changes. Keep the current direction, "
+    "polish wording where needed and carry the content forward unchanged in substance."
+)
+
+
+class ScriptedReviewLLM(BaseLLM):
+    """Stand-in LLM that answers with a fixed review instead of calling a model."""
+
+    def __init__(self, review: str):
+        super().__init__(model="scripted-review")
+        self.review = review
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        return f"Thought: The review for this stage is already decided.\nFinal Answer: {self.review}"
+
+
+def load_review_feedback(path: str) -> Dict[str, str]:
+    """Load reviewer feedback keyed by review task name (or `default`) from YAML or JSON."""
+    with open(path, 'r', encoding='utf-8') as file:
+        data = json.load(file) if path.endswith(".json") else yaml.safe_load(file)
+
+    if not isinstance(data, dict):
+        raise ValueError(f"Review feedback file {path} must map review task names to feedback")
+
+    unknown = set(data) - set(REVIEW_TASKS) - {"default"}
+    if unknown:
+        raise ValueError(f"Unknown review task(s) in {path}: {', '.join(sorted(unknown))}")
+
+    return {name: str(feedback).strip() for name, feedback in data.items()}
+
+
+class ReviewPolicy:
+    """Configures the review tasks of a crew for one review mode."""
+
+    def __init__(self, mode: str = "human", feedback: Optional[Dict[str, str]] = None):
+        if mode not in REVIEW_POLICIES:
+            raise ValueError(f"Unknown review policy '{mode}'. Choose from: {', '.join(REVIEW_POLICIES)}")
+        if mode == "file" and not feedback:
+            raise ValueError("The 'file' review policy requires a feedback file")
+        self.mode = mode
+        self.feedback = feedback or {}
+
+    @classmethod
+    def from_env(cls) -> "ReviewPolicy":
+        """Build the policy selected by REVIEW_POLICY and REVIEW_FEEDBACK_FILE."""
+        mode = os.getenv('REVIEW_POLICY', 'human').lower()
+        feedback_file = os.getenv('REVIEW_FEEDBACK_FILE')
+        feedback = load_review_feedback(feedback_file) if feedback_file else None
+        return cls(mode, feedback)
+
+    @property
+    def unattended(self) -> bool:
+        return self.mode != "human"
+
+    def review_for(self, task_name: str) -> str:
+        """Scripted review text for a task under the auto/file policies."""
+        if self.mode == "file":
+            return self.feedback.get(task_name) or self.feedback.get("default") or AUTO_APPROVAL
+        return AUTO_APPROVAL
+
+    def apply(self, task: Task, task_name: str) -> Task:
+        """Adjust a review task in place according to the policy and return it."""
+        if self.mode == "human":
+            return task
+
+        task.human_input = False
+        if self.mode == "llm":
+            # The task's own agent (Chief Editor) acts as the reviewer
+            return task
+
+        stage = task_name.replace("_task", "").replace("_", " ").title()
+        task.agent = Agent(
+            role=f"{{game}} {stage} Reviewer",
+            goal="Deliver the scripted review for this stage verbatim.",
+            backstory="Stands in for the human reviewer during unattended runs.",
+            llm=ScriptedReviewLLM(self.review_for(task_name)),
+            tools=[],
+            allow_delegation=False,
+            verbose=True,
+        )
+        return task
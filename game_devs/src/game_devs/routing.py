@@ -0,0 +1,207 @@
+"""
+Per-Task Model Routing for the GameDevs Crew
+
+Tasks choose a model tier in tasks.yaml instead of inheriting their agent's
+model:
+
+    model_tier: fast          # fast (Haiku) or strong (Sonnet)
+    escalation_tier: strong   # optional: re-run on this tier if the GDD is incomplete
+
+The router swaps the agent's LLM as each task starts (keeping the agent's
+temperature and token limit), so reviews and refinements run on the cheap
+model while document integration runs on the stronger one. Tasks without a
+tier use the agent's default model, which `USE_PRODUCTION_MODELS` still
+controls. With an escalation tier, the task output is checked with the template
+validator (a structured GDD by its list of sections, see schemas.py); if
+required sections are missing the task is retried once on the escalation tier
+with the validation report as feedback. Each kickoff starts on the task's own
+tier again.
+
+Set MODEL_ROUTING=off (or pass --no-model-routing) to run every task on its
+agent's default model.
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+from crewai.utilities.events.task_events import TaskStartedEvent
+
+from game_devs.llm import GameDevsLLM
+from game_devs.llm_cache import LLMResponseCache
+from game_devs.options import MODEL_TIERS
+from game_devs.schemas import GDD
+from game_devs.validation import get_validator
+
+
+@dataclass
+class TaskRoute:
+    """Model selection of one task."""
+
+    base_llm: GameDevsLLM
+    tier: Optional[str] = None
+    escalation_tier: Optional[str] = None
+    escalated: bool = False
+
+    @property
+    def active_tier(self) -> Optional[str]:
+        return self.escalation_tier if self.escalated else self.tier
+
+
+class ModelRouter:
+    """Applies the `model_tier` / `escalation_tier` keys of tasks.yaml to a crew's tasks."""
+
+    def __init__(self, response_cache: Optional[LLMResponseCache] = None, enabled: bool = True):
+        self.response_cache = response_cache
+        self.enabled = enabled
+        self._routes: Dict[str, TaskRoute] = {}
+        self._llms: Dict[Tuple[str, Any, Any, bool], GameDevsLLM] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, response_cache: Optional[LLMResponseCache] = None) -> "ModelRouter":
+        """Build a router enabled unless MODEL_ROUTING=off."""
+        return cls(response_cache, enabled=os.getenv('MODEL_ROUTING', 'on').lower() != 'off')
+
+    def _tier(self, task_name: str, config: Dict[str, Any], key: str) -> Optional[str]:
+        tier = config.get(key)
+        if tier is not None and tier not in MODEL_TIERS:
+            raise ValueError(
+                f"Unknown {key} '{tier}' for {task_name}. Choose from: {', '.join(MODEL_TIERS)}"
+            )
+        return tier
+
+    def llm_for(self, tier: str, base_llm: GameDevsLLM) -> GameDevsLLM:
+        """LLM for a tier with the sampling settings of the agent's own LLM, built once."""
+        model = MODEL_TIERS[tier]
+        if model == base_llm.model:
+            return base_llm
+
+        key = (model, base_llm.temperature, base_llm.max_tokens, base_llm.stream)
+        with self._lock:
+            if key not in self._llms:
+                self._llms[key] = GameDevsLLM(
+                    model=model,
+                    temperature=base_llm.temperature,
+                    max_tokens=base_llm.max_tokens,
+                    stream=base_llm.stream,
+                    response_cache=self.response_cache,
+                )
+            return self._llms[key]
+
+    def route(self, task: Task, config: Dict[str, Any]) -> Task:
+        """Register a task's tiers and attach the escalation check if it declares one."""
+        tier = self._tier(task.name, config, 'model_tier')
+        escalation_tier = self._tier(task.name, config, 'escalation_tier')
+
+        # Scripted reviewers (unattended review policies) never call a model
+        if not self.enabled or not isinstance(task.agent.llm, GameDevsLLM):
+            return task
+
+        _ensure_handler()
+        self._routes[str(task.id)] = TaskRoute(task.agent.llm, tier, escalation_tier)
+        with _registry_lock:
+            _routers[str(task.id)] = self
+
+        if escalation_tier:
+            # A plain function: crewAI reads the guardrail's source for its events
+            def check_structure(output: TaskOutput) -> Tuple[bool, Any]:
+                return self._check_structure(task, output)
+
+            task.guardrail = check_structure
+            task.max_retries = 1
+            task.ensure_guardrail_is_callable()
+        return task
+
+    def untrack(self, tasks: List[Task]) -> None:
+        """Forget the routes of these tasks once their crew will not run again."""
+        with _registry_lock:
+            for task in tasks:
+                self._routes.pop(str(task.id), None)
+                if _routers.get(str(task.id)) is self:
+                    del _routers[str(task.id)]
+
+    def model_for(self, task: Task) -> str:
+        """Model a task starts on: its tier's model, or its agent's own model."""
+        route = self._routes.get(str(task.id))
+        if route is None or not route.tier:
+            return getattr(getattr(task.agent, "llm", None), "model", "") or ""
+        return MODEL_TIERS[route.tier]
+
+    def start_run(self, tasks: List[Task]) -> None:
+        """Give routed tasks a fresh retry budget; crewAI keeps `retry_count` across kickoffs."""
+        for task in tasks:
+            if str(task.id) in self._routes:
+                task.retry_count = 0
+
+    def apply(self, task: Task) -> None:
+        """Point the task's agent at the model of the task's current tier."""
+        route = self._routes.get(str(task.id))
+        if route is None or task.agent is None:
+            return
+        if task.retry_count == 0:
+            # First attempt: an escalation of an earlier kickoff (train, test, warm crews) is over
+            route.escalated = False
+        tier = route.active_tier
+        task.agent.llm = self.llm_for(tier, route.base_llm) if tier else route.base_llm
+
+    def _check_structure(self, task: Task, output: TaskOutput) -> Tuple[bool, Any]:
+        """Guardrail: escalate once to the stronger tier when required GDD sections are missing.
+
+        A kept output is returned as the TaskOutput itself: a string would be parsed
+        into the task's output schema again.
+        """
+        try:
+            if isinstance(output.pydantic, GDD):
+                result = output.pydantic.validate_structure()
+            else:
+                result = get_validator().validate(output.raw)
+        except FileNotFoundError as e:
+            print(f"⚠️  {task.name}: cannot check template structure ({e}); keeping the output")
+            return True, output
+
+        route = self._routes[str(task.id)]
+        if not result.missing_sections:
+            return True, output
+
+        current_model = task.agent.llm.model
+        escalation_model = MODEL_TIERS[route.escalation_tier]
+        if route.escalated or current_model == escalation_model:
+            print(f"⚠️  {task.name}: {len(result.missing_sections)} template section(s) still missing "
+                  f"on {current_model}; keeping the output")
+            return True, output
+
+        route.escalated = True
+        print(f"⬆️  {task.name}: {len(result.missing_sections)} template section(s) missing, "
+              f"escalating from {current_model} to {escalation_model}")
+        return False, (
+            f"{result.to_report()}\n\n"
+            "Rewrite the complete document so that it contains every required template section."
+            + (" Keep answering with the JSON object of the requested format." if task.output_pydantic else "")
+        )
+
+
+# Task id -> router, shared by every crew in the process
+_routers: Dict[str, ModelRouter] = {}
+_registry_lock = threading.Lock()
+_handler_registered = False
+
+
+def _on_task_started(source: Any, event: TaskStartedEvent) -> None:
+    task = event.task or source
+    router = _routers.get(str(getattr(task, "id", "")))
+    if router is not None:
+        router.apply(task)
+
+
+def _ensure_handler() -> None:
+    """Register the task-start handler once per process; the event bus has no unregister."""
+    global _handler_registered
+    with _registry_lock:
+        if not _handler_registered:
+            crewai_event_bus.register_handler(TaskStartedEvent, _on_task_started)
+            _handler_registered = True
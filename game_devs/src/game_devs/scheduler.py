@@ -0,0 +1,246 @@
+"""
+Dependency-Graph Task Scheduler for the GameDevs Crew
+
+The `context:` lists in tasks.yaml already describe a DAG. This module builds
+that graph from the instantiated tasks and runs every task whose dependencies
+have completed concurrently, so one slow LLM call no longer holds up work that
+does not depend on it.
+
+Running tasks one at a time is `Crew.kickoff`'s job; running them as a graph
+needs the steps kickoff performs around each task, which crewAI only has as
+private `Crew` members. `CrewInternals` is the one place that calls them. It
+was written against crewAI 0.130; on any other version the scheduler warns
+and falls back to the crew's own sequential kickoff.
+"""
+
+import asyncio
+import time
+import warnings
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+import crewai
+from crewai import Crew, Task
+from crewai.agents.agent_builder.base_agent import BaseAgent
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+from crewai.tools import BaseTool
+from crewai.utilities import I18N
+from crewai.utilities.events import CrewKickoffFailedEvent, CrewKickoffStartedEvent
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+
+
+def build_task_graph(tasks: List[Task]) -> Dict[str, List[str]]:
+    """Map each task name to the names of the tasks listed in its context."""
+    names = {id(task): task.name for task in tasks}
+    graph: Dict[str, List[str]] = {}
+
+    for task in tasks:
+        dependencies = []
+        if isinstance(task.context, list):
+            for context_task in task.context:
+                # Context tasks outside this crew (e.g. restored checkpoints) are already done
+                if id(context_task) in names:
+                    dependencies.append(names[id(context_task)])
+        graph[task.name] = dependencies
+
+    return graph
+
+
+def execution_waves(graph: Dict[str, List[str]]) -> List[List[str]]:
+    """Group tasks into waves where every task only depends on earlier waves."""
+    remaining = {name: set(dependencies) for name, dependencies in graph.items()}
+    waves: List[List[str]] = []
+    done: set = set()
+
+    while remaining:
+        ready = [name for name, dependencies in remaining.items() if dependencies <= done]
+        if not ready:
+            raise ValueError(f"Task graph contains a cycle between: {', '.join(sorted(remaining))}")
+        waves.append(ready)
+        done.update(ready)
+        for name in ready:
+            del remaining[name]
+
+    return waves
+
+
+@dataclass
+class ScheduleReport:
+    """Timing summary of a dependency-graph run."""
+
+    wall_clock: float
+    task_durations: Dict[str, float] = field(default_factory=dict)
+    waves: List[List[str]] = field(default_factory=list)
+
+    @property
+    def sequential_estimate(self) -> float:
+        """This run's task durations summed: what they would take back to back.
+
+        Only an estimate of a sequential run, whose calls would meet different
+        rate-limit waits and cache hits.
+        """
+        return sum(self.task_durations.values())
+
+    @property
+    def time_saved(self) -> float:
+        return max(self.sequential_estimate - self.wall_clock, 0.0)
+
+    def summary_lines(self) -> List[str]:
+        """Human-readable report lines for the console."""
+        lines = ["⚡ Parallel Scheduler Report:"]
+        for index, wave in enumerate(self.waves, start=1):
+            lines.append(f"  Wave {index}: {', '.join(wave)}")
+        lines.append(f"  Sequential estimate (sum of task times): {self.sequential_estimate:.1f}s")
+        lines.append(f"  Parallel wall-clock: {self.wall_clock:.1f}s")
+        saved_pct = (self.time_saved / self.sequential_estimate * 100) if self.sequential_estimate else 0.0
+        lines.append(f"  Estimated time saved: {self.time_saved:.1f}s ({saved_pct:.0f}%)")
+        return lines
+
+
+# crewAI minor versions whose private Crew members CrewInternals was checked against
+SUPPORTED_CREWAI_VERSIONS = ("0.130",)
+
+
+class CrewInternals:
+    """The private `Crew` members the scheduler needs, mirroring what Crew.kickoff does around tasks."""
+
+    REQUIRED_MEMBERS = (
+        "_task_output_handler", "_interpolate_inputs", "_set_tasks_callbacks", "_handle_crew_planning",
+        "_prepare_tools", "_get_context", "_log_task_start", "_process_task_result", "_create_crew_output",
+    )
+
+    def __init__(self, crew: Crew):
+        self.crew = crew
+
+    @classmethod
+    def unsupported_reason(cls, version: str = crewai.__version__) -> Optional[str]:
+        """Why the scheduler cannot drive this crewAI version, or None when it can."""
+        if ".".join(version.split(".")[:2]) not in SUPPORTED_CREWAI_VERSIONS:
+            return f"crewAI {version} is not one of the tested versions ({', '.join(SUPPORTED_CREWAI_VERSIONS)}.x)"
+        missing = [name for name in cls.REQUIRED_MEMBERS if not hasattr(Crew, name)]
+        if missing:
+            return f"crewAI {version} has no Crew.{', Crew.'.join(missing)}"
+        return None
+
+    def start(self, inputs: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """The setup Crew.kickoff performs before executing tasks."""
+        crew = self.crew
+        for before_callback in crew.before_kickoff_callbacks:
+            inputs = before_callback(inputs or {})
+
+        crewai_event_bus.emit(
+            crew,
+            CrewKickoffStartedEvent(crew_name=crew.name or "crew", inputs=inputs),
+        )
+        crew._task_output_handler.reset()
+
+        if inputs is not None:
+            crew._inputs = inputs
+            crew._interpolate_inputs(inputs)
+        crew._set_tasks_callbacks()
+
+        i18n = I18N(prompt_file=crew.prompt_file)
+        for agent in crew.agents:
+            agent.i18n = i18n
+            agent.crew = crew
+            agent.set_knowledge(crew_embedder=crew.embedder)
+            if not agent.function_calling_llm:
+                agent.function_calling_llm = crew.function_calling_llm
+            if not agent.step_callback:
+                agent.step_callback = crew.step_callback
+            agent.create_agent_executor()
+
+        if crew.planning:
+            crew._handle_crew_planning()
+        return inputs
+
+    def prepare_task(self, task: Task, agent: BaseAgent) -> Tuple[List[BaseTool], str]:
+        """(tools, context) of a task about to run, logged as started."""
+        tools = self.crew._prepare_tools(agent, task, cast(List[BaseTool], task.tools or agent.tools or []))
+        self.crew._log_task_start(task, agent.role)
+        return tools, self.crew._get_context(task, [])
+
+    def task_finished(self, task: Task, output: TaskOutput) -> None:
+        self.crew._process_task_result(task, output)
+
+    def finish(self, outputs: List[TaskOutput]) -> CrewOutput:
+        """The crew output, after-kickoff callbacks and usage metrics, as Crew.kickoff returns them."""
+        result = self.crew._create_crew_output(outputs)
+        for after_callback in self.crew.after_kickoff_callbacks:
+            result = after_callback(result)
+        self.crew.usage_metrics = self.crew.calculate_usage_metrics()
+        return result
+
+    def failed(self, error: Exception) -> None:
+        crewai_event_bus.emit(
+            self.crew,
+            CrewKickoffFailedEvent(error=str(error), crew_name=self.crew.name or "crew"),
+        )
+
+
+class DependencyScheduler:
+    """Runs a crew's tasks as a DAG using async kickoff instead of Process.sequential."""
+
+    def __init__(self, crew: Crew):
+        self.crew = crew
+        self.graph = build_task_graph(crew.tasks)
+        self.waves = execution_waves(self.graph)
+        self.report: Optional[ScheduleReport] = None
+
+    def kickoff(self, inputs: Optional[Dict[str, Any]] = None) -> CrewOutput:
+        """Blocking entry point mirroring Crew.kickoff."""
+        reason = CrewInternals.unsupported_reason()
+        if reason:
+            warnings.warn(f"{reason}; running the tasks sequentially instead of in parallel", stacklevel=2)
+            return self.crew.kickoff(inputs=inputs)
+        return asyncio.run(self.kickoff_async(inputs))
+
+    async def kickoff_async(self, inputs: Optional[Dict[str, Any]] = None) -> CrewOutput:
+        """Run every task as soon as all of its context tasks have finished."""
+        internals = CrewInternals(self.crew)
+        tasks_by_name = {task.name: task for task in self.crew.tasks}
+        # Tasks sharing an agent must not run at once: the agent holds a single executor
+        agent_locks: Dict[int, asyncio.Lock] = {}
+        futures: Dict[str, asyncio.Future] = {}
+        durations: Dict[str, float] = {}
+
+        async def run_task(name: str) -> TaskOutput:
+            await asyncio.gather(*(futures[dependency] for dependency in self.graph[name]))
+            task = tasks_by_name[name]
+            agent = cast(BaseAgent, task.agent)
+            lock = agent_locks.setdefault(id(agent), asyncio.Lock())
+
+            async with lock:
+                tools, context = internals.prepare_task(task, agent)
+                started = time.perf_counter()
+                output = await asyncio.to_thread(task.execute_sync, agent, context, tools)
+                durations[name] = time.perf_counter() - started
+
+            internals.task_finished(task, output)
+            return output
+
+        try:
+            internals.start(inputs)
+            start_time = time.perf_counter()
+            for wave in self.waves:
+                for name in wave:
+                    futures[name] = asyncio.ensure_future(run_task(name))
+
+            try:
+                outputs = await asyncio.gather(*(futures[task.name] for task in self.crew.tasks))
+            except Exception:
+                for future in futures.values():
+                    future.cancel()
+                raise
+
+            self.report = ScheduleReport(
+                wall_clock=time.perf_counter() - start_time,
+                task_durations=durations,
+                waves=self.waves,
+            )
+            return internals.finish(list(outputs))
+        except Exception as e:
+            # As Crew.kickoff does, so listeners see the run end
+            internals.failed(e)
+            raise
@@ -0,0 +1,229 @@
+"""
+Structured Task Outputs for the GameDevs Crew
+
+Free-form markdown between stages costs twice: every downstream task re-reads
+the prose as context, and the template validator has to find the GDD
+sections again from their headers. With structured outputs the design stages
+answer with a JSON object of a Pydantic schema, attached to their tasks in
+crew.py:
+
+- Pitch:          pitch_concept_task, pitch_refinement_task
+- MechanicsSpec:  gameplay_mechanics_task, gameplay_refinement_task
+- TechPlan:       technical_implementation_task
+- GDD:            gdd_integration_task, final_polish_task
+
+crewAI appends the schema to the task prompt and parses the answer into
+`TaskOutput.pydantic`. Downstream tasks get it as compact JSON without empty
+fields, and context compaction selects JSON fields where it would select
+markdown sections (see compaction.py). A GDD is validated from its list of
+sections (see `GDDValidator.validate_sections`). Stage output files are saved
+as JSON beside the configured path; markdown is rendered once, for the tasks
+with `render_markdown: true` in tasks.yaml (the final GDD).
+
+Review tasks stay free-form: their answer is feedback. An answer that is not
+valid JSON for its schema gets one repair call through the task's LLM, cached
+and rate limited like any other call. If that fails too, the task keeps its
+raw text and the following stages treat it as markdown, as they do with
+STRUCTURED_OUTPUTS=off (or --no-structured-outputs).
+"""
+
+import os
+from typing import Any, List, Optional, Tuple, Type
+
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.converter import Converter, ConverterError
+from pydantic import BaseModel, Field, ValidationError, ValidationInfo, field_validator
+
+from game_devs.compaction import compact_json
+from game_devs.validation import ValidationResult, get_validator, normalize_header
+
+
+def structured_outputs_enabled() -> bool:
+    return os.getenv('STRUCTURED_OUTPUTS', 'on').lower() != 'off'
+
+
+def parse_output(schema: Type[BaseModel], text: str) -> Optional[BaseModel]:
+    """The JSON object in `text` (code fences and chatter around it allowed) as `schema`, or None."""
+    start, end = text.find('{'), text.rfind('}')
+    if start < 0 or end < start:
+        return None
+    try:
+        return schema.model_validate_json(text[start:end + 1])
+    except (ValidationError, ValueError):
+        return None
+
+
+def stage_output(output: Optional[TaskOutput]) -> Optional["StageOutput"]:
+    """The structured output of a finished task, or None for free-form text."""
+    pydantic = getattr(output, "pydantic", None)
+    return pydantic if isinstance(pydantic, StageOutput) else None
+
+
+def _markdown_value(value: Any) -> str:
+    if isinstance(value, list):
+        return "\n".join(f"- {_markdown_value(item)}" for item in value)
+    if isinstance(value, BaseModel):
+        head, *rest = [str(item) for item in value.model_dump().values()]
+        return f"**{head}**: {' '.join(rest)}" if rest else head
+    return str(value).strip()
+
+
+class StageOutput(BaseModel):
+    """Base of the stage schemas: compact JSON for the next stage, markdown for people."""
+
+    def to_context(self) -> str:
+        """Compact JSON without empty fields, as passed to downstream tasks."""
+        return compact_json(self.model_dump(mode="json", exclude_defaults=True))
+
+    def to_markdown(self) -> str:
+        parts = []
+        for name, field in type(self).model_fields.items():
+            value = getattr(self, name)
+            if value in ("", [], None):
+                continue
+            parts.append(f"## {field.title or name.replace('_', ' ').title()}\n\n{_markdown_value(value)}")
+        return "\n\n".join(parts) + "\n"
+
+
+class NamedItem(BaseModel):
+    name: str
+    description: str
+
+
+class Risk(BaseModel):
+    risk: str
+    mitigation: str
+
+
+class Pitch(StageOutput):
+    """Output of the pitch stages."""
+
+    core_pitch: str = Field(description="Two-sentence pitch statement")
+    hook: str = Field(description="Unique selling point in 2-3 sentences")
+    target_audience: str
+    platform_strategy: List[str]
+    design_pillars: List[NamedItem]
+    objectives_and_win_lose_conditions: str
+    summary_of_changes: List[str] = Field(default_factory=list, description="Refinements only")
+
+
+class MechanicsSpec(StageOutput):
+    """Output of the gameplay mechanics stages."""
+
+    core_gameplay_loop: str
+    primary_mechanics: List[NamedItem]
+    progression_systems: str
+    difficulty_and_balancing: str
+    engagement_and_retention: str
+    design_pillar_alignment: str
+    summary_of_changes: List[str] = Field(default_factory=list, description="Refinements only")
+
+
+class TechPlan(StageOutput):
+    """Output of the technical implementation stage."""
+
+    architecture: str
+    core_systems: List[NamedItem]
+    data_structures_and_algorithms: str
+    performance_and_optimization: str
+    platform_requirements: str
+    pipeline_and_tools: str
+    testing_and_qa: str
+    timeline_and_resources: str
+    risks: List[Risk]
+
+
+class GDDSection(BaseModel):
+    heading: str = Field(description="A level-2 section title of the GDD template, verbatim")
+    content: str = Field(description="Markdown body of the section, without its heading")
+
+    @field_validator("content")
+    @classmethod
+    def _strip_heading(cls, value: str, info: ValidationInfo) -> str:
+        # Models often repeat the heading at the top of the body
+        first, _, rest = value.strip().partition('\n')
+        heading = info.data.get("heading", "")
+        if first.startswith('#') and normalize_header(first.lstrip('#')) == normalize_header(heading):
+            return rest.strip()
+        return value.strip()
+
+
+class GDD(StageOutput):
+    """The Game Design Document: one entry per template section, in template order."""
+
+    title: str
+    executive_summary: str
+    sections: List[GDDSection]
+    completion_summary: str = ""
+
+    @classmethod
+    def from_markdown(cls, document: str) -> "GDD":
+        """Split a document written section by section (see integration.py) at its level-1 and -2 headers."""
+        title, summary, sections = "", "", []
+        heading, lines, in_code_block = None, [], False
+
+        def flush() -> None:
+            nonlocal summary
+            if heading is None:
+                return
+            body = "\n".join(lines).strip()
+            if normalize_header(heading) == "executive summary":
+                summary = body
+            else:
+                sections.append(GDDSection(heading=heading, content=body))
+
+        for line in document.split('\n'):
+            stripped = line.strip()
+            if stripped.startswith('```'):
+                in_code_block = not in_code_block
+            if in_code_block or stripped.startswith('```'):
+                if heading is not None:
+                    lines.append(line)
+            elif stripped.startswith('# ') and not title:
+                title = stripped[2:].strip()
+            elif stripped.startswith('## '):
+                flush()
+                heading, lines = stripped[3:].strip(), []
+            elif heading is not None:
+                lines.append(line)
+        flush()
+        return cls(title=title or "Game Design Document", executive_summary=summary, sections=sections)
+
+    def section_pairs(self) -> List[Tuple[str, str]]:
+        return [(section.heading, section.content) for section in self.sections]
+
+    def validate_structure(self) -> ValidationResult:
+        """Template check of the section list (raises FileNotFoundError without the template)."""
+        return get_validator().validate_sections(self.section_pairs())
+
+    def to_markdown(self) -> str:
+        parts = [f"# {self.title}"]
+        if self.executive_summary:
+            parts.append(f"## Executive Summary\n\n{self.executive_summary}")
+        parts.extend(f"## {heading}\n\n{content}".rstrip() for heading, content in self.section_pairs())
+        if self.completion_summary:
+            parts.append(f"## Completion Summary\n\n{self.completion_summary}")
+        return "\n\n".join(parts) + "\n"
+
+
+class StructuredConverter(Converter):
+    """Repairs an answer that does not parse as its schema with one plain LLM call.
+
+    crewAI's converter goes through instructor for models with function calling,
+    which would bypass the response cache and the shared rate limits, and retries
+    the same request, which the response cache would answer identically.
+    """
+
+    def to_pydantic(self, current_attempt: int = 1) -> Any:
+        try:
+            response = self.llm.call([
+                {"role": "system", "content": self.instructions},
+                {"role": "user", "content": self.text},
+            ])
+        except Exception as e:
+            return ConverterError(f"Repairing the {self.model.__name__} JSON failed: {e}.")
+        model = parse_output(self.model, str(response))
+        if model is None:
+            return ConverterError(f"The answer could not be repaired into a {self.model.__name__}.")
+        print(f"🔧 Repaired the answer into a {self.model.__name__}")
+        return model
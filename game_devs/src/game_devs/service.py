@@ -0,0 +1,371 @@
+"""
+GDD Service for the GameDevs Crew
+
+Every `crewai run` pays for process startup, the crewAI and litellm imports,
+YAML loading, agent construction and knowledge indexing before its first
+token. The service (`uv run serve`) pays for them once: it warms a crew at
+startup, keeps the shared stores (response cache, knowledge index, design
+memory, rate limiter) open, and then builds a crew per job in milliseconds.
+
+    POST /jobs                    submit a game spec: a `game_type` preset plus
+                                  any input overrides, as in batch spec files
+    GET  /jobs                    every job and its status
+    GET  /jobs/<id>               status, per-task progress and artifact links
+    GET  /jobs/<id>/events        progress as server-sent events until the job ends
+                                  (with streaming on, the tokens of running tasks too)
+    GET  /jobs/<id>/gdd           the finished final GDD (markdown)
+    GET  /jobs/<id>/files/<path>  any file the job wrote under its output root
+    GET  /health                  warm-up time and job counts
+
+Jobs run like batch jobs (see batch.py): scheduled by an event loop in a
+background thread, at most `concurrency` crews at a time on a bounded executor,
+each under its own output root. Submissions beyond `max_queued` waiting jobs are refused with 503.
+Job state lives in memory; the outputs stay on disk after the service stops.
+A finished job keeps a snapshot of its task metrics and releases its crew, and
+only the latest `max_finished` finished jobs are kept.
+"""
+
+import asyncio
+import json
+import mimetypes
+import os
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import unquote
+
+from game_devs.batch import BatchJobResult, BatchRunner, slugify
+from game_devs.crew import GameDevs
+from game_devs.streaming import partial_path
+from game_devs.tools.knowledge_store import get_knowledge_store
+
+# Seconds between progress checks of an event stream, and between keep-alive comments
+EVENT_POLL_SECONDS = 0.25
+EVENT_KEEPALIVE_SECONDS = 15.0
+
+
+@dataclass
+class ServiceJob(BatchJobResult):
+    """A submitted spec, its inputs and timestamps."""
+
+    inputs: Dict[str, Any] = field(default_factory=dict)
+    # Task metrics snapshot, taken when the job finishes and its crew is released
+    tasks: List[Dict[str, Any]] = field(default_factory=list)
+    created_at: str = ""
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+
+class GDDService:
+    """Warm crews behind a bounded job queue."""
+
+    def __init__(
+        self,
+        spec_to_inputs: Callable[[Dict[str, Any]], Dict[str, Any]],
+        concurrency: int = 2,
+        max_queued: int = 100,
+        output_root: str = "outputs/service",
+        parallel: bool = False,
+        max_finished: int = 500,
+    ):
+        if concurrency < 1 or max_queued < 0 or max_finished < 0:
+            raise ValueError("concurrency must be at least 1, max_queued and max_finished at least 0")
+        self.spec_to_inputs = spec_to_inputs
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self.output_root = output_root
+        self.runner = BatchRunner([], concurrency, output_root, parallel, crew_factory=self._build_crew)
+        self.jobs: Dict[str, ServiceJob] = {}
+        self.warmup_seconds: Optional[float] = None
+        self._crews: Dict[str, GameDevs] = {}
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def start(self) -> None:
+        """Warm the crew and shared stores, then start the job loop."""
+        started = time.perf_counter()
+        warmup_root = os.path.join(self.output_root, ".warmup")
+        # Loads the YAML, builds agents and tools and opens the response cache, design memory and rate limiter
+        warm = GameDevs(warmup_root)
+        warm.crew()
+        warm.release()
+        shutil.rmtree(warmup_root, ignore_errors=True)
+        store = get_knowledge_store()
+        if store is not None:
+            store.refresh()
+        self.warmup_seconds = time.perf_counter() - started
+
+        threading.Thread(target=self._loop.run_forever, name="gdd-service-loop", daemon=True).start()
+        self._semaphore = asyncio.run_coroutine_threadsafe(self._make_semaphore(), self._loop).result()
+
+    async def _make_semaphore(self) -> asyncio.Semaphore:
+        return asyncio.Semaphore(self.runner.concurrency)
+
+    def stop(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self.runner.close()
+
+    def _build_crew(self, output_dir: str) -> GameDevs:
+        crew_base = GameDevs(output_dir)
+        with self._lock:
+            self._crews[output_dir] = crew_base
+            job = next((job for job in self.jobs.values() if job.output_dir == output_dir), None)
+        if job is not None:
+            job.started_at = datetime.now().isoformat()
+        return crew_base
+
+    def submit(self, spec: Dict[str, Any]) -> ServiceJob:
+        """Queue a spec; ValueError for an invalid spec, OverflowError when the queue is full."""
+        if not isinstance(spec, dict):
+            raise ValueError("A game spec must be a JSON object")
+        inputs = self.spec_to_inputs(spec)
+        with self._lock:
+            queued = sum(job.status == "pending" for job in self.jobs.values())
+            if queued >= self.max_queued:
+                raise OverflowError(f"{queued} job(s) already queued; try again later")
+            job_id = f"{uuid.uuid4().hex[:8]}_{slugify(str(inputs['game']))}"
+            job = ServiceJob(
+                job_id=job_id,
+                game=str(inputs["game"]),
+                output_dir=os.path.join(self.output_root, job_id),
+                inputs=inputs,
+                created_at=datetime.now().isoformat(),
+            )
+            self.jobs[job_id] = job
+        asyncio.run_coroutine_threadsafe(self._run(job), self._loop)
+        print(f"📥 [{job_id}] Queued {job.game}")
+        return job
+
+    async def _run(self, job: ServiceJob) -> None:
+        await self.runner.run_job(self._semaphore, job, job.inputs)
+        self._finish(job)
+
+    def _finish(self, job: ServiceJob) -> None:
+        """Snapshot the job's task metrics, drop its crew (released by the runner) and expire old jobs."""
+        job.tasks = self.tasks(job)
+        job.finished_at = datetime.now().isoformat()
+        with self._lock:
+            self._crews.pop(job.output_dir, None)
+            finished = [other for other in self.jobs.values() if other.finished]
+            # Jobs are kept in submission order; their outputs stay on disk
+            for expired in finished[:max(0, len(finished) - self.max_finished)]:
+                del self.jobs[expired.job_id]
+
+    def final_gdd_path(self, job: ServiceJob) -> str:
+        return os.path.join(job.output_dir, "final", f"{job.game}_final_gdd.md")
+
+    def files(self, job: ServiceJob) -> List[str]:
+        """Paths of the files a job wrote, relative to its output root."""
+        found = []
+        for directory, _, names in os.walk(job.output_dir):
+            for name in names:
+                found.append(os.path.relpath(os.path.join(directory, name), job.output_dir))
+        return sorted(found)
+
+    def tasks(self, job: ServiceJob) -> List[Dict[str, Any]]:
+        """Status of each task of a job, from its crew's run metrics (a snapshot once it finished)."""
+        crew_base = self._crews.get(job.output_dir)
+        if crew_base is None:
+            return job.tasks
+        records = {record.task: record for record in list(crew_base.metrics.records)}
+        tasks = []
+        for task in getattr(crew_base, "tasks", []):
+            record = records.get(task.name)
+            tasks.append({
+                "task": task.name,
+                "status": record.status if record else "pending",
+                "duration": round(record.duration, 2) if record else 0.0,
+                "llm_calls": record.llm_calls if record else 0,
+                "cost": record.cost if record else None,
+            })
+        return tasks
+
+    def snapshot(self, job: ServiceJob) -> Dict[str, Any]:
+        """Status, progress and artifact links of a job."""
+        tasks = self.tasks(job)
+        done = sum(task["status"] in ("completed", "reused") for task in tasks)
+        gdd_ready = job.status == "completed" and os.path.isfile(self.final_gdd_path(job))
+        return {
+            **asdict(job),
+            "progress": {
+                "done": done,
+                "total": len(tasks),
+                "running": [task["task"] for task in tasks if task["status"] == "running"],
+            },
+            "tasks": tasks,
+            "links": {
+                "self": f"/jobs/{job.job_id}",
+                "events": f"/jobs/{job.job_id}/events",
+                "gdd": f"/jobs/{job.job_id}/gdd" if gdd_ready else None,
+            },
+            "files": self.files(job) if job.finished else [],
+        }
+
+    def partial_outputs(self, job: ServiceJob, running: List[str]) -> Dict[str, str]:
+        """Task name -> partial output file of the given running tasks (streaming runs only)."""
+        crew_base = self._crews.get(job.output_dir)
+        if crew_base is None or not crew_base.stream:
+            return {}
+        return {
+            task.name: partial_path(task.output_file)
+            for task in getattr(crew_base, "tasks", []) if task.name in running and task.output_file
+        }
+
+    def health(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs = list(self.jobs.values())
+        counts: Dict[str, int] = {}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "status": "ok",
+            "warmup_seconds": round(self.warmup_seconds or 0.0, 2),
+            "concurrency": self.runner.concurrency,
+            "max_queued": self.max_queued,
+            "max_finished": self.max_finished,
+            "jobs": counts,
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service: GDDService
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body, indent=2, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_file(self, path: str) -> None:
+        with open(path, 'rb') as file:
+            payload = file.read()
+        content_type = "text/markdown" if path.endswith(".md") else mimetypes.guess_type(path)[0]
+        self.send_response(200)
+        self.send_header("Content-Type", f"{content_type or 'application/octet-stream'}; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _error(self, status: int, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+    def _job(self, job_id: str) -> Optional[ServiceJob]:
+        job = self.service.jobs.get(job_id)
+        if job is None:
+            self._error(404, f"No job '{job_id}'")
+        return job
+
+    def do_POST(self) -> None:
+        if self.path.rstrip('/') != "/jobs":
+            self._error(404, f"No route {self.path}")
+            return
+        try:
+            spec = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            job = self.service.submit(spec)
+        except ValueError as e:
+            self._error(400, str(e))
+            return
+        except OverflowError as e:
+            self._send_json(503, {"error": str(e)}, {"Retry-After": "30"})
+            return
+        self._send_json(202, self.service.snapshot(job), {"Location": f"/jobs/{job.job_id}"})
+
+    def do_GET(self) -> None:
+        parts = [unquote(part) for part in self.path.split("?")[0].strip('/').split('/')]
+        if parts == ["health"]:
+            self._send_json(200, self.service.health())
+        elif parts == ["jobs"]:
+            jobs = sorted(self.service.jobs.values(), key=lambda job: job.created_at)
+            self._send_json(200, [
+                {"job_id": job.job_id, "game": job.game, "status": job.status, "created_at": job.created_at}
+                for job in jobs
+            ])
+        elif len(parts) >= 2 and parts[0] == "jobs":
+            job = self._job(parts[1])
+            if job is None:
+                return
+            if len(parts) == 2:
+                self._send_json(200, self.service.snapshot(job))
+            elif parts[2:] == ["events"]:
+                self._events(job)
+            elif parts[2:] == ["gdd"]:
+                path = self.service.final_gdd_path(job)
+                if job.status != "completed" or not os.path.isfile(path):
+                    self._error(409, f"Job '{job.job_id}' is {job.status}; the final GDD is not available")
+                else:
+                    self._send_file(path)
+            elif parts[2] == "files" and len(parts) > 3:
+                root = os.path.realpath(job.output_dir)
+                path = os.path.realpath(os.path.join(root, *parts[3:]))
+                if not path.startswith(root + os.sep) or not os.path.isfile(path):
+                    self._error(404, f"No file '{'/'.join(parts[3:])}' in job '{job.job_id}'")
+                else:
+                    self._send_file(path)
+            else:
+                self._error(404, f"No route {self.path}")
+        else:
+            self._error(404, f"No route {self.path}")
+
+    def _event(self, name: str, data: Any) -> None:
+        self.wfile.write(f"event: {name}\ndata: {json.dumps(data, default=str)}\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+    def _events(self, job: ServiceJob) -> None:
+        """Progress snapshots whenever they change and new streamed text, until the job ends."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        last, offsets, quiet_since = None, {}, time.monotonic()
+        try:
+            while True:
+                snapshot = self.service.snapshot(job)
+                progress = {key: snapshot[key] for key in ("status", "progress", "tasks")}
+                if progress != last:
+                    self._event("progress", progress)
+                    last, quiet_since = progress, time.monotonic()
+                for task, path in self.service.partial_outputs(job, snapshot["progress"]["running"]).items():
+                    if not os.path.isfile(path):
+                        continue
+                    with open(path, 'r', encoding='utf-8', errors='replace') as file:
+                        file.seek(offsets.get(path, 0))
+                        text = file.read()
+                        offsets[path] = file.tell()
+                    if text:
+                        self._event("token", {"task": task, "text": text})
+                        quiet_since = time.monotonic()
+                if job.finished:
+                    self._event("done", snapshot)
+                    return
+                if time.monotonic() - quiet_since > EVENT_KEEPALIVE_SECONDS:
+                    self.wfile.write(b": keep-alive\n\n")
+                    self.wfile.flush()
+                    quiet_since = time.monotonic()
+                time.sleep(EVENT_POLL_SECONDS)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def make_server(service: GDDService, host: str = "127.0.0.1", port: int = 8000) -> ThreadingHTTPServer:
+    """HTTP server answering with `service`; port 0 picks a free port."""
+    handler = type("GDDServiceHandler", (_Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
@@ -0,0 +1,164 @@
+"""
+Streaming Task Output for the GameDevs Crew
+
+With streaming enabled (`--stream` or LLM_STREAM=true) every LLM token is
+appended to `<output_file>.partial` as it arrives and optionally echoed to the
+console (`--stream-console` or STREAM_CONSOLE=true). When the task completes
+its final answer replaces `output_file` atomically (see `GameDevsTask` in
+task.py) and the partial file is removed; after a crash or interrupt the
+partial file keeps everything the model produced so far.
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, TextIO
+
+from crewai import Task
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+from crewai.utilities.events.llm_events import LLMCallStartedEvent, LLMStreamChunkEvent
+from crewai.utilities.events.task_events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent
+
+PARTIAL_SUFFIX = ".partial"
+CALL_SEPARATOR = "\n\n<!-- next LLM call -->\n\n"
+
+
+def partial_path(output_file: str) -> str:
+    return f"{output_file}{PARTIAL_SUFFIX}"
+
+
+class _TaskStream:
+    """Open partial file of one running task."""
+
+    def __init__(self, task_name: str, path: Optional[str]):
+        self.task_name = task_name
+        self.path = path
+        self.file: Optional[TextIO] = None
+        self.started = time.perf_counter()
+        self.first_token: Optional[float] = None
+        self.calls = 0
+
+    def write(self, text: str) -> None:
+        if self.first_token is None:
+            self.first_token = time.perf_counter() - self.started
+            # Opened on the first token so tasks that never stream leave no file behind
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self.file = open(self.path, 'w', encoding='utf-8')
+        if self.file:
+            self.file.write(text)
+            self.file.flush()
+
+    def close(self) -> None:
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+class StreamWriter:
+    """Writes the token stream of a crew's tasks to partial output files and the console."""
+
+    def __init__(self, console: bool = False):
+        self.console = console
+
+    @classmethod
+    def from_env(cls) -> Optional["StreamWriter"]:
+        """Writer configured by LLM_STREAM and STREAM_CONSOLE, or None when streaming is off."""
+        if os.getenv('LLM_STREAM', 'false').lower() != 'true':
+            return None
+        return cls(console=os.getenv('STREAM_CONSOLE', 'false').lower() == 'true')
+
+    def track(self, tasks: List[Task]) -> None:
+        """Stream the output of these tasks."""
+        _ensure_handlers()
+        with _registry_lock:
+            for task in tasks:
+                _writers[str(task.id)] = self
+
+    def untrack(self, tasks: List[Task]) -> None:
+        """Stop streaming these tasks, releasing the registry's reference to this writer."""
+        with _registry_lock:
+            for task in tasks:
+                if _writers.get(str(task.id)) is self:
+                    del _writers[str(task.id)]
+
+    def task_started(self, task: Task) -> _TaskStream:
+        path = partial_path(task.output_file) if task.output_file else None
+        if self.console:
+            print(f"\n📡 Streaming {task.name}" + (f" → {path}" if path else ""), flush=True)
+        return _TaskStream(task.name or "", path)
+
+    def llm_call_started(self, stream: _TaskStream) -> None:
+        if stream.calls:
+            stream.write(CALL_SEPARATOR)
+        stream.calls += 1
+
+    def chunk(self, stream: _TaskStream, text: str) -> None:
+        stream.write(text)
+        if self.console:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+    def task_finished(self, stream: _TaskStream, failed: bool) -> None:
+        stream.close()
+        first_token = f"{stream.first_token:.1f}s" if stream.first_token is not None else "n/a"
+        if failed and stream.path and os.path.exists(stream.path):
+            print(f"\n⚠️  {stream.task_name} failed; partial output kept in {stream.path}", flush=True)
+        elif self.console:
+            print(f"\n📡 {stream.task_name}: first token after {first_token}", flush=True)
+
+
+# Task id -> writer, shared by every crew in the process
+_writers: Dict[str, StreamWriter] = {}
+_registry_lock = threading.Lock()
+_handlers_registered = False
+# (task, writer, stream) of the task running on this thread
+_current = threading.local()
+
+
+def _on_task_started(source: Any, event: TaskStartedEvent) -> None:
+    task = event.task or source
+    if getattr(_current, "task", None) is task:
+        # Guardrail retry: keep appending to the same partial file
+        return
+    writer = _writers.get(str(getattr(task, "id", "")))
+    _current.task = task if writer else None
+    _current.writer = writer
+    _current.stream = writer.task_started(task) if writer else None
+
+
+def _on_task_finished(source: Any, event: Any) -> None:
+    writer, stream = getattr(_current, "writer", None), getattr(_current, "stream", None)
+    if writer is None or stream is None:
+        return
+    writer.task_finished(stream, failed=isinstance(event, TaskFailedEvent))
+    _current.task = None
+    _current.writer = None
+    _current.stream = None
+
+
+def _on_llm_started(source: Any, event: LLMCallStartedEvent) -> None:
+    writer, stream = getattr(_current, "writer", None), getattr(_current, "stream", None)
+    if writer is not None and stream is not None:
+        writer.llm_call_started(stream)
+
+
+def _on_chunk(source: Any, event: LLMStreamChunkEvent) -> None:
+    writer, stream = getattr(_current, "writer", None), getattr(_current, "stream", None)
+    if writer is not None and stream is not None and event.chunk:
+        writer.chunk(stream, event.chunk)
+
+
+def _ensure_handlers() -> None:
+    """Register the event handlers once per process; the event bus has no unregister."""
+    global _handlers_registered
+    with _registry_lock:
+        if _handlers_registered:
+            return
+        crewai_event_bus.register_handler(TaskStartedEvent, _on_task_started)
+        crewai_event_bus.register_handler(TaskCompletedEvent, _on_task_finished)
+        crewai_event_bus.register_handler(TaskFailedEvent, _on_task_finished)
+        crewai_event_bus.register_handler(LLMCallStartedEvent, _on_llm_started)
+        crewai_event_bus.register_handler(LLMStreamChunkEvent, _on_chunk)
+        _handlers_registered = True
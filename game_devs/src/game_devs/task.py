@@ -0,0 +1,265 @@
+"""
+GameDevs Task
+
+`GameDevsTask` is the crewAI `Task` used for every GameDevs task. It adds:
+
+- atomic output files: the final answer is written to a temporary file and
+  moved over `output_file`, so readers never see a half-written document, and
+  the streaming `.partial` file is removed afterwards
+- per-edge context compaction: the `context_compaction` key of tasks.yaml
+  decides how each upstream output is passed to the task (see compaction.py)
+- map-reduce writing: tasks with a `map_reduce` key are written section by
+  section when run by a `GameDevsAgent` (see integration.py)
+- design memory: tasks with a `design_memory` key store their output for
+  later runs or get approved material of earlier runs appended to their
+  context (see design_memory.py)
+- incremental runs: a task allowed to reuse its checkpoint returns the stored
+  output instead of calling the LLM, as long as its upstream outputs match
+  the ones it consumed then (see incremental.py)
+- call priority: the LLM calls of an execution, context digests and section
+  drafts included, queue for the shared rate limits with the task's
+  critical-path priority (see rate_limit.py)
+- structured outputs: tasks with an output schema pass it on as compact JSON
+  and save it as JSON, or as markdown with `render_markdown: true`
+  (see schemas.py)
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from crewai import Agent, Task
+from crewai.tasks.output_format import OutputFormat
+from crewai.tasks.task_output import TaskOutput
+from pydantic import Field, PrivateAttr, field_validator
+
+from game_devs.compaction import (
+    CONTEXT_DIVIDER,
+    EdgeCompaction,
+    EdgeStats,
+    compact_output,
+    compaction_enabled,
+    parse_compaction,
+)
+from game_devs.design_memory import MemoryConfig
+from game_devs.integration import (
+    MapReduceConfig,
+    SectionIntegrator,
+    StepStats,
+    map_reduce_enabled,
+    stitch_llm_for,
+)
+from game_devs.incremental import output_digest
+from game_devs.llm import GameDevsLLM
+from game_devs.metrics import record_reused
+from game_devs.rate_limit import DEFAULT_PRIORITY, Priority, current_priority
+from game_devs.schemas import GDD, parse_output, stage_output
+from game_devs.streaming import partial_path
+
+
+class GameDevsTask(Task):
+    """crewAI Task with atomic output files and configurable context compaction."""
+
+    context_compaction: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="How each context task's output is compacted, keyed by task name or 'default'",
+    )
+    map_reduce: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Write the output section by section from the GDD template (see integration.py)",
+    )
+    design_memory: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="What this task stores in or recalls from the design memory (see design_memory.py)",
+    )
+    render_markdown: bool = Field(
+        default=False,
+        description="Save a structured output as rendered markdown instead of JSON (see schemas.py)",
+    )
+    _recalled: str = PrivateAttr(default="")
+    _upstream: List[Task] = PrivateAttr(default_factory=list)
+    _reusable: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+    _compaction_stats: List[EdgeStats] = PrivateAttr(default_factory=list)
+    _map_reduce_stats: List[StepStats] = PrivateAttr(default_factory=list)
+    _priority: Priority = PrivateAttr(default=DEFAULT_PRIORITY)
+
+    @field_validator("context_compaction")
+    @classmethod
+    def _validate_context_compaction(cls, value: Dict[str, Any]) -> Dict[str, Any]:
+        parse_compaction(value)
+        return value
+
+    @field_validator("map_reduce")
+    @classmethod
+    def _validate_map_reduce(cls, value: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        MapReduceConfig.parse(value)
+        return value
+
+    @field_validator("design_memory")
+    @classmethod
+    def _validate_design_memory(cls, value: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        MemoryConfig.parse(value)
+        return value
+
+    @property
+    def memory_config(self) -> Optional[MemoryConfig]:
+        return MemoryConfig.parse(self.design_memory)
+
+    def set_recalled(self, text: str) -> None:
+        """Material recalled from the design memory, appended to the context of every execution."""
+        self._recalled = text
+
+    def track_upstream(self, upstream: List[Task], reusable: Optional[Dict[str, Any]] = None) -> None:
+        """Tasks whose outputs reach this one, and the checkpoint it may reuse (None: always run)."""
+        self._upstream = list(upstream)
+        self._reusable = reusable
+
+    def set_priority(self, priority: Priority) -> None:
+        """Rate-limit queue priority of this task's LLM calls (see rate_limit.py)."""
+        self._priority = priority
+
+    def upstream_digests(self) -> Dict[str, str]:
+        """Digest of each upstream output, as consumed by the current execution."""
+        return {
+            task.name: output_digest(task.output.raw)
+            for task in self._upstream if task.output is not None and task.name
+        }
+
+    @property
+    def compaction_stats(self) -> List[EdgeStats]:
+        """Per-edge token estimates of the context of the latest execution."""
+        return list(self._compaction_stats)
+
+    @property
+    def map_reduce_stats(self) -> List[StepStats]:
+        """LLM calls of the latest map-reduce execution (empty when written in one call)."""
+        return list(self._map_reduce_stats)
+
+    def execute_sync(self, agent=None, context: Optional[str] = None, tools=None):
+        reused = self._reuse_checkpoint()
+        if reused is not None:
+            return reused
+        token = current_priority.set(self._priority)
+        try:
+            return super().execute_sync(agent=agent, context=self._prepare_execution(context), tools=tools)
+        finally:
+            current_priority.reset(token)
+
+    def execute_async(self, agent=None, context: Optional[str] = None, tools=None) -> Future:
+        """`execute_sync` on a thread of its own, so async tasks reuse checkpoints and keep their priority too."""
+        future: Future = Future()
+
+        def run() -> None:
+            try:
+                future.set_result(self.execute_sync(agent=agent, context=context, tools=tools))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(daemon=True, target=run).start()
+        return future
+
+    def writes_in_sections(self, agent: Agent) -> bool:
+        """Whether this execution is written map-reduce style (guardrail retries use a single call)."""
+        return (
+            self.map_reduce is not None
+            and map_reduce_enabled()
+            and self.retry_count == 0
+            and isinstance(agent.llm, GameDevsLLM)
+        )
+
+    def write_in_sections(self, agent: Agent, context: Optional[str]) -> str:
+        """Draft the template sections concurrently with the agent's model and stitch them."""
+        config = MapReduceConfig.parse(self.map_reduce)
+        system = f"You are {agent.role}. {agent.goal}\n\n{agent.backstory}"
+        assignment = f"{self.description}\n\nExpected output: {self.expected_output}"
+        stitch_llm = stitch_llm_for(config.stitch_tier, agent.llm.response_cache)
+        document, self._map_reduce_stats = SectionIntegrator(config).run(
+            agent.llm, stitch_llm, system, assignment, context or ""
+        )
+        if self.output_pydantic is GDD:
+            return GDD.from_markdown(document).model_dump_json()
+        return document
+
+    def _reuse_checkpoint(self) -> Optional[TaskOutput]:
+        """The stored output, if the upstream outputs are the ones it was written from."""
+        checkpoint, self._reusable = self._reusable, None
+        if checkpoint is None or self.upstream_digests() != (checkpoint.get("upstream") or {}):
+            return None
+
+        print(f"♻️  Reusing the stored output of {self.name}")
+        structured = parse_output(self.output_pydantic, checkpoint["raw"]) if self.output_pydantic else None
+        output = TaskOutput(
+            name=self.name,
+            description=self.description,
+            expected_output=self.expected_output,
+            raw=checkpoint["raw"],
+            pydantic=structured,
+            agent=checkpoint.get("agent") or (self.agent.role if self.agent else ""),
+            output_format=OutputFormat.PYDANTIC if structured else OutputFormat.RAW,
+        )
+        self.output = output
+        if self.output_file:
+            self._save_file(output.raw)
+        record_reused(self)
+        if self.callback:
+            self.callback(output)
+        return output
+
+    def _prepare_execution(self, context: Optional[str]) -> Optional[str]:
+        self._map_reduce_stats = []
+        context = self._compact_context(context)
+        if self._recalled:
+            context = CONTEXT_DIVIDER.join(part for part in (context, self._recalled) if part)
+        return context
+
+    def _compact_context(self, context: Optional[str]) -> Optional[str]:
+        """Rebuild the aggregated context from the context tasks' outputs, compacting each edge."""
+        self._compaction_stats = []
+        if not isinstance(self.context, list):
+            return context
+
+        # With compaction off every edge is passed in full, still measured for comparison
+        edges = parse_compaction(self.context_compaction) if compaction_enabled() else {}
+        default = edges.get("default", EdgeCompaction())
+        query = f"{self.description}\n{self.expected_output}"
+
+        parts = []
+        for upstream in self.context:
+            if upstream.output is None:
+                continue
+            edge = edges.get(upstream.name or "", default)
+            structured = stage_output(upstream.output)
+            content = structured.to_context() if structured else upstream.output.raw
+            text, stats = compact_output(content, upstream.name or "", edge, query)
+            parts.append(text)
+            self._compaction_stats.append(stats)
+        return CONTEXT_DIVIDER.join(parts)
+
+    def _save_file(self, result: Any) -> None:
+        if self.output_file is None:
+            return super()._save_file(result)
+
+        if self.output_pydantic is not None and isinstance(result, str):
+            structured = parse_output(self.output_pydantic, result)
+            if structured is not None:
+                result = structured.to_markdown() if self.render_markdown else structured.model_dump_json(indent=2)
+
+        path = Path(self.output_file).expanduser().resolve()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            with tmp_path.open("w", encoding="utf-8") as file:
+                if isinstance(result, dict):
+                    json.dump(result, file, ensure_ascii=False, indent=2)
+                else:
+                    file.write(str(result))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            raise RuntimeError(f"Failed to save output file: {e}")
+
+        stream_file = Path(partial_path(str(path)))
+        if stream_file.exists():
+            stream_file.unlink()
@@ -0,0 +1,131 @@
+"""
+Knowledge File Access for the GameDevs Tools
+
+Resolves knowledge files relative to wherever the crew runs, caches parsed
+forms of those files per process (invalidated by mtime) and provides the
+parsed GDD template model shared by the template tools and the validator.
+This module has no crewAI dependency so command-line tools can use it cheaply.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+TEMPLATE_RELATIVE_PATH = "knowledge/game_design_document/template.mdx"
+GUIDE_RELATIVE_PATH = "knowledge/game_design_document/instructions.mdx"
+
+
+def _knowledge_candidates(relative_path: str) -> List[str]:
+    """Candidate locations for a knowledge file, relative to where the crew may run."""
+    return [
+        relative_path,
+        f"../{relative_path}",
+        f"game_devs/{relative_path}",
+        os.path.join(os.getcwd(), relative_path)
+    ]
+
+
+_resolved_paths: Dict[str, str] = {}
+
+
+def resolve_knowledge_path(relative_path: str) -> Optional[str]:
+    """Resolve a knowledge file once per process; re-resolve only if it disappears."""
+    cached = _resolved_paths.get(relative_path)
+    if cached and os.path.exists(cached):
+        return cached
+
+    for candidate in _knowledge_candidates(relative_path):
+        if os.path.exists(candidate):
+            _resolved_paths[relative_path] = os.path.abspath(candidate)
+            return _resolved_paths[relative_path]
+    return None
+
+
+class MtimeCache:
+    """Process-wide cache of parsed files, invalidated when a file's mtime changes."""
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], Tuple[int, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str, parser: Callable[[str], Any], kind: str = "default") -> Any:
+        """Return the parsed form of `path`, re-reading and re-parsing only after it changes."""
+        mtime = os.stat(path).st_mtime_ns
+        key = (kind, path)
+        entry = self._entries.get(key)
+        if entry and entry[0] == mtime:
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == mtime:
+                return entry[1]
+            with open(path, 'r', encoding='utf-8') as file:
+                parsed = parser(file.read())
+            self._entries[key] = (mtime, parsed)
+            return parsed
+
+
+knowledge_cache = MtimeCache()
+
+
+class TemplateModel:
+    """Parsed GDD template: section lookup tables built once per template version."""
+
+    def __init__(self, content: str):
+        self.content = content
+        # Level-2 section names in template order (the required GDD sections)
+        self.section_names: List[str] = []
+        # Header title (lowercased) -> section text, including nested subsections
+        self.sections: Dict[str, str] = {}
+        self._headers: List[Tuple[str, str]] = []
+        self._parse()
+
+    def _parse(self) -> None:
+        lines = self.content.split('\n')
+        headers = []
+        for index, line in enumerate(lines):
+            stripped = line.strip()
+            if stripped.startswith('#'):
+                level = len(stripped) - len(stripped.lstrip('#'))
+                headers.append((index, level, stripped.lstrip('#').strip()))
+
+        # A section runs until the next header at level 2 or above (### children stay inside).
+        # Walk backwards tracking the nearest later header at or above each level.
+        ends = [len(lines)] * len(headers)
+        nearest = [len(lines)] * 8
+        for position in range(len(headers) - 1, -1, -1):
+            index, level, _ = headers[position]
+            ends[position] = nearest[min(max(level, 2), 7)]
+            for at_or_below in range(min(level, 7), 8):
+                nearest[at_or_below] = index
+
+        for (index, level, title), end in zip(headers, ends):
+            if level == 2:
+                self.section_names.append(title)
+            key = title.lower()
+            if key not in self.sections:
+                self.sections[key] = "\n".join(lines[index:end])
+                self._headers.append((key, title))
+
+    def extract(self, section: str) -> Optional[str]:
+        """Section text by title: exact (case-insensitive) lookup, then header prefix match."""
+        key = section.lstrip('#').strip().lower()
+        if key in self.sections:
+            return self.sections[key]
+        for header_key, _ in self._headers:
+            if header_key.startswith(key):
+                return self.sections[header_key]
+        return None
+
+
+def get_template_model() -> TemplateModel:
+    """Shared parsed template, re-parsed only when template.mdx changes on disk."""
+    template_path = resolve_knowledge_path(TEMPLATE_RELATIVE_PATH)
+    if template_path is None:
+        raise FileNotFoundError(
+            f"Template file not found at {TEMPLATE_RELATIVE_PATH} or alternative paths"
+        )
+    return knowledge_cache.get(template_path, TemplateModel, kind="template")
+
@@ -0,0 +1,347 @@
+"""
+Indexed Knowledge Store for the GameDevs Tools
+
+Indexes every text and markdown file under `knowledge/` (design guides,
+templates, genre guides, postmortems, preference notes) so one search covers
+all of them:
+
+- each file gets its own positional BM25 index of header-delimited sections;
+  plain text without headers is split into paragraph groups
+- files are re-indexed incrementally: a changed mtime or size triggers a
+  content hash, and only files whose content actually changed are re-parsed
+- sections of all files are ranked together with corpus-wide document
+  frequencies, so a term common in one guide but rare overall still counts
+- the indexes are persisted as JSON to `outputs/cache/knowledge_index.json`
+  (never pickled: the file may sit on storage shared with other hosts), so a
+  new process only stats the tree instead of re-parsing it
+- every section is also embedded for semantic search (see vector_index.py),
+  in a memory-mapped vector index next to it
+
+Searches are `hybrid` by default: the keyword (BM25) and semantic (cosine)
+rankings are merged with reciprocal rank fusion, so sections that match the
+query's wording and sections that match its meaning both surface.
+
+The tree is re-scanned at most every few seconds while searching. Configured
+by KNOWLEDGE_INDEX_PATH, KNOWLEDGE_REFRESH_SECONDS and KNOWLEDGE_SEARCH_MODE
+(keyword, semantic or hybrid); KNOWLEDGE_INDEX=off keeps the index in memory
+only.
+"""
+
+import fnmatch
+import gc
+import hashlib
+import heapq
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from game_devs.tools.knowledge import resolve_knowledge_path
+from game_devs.tools.search_index import SearchIndex, parse_query, split_markdown_sections
+from game_devs.tools.vector_index import VectorIndex
+
+TEXT_EXTENSIONS = (".md", ".mdx", ".markdown", ".txt", ".rst")
+
+DEFAULT_INDEX_PATH = "outputs/cache/knowledge_index.json"
+DEFAULT_REFRESH_SECONDS = 2.0
+
+SEARCH_MODES = ("keyword", "semantic", "hybrid")
+
+# Reciprocal rank fusion constant; damps the weight of the very top ranks
+RRF_K = 60
+
+# Bump when tokenization or the persisted layout changes, so old indexes are rebuilt
+FORMAT_VERSION = 2
+
+# Plain-text files are indexed in chunks of roughly this many characters
+TEXT_CHUNK_CHARS = 1500
+
+
+def split_text_sections(content: str, title: str) -> List[Tuple[str, str]]:
+    """Markdown sections, or paragraph groups titled after the file for text without headers."""
+    if any(line.startswith('#') for line in content.split('\n')):
+        return split_markdown_sections(content)
+
+    sections, chunk = [], []
+    for paragraph in (part.strip() for part in content.split("\n\n")):
+        if not paragraph:
+            continue
+        if chunk and sum(len(part) for part in chunk) + len(paragraph) > TEXT_CHUNK_CHARS:
+            sections.append((f"# {title}", "\n\n".join(chunk)))
+            chunk = []
+        chunk.append(paragraph)
+    if chunk:
+        sections.append((f"# {title}", "\n\n".join(chunk)))
+    return sections
+
+
+@dataclass
+class KnowledgeFile:
+    """Index of one file under the knowledge root."""
+
+    path: str
+    mtime_ns: int
+    size: int
+    digest: str
+    index: SearchIndex
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"path": self.path, "mtime_ns": self.mtime_ns, "size": self.size, "digest": self.digest,
+                "index": self.index.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "KnowledgeFile":
+        return cls(data["path"], int(data["mtime_ns"]), int(data["size"]), str(data["digest"]),
+                   SearchIndex.from_dict(data["index"]))
+
+
+@dataclass
+class SearchHit:
+    """A section matching a knowledge search."""
+
+    score: float
+    source: str
+    header: str
+    body: str
+
+    def format(self) -> str:
+        return f"📄 {self.source}\n{self.header}\n{self.body.strip()}"
+
+
+class KnowledgeStore:
+    """Incrementally maintained, persisted search index over a knowledge directory."""
+
+    def __init__(self, root: str, index_path: Optional[str] = DEFAULT_INDEX_PATH,
+                 refresh_interval: float = DEFAULT_REFRESH_SECONDS):
+        self.root = os.path.abspath(root)
+        self.index_path = index_path
+        self.refresh_interval = refresh_interval
+        self.files: Dict[str, KnowledgeFile] = {}
+        self._document_frequency: Counter = Counter()
+        self._sections = 0
+        self._total_length = 0
+        self._last_refresh = 0.0
+        self._lock = threading.RLock()
+        self._load()
+        vector_directory = os.path.join(os.path.dirname(index_path), "knowledge_vectors") if index_path else None
+        self.vectors = VectorIndex(vector_directory)
+        self._vectors_synced = False
+
+    # -- persistence -------------------------------------------------------
+
+    def _load(self) -> None:
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        # Loading creates millions of small objects; the cyclic GC would rescan them repeatedly
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as file:
+                saved = json.load(file)
+            if not isinstance(saved, dict) or saved.get("version") != FORMAT_VERSION or saved.get("root") != self.root:
+                return
+            entries = [KnowledgeFile.from_dict(entry) for entry in saved["files"]]
+        except (OSError, UnicodeDecodeError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️  Ignoring unreadable knowledge index {self.index_path} ({e})")
+            return
+        finally:
+            if gc_enabled:
+                gc.enable()
+        for entry in entries:
+            self._add(entry)
+
+    def _save(self) -> None:
+        if not self.index_path:
+            return
+        directory = os.path.dirname(self.index_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({
+                "version": FORMAT_VERSION,
+                "root": self.root,
+                "files": [entry.to_dict() for entry in self.files.values()],
+            }, file, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+
+    # -- incremental indexing ---------------------------------------------
+
+    def _add(self, entry: KnowledgeFile) -> None:
+        self.files[entry.path] = entry
+        for term, postings in entry.index.postings.items():
+            self._document_frequency[term] += len(postings)
+        self._sections += len(entry.index.lengths)
+        self._total_length += sum(entry.index.lengths)
+
+    def _remove(self, path: str) -> None:
+        entry = self.files.pop(path)
+        for term, postings in entry.index.postings.items():
+            self._document_frequency[term] -= len(postings)
+            if self._document_frequency[term] <= 0:
+                del self._document_frequency[term]
+        self._sections -= len(entry.index.lengths)
+        self._total_length -= sum(entry.index.lengths)
+
+    def _scan(self) -> Dict[str, os.stat_result]:
+        """Relative path -> stat of every text file under the root, skipping hidden entries."""
+        found = {}
+        for directory, subdirectories, names in os.walk(self.root):
+            subdirectories[:] = sorted(name for name in subdirectories if not name.startswith('.'))
+            for name in names:
+                if name.startswith('.') or not name.lower().endswith(TEXT_EXTENSIONS):
+                    continue
+                full_path = os.path.join(directory, name)
+                found[os.path.relpath(full_path, self.root).replace(os.sep, '/')] = os.stat(full_path)
+        return found
+
+    def refresh(self, force: bool = False) -> Dict[str, int]:
+        """Re-index files added, changed or removed since the last refresh."""
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_refresh and now - self._last_refresh < self.refresh_interval:
+                return counts
+            self._last_refresh = now
+
+            found = self._scan()
+            changed = False
+            for path in [path for path in self.files if path not in found]:
+                self._remove(path)
+                counts["removed"] += 1
+                changed = True
+
+            for path, stat in found.items():
+                entry = self.files.get(path)
+                if entry and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                    counts["unchanged"] += 1
+                    continue
+
+                with open(os.path.join(self.root, path), 'rb') as file:
+                    data = file.read()
+                digest = hashlib.sha256(data).hexdigest()
+                changed = True
+                if entry and entry.digest == digest:
+                    # Touched but not edited: keep the index, remember the new mtime
+                    entry.mtime_ns, entry.size = stat.st_mtime_ns, stat.st_size
+                    counts["unchanged"] += 1
+                    continue
+
+                title = os.path.splitext(os.path.basename(path))[0].replace('_', ' ')
+                index = SearchIndex(split_text_sections(data.decode('utf-8', errors='replace'), title))
+                if entry:
+                    self._remove(path)
+                self._add(KnowledgeFile(path, stat.st_mtime_ns, stat.st_size, digest, index))
+                counts["updated" if entry else "added"] += 1
+
+            if changed:
+                self._save()
+            if changed or not self._vectors_synced:
+                self.vectors.sync({
+                    path: (entry.digest, [f"{header}\n{body}" for header, body in entry.index.sections])
+                    for path, entry in self.files.items()
+                })
+                self._vectors_synced = True
+            if counts["added"] or counts["updated"] or counts["removed"]:
+                print(f"📚 Knowledge index: {counts['added']} added, {counts['updated']} updated, "
+                      f"{counts['removed']} removed, {counts['unchanged']} unchanged file(s)")
+        return counts
+
+    # -- search ------------------------------------------------------------
+
+    def _idf(self, term: str) -> float:
+        frequency = self._document_frequency.get(term, 0)
+        return math.log(1 + (self._sections - frequency + 0.5) / (frequency + 0.5))
+
+    def _paths(self, source: Optional[str]) -> List[str]:
+        return [
+            path for path in self.files
+            if not source or fnmatch.fnmatch(path, source) or source.lower() in path.lower()
+        ]
+
+    def _keyword(self, query: str, top_k: int, paths: List[str]) -> List[Tuple[float, str, int]]:
+        terms, phrases = parse_query(query)
+        average_length = self._total_length / self._sections if self._sections else 0.0
+        candidates = []
+        for path in paths:
+            for doc_id, score in self.files[path].index.scores(terms, phrases, self._idf, average_length).items():
+                if score > 0:
+                    candidates.append((score, path, doc_id))
+        return heapq.nsmallest(top_k, candidates, key=lambda item: (-item[0], item[1], item[2]))
+
+    def _semantic(self, query: str, top_k: int, paths: List[str]) -> List[Tuple[float, str, int]]:
+        rows = None if len(paths) == len(self.files) else self.vectors.rows_of(paths)
+        return [(score, path, doc_id) for path, doc_id, score in self.vectors.search(query, top_k, rows)]
+
+    def search(self, query: str, top_k: int = 5, source: Optional[str] = None,
+               mode: Optional[str] = None) -> List[SearchHit]:
+        """Best sections across all files, optionally only from paths matching `source`.
+
+        `source` is a glob (`genres/*.md`) or a substring of the relative path (`postmortems`).
+        `mode` is keyword, semantic or hybrid (default: KNOWLEDGE_SEARCH_MODE, else hybrid).
+        """
+        mode = mode or os.getenv('KNOWLEDGE_SEARCH_MODE', 'hybrid').lower()
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown knowledge search mode '{mode}'. Choose from: {', '.join(SEARCH_MODES)}")
+
+        self.refresh()
+        with self._lock:
+            paths = self._paths(source)
+            if mode == "keyword":
+                best = self._keyword(query, top_k, paths)
+            elif mode == "semantic":
+                best = self._semantic(query, top_k, paths)
+            else:
+                # Each ranking contributes 1 / (RRF_K + rank) for the sections it found
+                fused: Dict[Tuple[str, int], float] = {}
+                for ranking in (self._keyword(query, top_k * 4, paths), self._semantic(query, top_k * 4, paths)):
+                    for rank, (_, path, doc_id) in enumerate(ranking, 1):
+                        fused[(path, doc_id)] = fused.get((path, doc_id), 0.0) + 1 / (RRF_K + rank)
+                best = heapq.nsmallest(
+                    top_k, ((score, path, doc_id) for (path, doc_id), score in fused.items()),
+                    key=lambda item: (-item[0], item[1], item[2]),
+                )
+            return [
+                SearchHit(score, path, *self.files[path].index.sections[doc_id])
+                for score, path, doc_id in best
+            ]
+
+    def sources(self) -> List[Tuple[str, int]]:
+        """(relative path, section count) of every indexed file."""
+        self.refresh()
+        with self._lock:
+            return sorted((path, len(entry.index.lengths)) for path, entry in self.files.items())
+
+
+_stores: Dict[Tuple[str, Optional[str]], KnowledgeStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_knowledge_store() -> Optional[KnowledgeStore]:
+    """Store over the resolved knowledge directory, shared per process; None if there is none."""
+    root = resolve_knowledge_path("knowledge")
+    if root is None or not os.path.isdir(root):
+        return None
+
+    index_path = None
+    if os.getenv('KNOWLEDGE_INDEX', 'on').lower() != 'off':
+        index_path = os.path.abspath(os.getenv('KNOWLEDGE_INDEX_PATH', DEFAULT_INDEX_PATH))
+    key = (os.path.abspath(root), index_path)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = KnowledgeStore(
+                root,
+                index_path=index_path,
+                refresh_interval=float(os.getenv('KNOWLEDGE_REFRESH_SECONDS', DEFAULT_REFRESH_SECONDS)),
+            )
+        return _stores[key]
+
+
+def reset_knowledge_stores() -> None:
+    """Forget the shared stores (the persisted indexes stay on disk)."""
+    with _stores_lock:
+        _stores.clear()
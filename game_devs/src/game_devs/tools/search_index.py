@@ -0,0 +1,210 @@
+"""
+Inverted-Index Search for Knowledge Documents
+
+Markdown guides are split into header-delimited sections and tokenized once
+into a positional inverted index. Queries are ranked with BM25, terms are
+reduced with a light suffix stemmer, and "quoted phrases" must appear as
+consecutive words. Query cost depends on the postings of the query terms,
+not on the size of the guide.
+
+An index can also score against corpus-wide statistics (document frequencies
+and average length over many indexes), which is how the knowledge store ranks
+sections of many files together.
+"""
+
+import heapq
+import math
+import re
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+PHRASE_PATTERN = re.compile(r'"([^"]+)"')
+
+# Common English words that carry no ranking signal
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from how i in into is it its of on or so that the "
+    "their then there these this to was were what when where which while who why will with".split()
+)
+
+# Ordered (suffix, replacement) rules; the first match wins
+_SUFFIX_RULES = (
+    ("ational", "ate"), ("ization", "ize"), ("fulness", "ful"), ("iveness", "ive"),
+    ("ations", "ate"), ("ation", "ate"), ("ments", ""), ("ment", ""), ("ness", ""),
+    ("sses", "ss"), ("ches", "ch"), ("shes", "sh"), ("xes", "x"),
+    ("ings", ""), ("ing", ""), ("ies", "y"), ("ied", "y"), ("ed", ""),
+    ("ers", ""), ("er", ""), ("ly", ""), ("s", ""),
+)
+
+# Plural-looking endings that are not plurals ('class', 'status', 'analysis')
+_KEEP_S_ENDINGS = ("ss", "us", "is")
+
+_stem_cache: Dict[str, str] = {}
+
+
+def stem(word: str) -> str:
+    """Reduce a lowercase word to a crude stem so 'mechanics'/'mechanic' and 'designing'/'design' match."""
+    cached = _stem_cache.get(word)
+    if cached is not None:
+        return cached
+
+    result = word
+    if len(word) > 3 and not word.isdigit():
+        for suffix, replacement in _SUFFIX_RULES:
+            if not word.endswith(suffix) or len(word) - len(suffix) < 3:
+                continue
+            if suffix == "s" and word.endswith(_KEEP_S_ENDINGS):
+                break
+            result = word[: len(word) - len(suffix)] + replacement
+            break
+
+        # 'running' -> 'run', 'planned' -> 'plan'
+        if result != word and len(result) > 3 and result[-1] == result[-2] and result[-1] not in "lsz":
+            result = result[:-1]
+        # Drop a final 'e' so 'game'/'games' and 'base'/'based' share a stem
+        if len(result) > 3 and result.endswith("e"):
+            result = result[:-1]
+
+    _stem_cache[word] = result
+    return result
+
+
+def tokenize(text: str, drop_stop_words: bool = True) -> List[str]:
+    """Lowercase, split into alphanumeric words and stem them."""
+    return [
+        stem(token)
+        for token in TOKEN_PATTERN.findall(text.lower())
+        if not (drop_stop_words and token in STOP_WORDS)
+    ]
+
+
+def split_markdown_sections(content: str) -> List[Tuple[str, str]]:
+    """Split markdown into (header line, body) pairs at every header."""
+    sections = []
+    header = ""
+    body: List[str] = []
+
+    for line in content.split('\n'):
+        if line.startswith('#'):
+            if body:
+                sections.append((header, "\n".join(body)))
+            header = line
+            body = []
+        else:
+            body.append(line)
+
+    if body:
+        sections.append((header, "\n".join(body)))
+
+    return sections
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """Ranking terms and "quoted phrases" (as token lists) of a query."""
+    phrases = [tokenize(phrase, drop_stop_words=False) for phrase in PHRASE_PATTERN.findall(query)]
+    phrases = [phrase for phrase in phrases if phrase]
+    terms = tokenize(PHRASE_PATTERN.sub(" ", query))
+    for phrase in phrases:
+        terms.extend(term for term in phrase if term not in STOP_WORDS)
+    if not terms and not phrases:
+        terms = tokenize(query, drop_stop_words=False)
+    return terms, phrases
+
+
+class SearchIndex:
+    """Positional inverted index over document sections with BM25 ranking."""
+
+    K1 = 1.5
+    B = 0.75
+    # Header words count this many times, so a section titled with the query ranks first
+    HEADER_WEIGHT = 2
+
+    def __init__(self, sections: List[Tuple[str, str]]):
+        self.sections = sections
+        # term -> {section id -> positions}
+        self.postings: Dict[str, Dict[int, List[int]]] = defaultdict(dict)
+        self.lengths: List[int] = []
+
+        for doc_id, (header, body) in enumerate(sections):
+            header_tokens = tokenize(header.lstrip('#'), drop_stop_words=False)
+            tokens = header_tokens * self.HEADER_WEIGHT + tokenize(body, drop_stop_words=False)
+            self.lengths.append(len(tokens))
+            for position, token in enumerate(tokens):
+                self.postings[token].setdefault(doc_id, []).append(position)
+
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+    @classmethod
+    def from_markdown(cls, content: str) -> "SearchIndex":
+        return cls(split_markdown_sections(content))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Sections, postings and lengths as plain JSON data."""
+        return {
+            "sections": [list(section) for section in self.sections],
+            # JSON object keys are strings: postings become [doc id, positions] pairs
+            "postings": {term: [[doc_id, positions] for doc_id, positions in postings.items()]
+                         for term, postings in self.postings.items()},
+            "lengths": self.lengths,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SearchIndex":
+        """An index saved with `to_dict`, without tokenizing the sections again."""
+        index = cls([])
+        index.sections = [(header, body) for header, body in data["sections"]]
+        for term, postings in data["postings"].items():
+            index.postings[term] = {doc_id: positions for doc_id, positions in postings}
+        index.lengths = list(data["lengths"])
+        index.average_length = (sum(index.lengths) / len(index.lengths)) if index.lengths else 0.0
+        return index
+
+    def document_frequency(self, term: str) -> int:
+        return len(self.postings.get(term, {}))
+
+    def _idf(self, term: str) -> float:
+        document_frequency = self.document_frequency(term)
+        total = len(self.lengths)
+        return math.log(1 + (total - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _contains_phrase(self, doc_id: int, phrase: List[str]) -> bool:
+        first_positions = self.postings.get(phrase[0], {}).get(doc_id, [])
+        following = [set(self.postings.get(term, {}).get(doc_id, [])) for term in phrase[1:]]
+        return any(
+            all(start + offset in positions for offset, positions in enumerate(following, start=1))
+            for start in first_positions
+        )
+
+    def scores(self, terms: List[str], phrases: List[List[str]],
+               idf: Callable[[str], float], average_length: float) -> Dict[int, float]:
+        """BM25 score of every matching section, with the given corpus statistics."""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(terms):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            weight = idf(term)
+            for doc_id, positions in postings.items():
+                frequency = len(positions)
+                norm = self.K1 * (1 - self.B + self.B * self.lengths[doc_id] / (average_length or 1))
+                scores[doc_id] += weight * frequency * (self.K1 + 1) / (frequency + norm)
+
+        if phrases:
+            candidates = scores.keys() if scores else range(len(self.lengths))
+            scores = {
+                doc_id: scores.get(doc_id, 0.0) + len(phrases)
+                for doc_id in list(candidates)
+                if all(self._contains_phrase(doc_id, phrase) for phrase in phrases)
+            }
+        return scores
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[float, int]]:
+        """Return up to `top_k` (score, section id) pairs, best first."""
+        terms, phrases = parse_query(query)
+        scores = self.scores(terms, phrases, self._idf, self.average_length)
+        ranked = heapq.nsmallest(top_k, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(score, doc_id) for doc_id, score in ranked if score > 0]
+
+    def format_section(self, doc_id: int) -> str:
+        header, body = self.sections[doc_id]
+        return f"{header}\n{body}"
@@ -9,7 +9,18 @@ from crewai.tools import BaseTool
 from typing import Type, Optional, List, Dict
 from pydantic import BaseModel, Field
 import os
-import re
+
+from game_devs.tools.knowledge import (
+    GUIDE_RELATIVE_PATH,
+    TemplateModel,
+    get_template_model,
+    knowledge_cache,
+    resolve_knowledge_path,
+)
+from game_devs.tools.knowledge_store import get_knowledge_store
+from game_devs.tools.search_index import SearchIndex
+from game_devs.schemas import GDD, parse_output
+from game_devs.validation import get_validator
 
 
 class GDDTemplateReaderInput(BaseModel):
@@ -29,41 +40,24 @@ class GDDTemplateReaderTool(BaseTool):
     def _run(self, section: Optional[str] = None) -> str:
         """Read the GDD template file and return its content."""
         try:
-            # Use relative path from game_devs directory (where crew runs)
-            template_path = "knowledge/game_design_document/template.mdx"
-
-            if not os.path.exists(template_path):
-                # Try alternative paths
-                alt_paths = [
-                    "../knowledge/game_design_document/template.mdx",
-                    "game_devs/knowledge/game_design_document/template.mdx",
-                    os.path.join(os.getcwd(), "knowledge/game_design_document/template.mdx")
-                ]
-
-                for alt_path in alt_paths:
-                    if os.path.exists(alt_path):
-                        template_path = alt_path
-                        break
-                else:
-                    return f"❌ Error: Template file not found at {template_path} or alternative paths"
+            template = get_template_model()
 
-            with open(template_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-
-            if not content.strip():
+            if not template.content.strip():
                 return "❌ Error: Template file is empty"
 
             if section:
                 # Extract specific section if requested
-                section_content = self._extract_section(content, section)
+                section_content = self._extract_section(template, section)
                 if section_content:
                     return section_content
                 else:
-                    available_sections = self._get_available_sections(content)
+                    available_sections = self._get_available_sections(template)
                     return f"❌ Section '{section}' not found in template.\n\n📋 Available sections:\n{chr(10).join(available_sections)}"
 
-            return content
+            return template.content
 
+        except FileNotFoundError as e:
+            return f"❌ Error: {str(e)}"
         except UnicodeDecodeError:
             return "❌ Error: Template file contains invalid characters. Please ensure it's UTF-8 encoded."
         except PermissionError:
@@ -71,59 +65,19 @@ class GDDTemplateReaderTool(BaseTool):
         except Exception as e:
             return f"❌ Error reading template: {str(e)}"
 
-    def _extract_section(self, content: str, section: str) -> Optional[str]:
-        """Extract a specific section from the template."""
-        lines = content.split('\n')
-        section_content = []
-        in_section = False
-
-        # Try different section header formats
-        possible_headers = [
-            f"## {section}",
-            f"### {section}",
-            f"# {section}",
-            section  # Exact match
-        ]
-
-        for line in lines:
-            # Check if we've reached the next section
-            if line.strip().startswith("#") and in_section and section_content:
-                # Check if this is a new section at the same or higher level
-                current_level = len(line) - len(line.lstrip('#'))
-                section_level = 2  # Assume we're looking for ## level sections
-                if current_level <= section_level:
-                    break
-
-            # Check if this line starts our target section
-            if not in_section:
-                for header in possible_headers:
-                    if line.strip().startswith(header):
-                        in_section = True
-                        section_content.append(line)
-                        break
-            elif in_section:
-                section_content.append(line)
+    def _extract_section(self, template: TemplateModel, section: str) -> Optional[str]:
+        """Extract a specific section from the parsed template."""
+        return template.extract(section)
 
-        return "\n".join(section_content) if section_content else None
-
-    def _get_available_sections(self, content: str) -> List[str]:
+    def _get_available_sections(self, template: TemplateModel) -> List[str]:
         """Get list of available sections in the template."""
-        sections = []
-        lines = content.split('\n')
-
-        for line in lines:
-            line = line.strip()
-            if line.startswith('##') and not line.startswith('###'):
-                # Extract section name
-                section_name = line.lstrip('#').strip()
-                sections.append(f"• {section_name}")
-
+        sections = [f"• {section_name}" for section_name in template.section_names]
         return sections if sections else ["• No sections found"]
 
 
 class TemplateValidationInput(BaseModel):
     """Input schema for Template Validation Tool."""
-    document_content: str = Field(..., description="The GDD document content to validate against template")
+    document_content: str = Field(..., description="The GDD document (markdown or GDD JSON) to validate against template")
 
 
 class TemplateValidationTool(BaseTool):
@@ -137,107 +91,21 @@ class TemplateValidationTool(BaseTool):
     def _run(self, document_content: str) -> str:
         """Validate document structure against template."""
         try:
-            # Get template structure
-            template_reader = GDDTemplateReaderTool()
-            template_content = template_reader._run()
-
-            if template_content.startswith("❌"):
-                return f"❌ Cannot validate: {template_content}"
-
-            # Extract required sections from template
-            required_sections = self._extract_required_sections(template_content)
-
-            # Extract sections from document
-            document_sections = self._extract_document_sections(document_content)
-
-            # Validate structure
-            validation_report = self._generate_validation_report(required_sections, document_sections)
-
-            return validation_report
+            # Validator compiled from the shared parsed template
+            try:
+                validator = get_validator()
+            except FileNotFoundError as e:
+                return f"❌ Cannot validate: ❌ Error: {str(e)}"
+
+            # A structured GDD (see schemas.py) is checked by its section list
+            gdd = parse_output(GDD, document_content) if document_content.lstrip().startswith('{') else None
+            if gdd is not None:
+                return validator.validate_sections(gdd.section_pairs()).to_report()
+            return validator.validate(document_content).to_report()
 
         except Exception as e:
             return f"❌ Error during validation: {str(e)}"
 
-    def _extract_required_sections(self, template_content: str) -> List[str]:
-        """Extract required sections from template."""
-        sections = []
-        lines = template_content.split('\n')
-
-        for line in lines:
-            line = line.strip()
-            if line.startswith('##') and not line.startswith('###'):
-                section_name = line.lstrip('#').strip()
-                sections.append(section_name)
-
-        return sections
-
-    def _extract_document_sections(self, document_content: str) -> List[str]:
-        """Extract sections from the document being validated."""
-        sections = []
-        lines = document_content.split('\n')
-
-        for line in lines:
-            line = line.strip()
-            if line.startswith('##') and not line.startswith('###'):
-                section_name = line.lstrip('#').strip()
-                sections.append(section_name)
-
-        return sections
-
-    def _generate_validation_report(self, required_sections: List[str], document_sections: List[str]) -> str:
-        """Generate a validation report."""
-        report = ["📋 Template Structure Validation Report", "=" * 50]
-
-        # Check for missing sections
-        missing_sections = []
-        for required in required_sections:
-            if not any(self._sections_match(required, doc_section) for doc_section in document_sections):
-                missing_sections.append(required)
-
-        # Check for extra sections
-        extra_sections = []
-        for doc_section in document_sections:
-            if not any(self._sections_match(doc_section, required) for required in required_sections):
-                extra_sections.append(doc_section)
-
-        # Generate report
-        if not missing_sections and not extra_sections:
-            report.append("✅ Document structure is complete and follows template!")
-        else:
-            if missing_sections:
-                report.append(f"❌ Missing {len(missing_sections)} required section(s):")
-                for section in missing_sections:
-                    report.append(f"  • {section}")
-
-            if extra_sections:
-                report.append(f"ℹ️  Found {len(extra_sections)} additional section(s):")
-                for section in extra_sections:
-                    report.append(f"  • {section}")
-
-        report.append("")
-        report.append("📊 Section Coverage:")
-        report.append(f"Required sections: {len(required_sections)}")
-        report.append(f"Document sections: {len(document_sections)}")
-        report.append(f"Missing sections: {len(missing_sections)}")
-
-        return "\n".join(report)
-
-    def _sections_match(self, section1: str, section2: str) -> bool:
-        """Check if two section names match (case-insensitive, flexible matching)."""
-        # Normalize section names for comparison
-        s1 = re.sub(r'[^a-zA-Z0-9\s]', '', section1.lower()).strip()
-        s2 = re.sub(r'[^a-zA-Z0-9\s]', '', section2.lower()).strip()
-
-        # Direct match
-        if s1 == s2:
-            return True
-
-        # Partial match (one contains the other)
-        if s1 in s2 or s2 in s1:
-            return True
-
-        return False
-
 
 class DesignGuideSearchInput(BaseModel):
     """Input schema for Design Guide Search Tool."""
@@ -249,39 +117,26 @@ class DesignGuideSearchTool(BaseTool):
     description: str = (
         "Searches the comprehensive game design guide for specific guidance, best practices, "
         "and examples related to game design document creation. Use this to find relevant "
-        "advice for specific design challenges or to understand best practices for GDD sections."
+        "advice for specific design challenges or to understand best practices for GDD sections. "
+        "Wrap words in double quotes to search for an exact phrase."
     )
     args_schema: Type[BaseModel] = DesignGuideSearchInput
 
     def _run(self, query: str) -> str:
         """Search the design guide for relevant information."""
         try:
-            # Use relative path from game_devs directory (where crew runs)
-            guide_path = "knowledge/game_design_document/instructions.mdx"
+            guide_path = resolve_knowledge_path(GUIDE_RELATIVE_PATH)
+            if guide_path is None:
+                return f"❌ Error: Design guide not found at {GUIDE_RELATIVE_PATH} or alternative paths"
 
-            if not os.path.exists(guide_path):
-                # Try alternative paths
-                alt_paths = [
-                    "../knowledge/game_design_document/instructions.mdx",
-                    "game_devs/knowledge/game_design_document/instructions.mdx",
-                    os.path.join(os.getcwd(), "knowledge/game_design_document/instructions.mdx")
-                ]
-
-                for alt_path in alt_paths:
-                    if os.path.exists(alt_path):
-                        guide_path = alt_path
-                        break
-                else:
-                    return f"❌ Error: Design guide not found at {guide_path} or alternative paths"
-
-            with open(guide_path, 'r', encoding='utf-8') as file:
-                content = file.read()
+            # Tokenized once into an inverted index, rebuilt only when the guide changes
+            index = knowledge_cache.get(guide_path, SearchIndex.from_markdown, kind="guide_index")
 
-            if not content.strip():
+            if not index.sections:
                 return "❌ Error: Design guide file is empty"
 
-            # Perform enhanced search
-            relevant_sections = self._enhanced_search(content, query)
+            # Perform ranked search
+            relevant_sections = self._enhanced_search(index, query)
 
             if relevant_sections:
                 return f"🔍 Search results for '{query}':\n\n" + "\n\n---\n\n".join(relevant_sections)
@@ -297,54 +152,9 @@ class DesignGuideSearchTool(BaseTool):
         except Exception as e:
             return f"❌ Error searching design guide: {str(e)}"
 
-    def _enhanced_search(self, content: str, query: str) -> List[str]:
-        """Enhanced search with better matching and ranking."""
-        lines = content.split('\n')
-        relevant_sections = []
-        current_section = []
-        current_header = ""
-
-        query_terms = query.lower().split()
-
-        for line in lines:
-            if line.startswith('#'):
-                # Process previous section
-                if current_section:
-                    score = self._calculate_relevance_score(current_section, query_terms)
-                    if score > 0:
-                        relevant_sections.append((score, f"{current_header}\n" + "\n".join(current_section)))
-
-                # Start new section
-                current_header = line
-                current_section = []
-            else:
-                current_section.append(line)
-
-        # Check last section
-        if current_section:
-            score = self._calculate_relevance_score(current_section, query_terms)
-            if score > 0:
-                relevant_sections.append((score, f"{current_header}\n" + "\n".join(current_section)))
-
-        # Sort by relevance score and return top results
-        relevant_sections.sort(key=lambda x: x[0], reverse=True)
-        return [section[1] for section in relevant_sections[:3]]
-
-    def _calculate_relevance_score(self, section_lines: List[str], query_terms: List[str]) -> float:
-        """Calculate relevance score for a section."""
-        section_text = " ".join(section_lines).lower()
-
-        score = 0
-        for term in query_terms:
-            # Exact matches get higher score
-            score += section_text.count(term) * 2
-
-            # Partial matches get lower score
-            for word in section_text.split():
-                if term in word:
-                    score += 0.5
-
-        return score
+    def _enhanced_search(self, index: SearchIndex, query: str) -> List[str]:
+        """BM25-ranked search with stemming; "quoted phrases" must match word for word."""
+        return [index.format_section(doc_id) for _, doc_id in index.search(query, top_k=3)]
 
     def _get_search_suggestions(self, query: str) -> str:
         """Get search suggestions based on common terms."""
@@ -375,6 +185,49 @@ class DesignGuideSearchTool(BaseTool):
         return "\n".join(f"  • {term}" for term in suggested_terms[:5])
 
 
+class KnowledgeSearchInput(BaseModel):
+    """Input schema for Knowledge Search Tool."""
+    query: str = Field(..., description="Search query to find relevant guidance across all knowledge files")
+    source: Optional[str] = Field(
+        None,
+        description="Only search files whose path matches this glob or contains this text, e.g. 'postmortems' (optional)"
+    )
+
+
+class KnowledgeSearchTool(BaseTool):
+    name: str = "Knowledge Search"
+    description: str = (
+        "Searches every guide, template, postmortem and note in the knowledge directory at once "
+        "and returns the most relevant sections with the file they come from. Use this to find "
+        "design guidance, genre conventions, lessons from past projects or user preferences. "
+        "Sections are ranked by both matching words and related meaning. Wrap words in double quotes to search for an exact phrase."
+    )
+    args_schema: Type[BaseModel] = KnowledgeSearchInput
+
+    def _run(self, query: str, source: Optional[str] = None) -> str:
+        """Search the indexed knowledge store."""
+        try:
+            store = get_knowledge_store()
+            if store is None:
+                return "❌ Error: Knowledge directory not found at knowledge or alternative paths"
+
+            hits = store.search(query, top_k=5, source=source)
+            if hits:
+                scope = f" in '{source}'" if source else ""
+                return f"🔍 Knowledge results for '{query}'{scope}:\n\n" + "\n\n---\n\n".join(hit.format() for hit in hits)
+
+            indexed = store.sources()
+            if not indexed:
+                return "❌ Error: No text or markdown files found in the knowledge directory"
+            listing = "\n".join(f"  • {path} ({sections} sections)" for path, sections in indexed[:20])
+            return f"🔍 No knowledge found for '{query}'.\n\n📚 Indexed sources:\n{listing}"
+
+        except PermissionError:
+            return "❌ Error: Permission denied reading the knowledge directory."
+        except Exception as e:
+            return f"❌ Error searching knowledge: {str(e)}"
+
+
 class KnowledgeDirectoryInput(BaseModel):
     """Input schema for Knowledge Directory Tool."""
     path: Optional[str] = Field("", description="Specific subdirectory to explore (optional)")
@@ -475,6 +328,7 @@ class GDDTemplateTools:
     def __init__(self):
         self.template_reader = GDDTemplateReaderTool()
         self.design_guide_search = DesignGuideSearchTool()
+        self.knowledge_search = KnowledgeSearchTool()
         self.knowledge_explorer = KnowledgeDirectoryTool()
         self.template_validator = TemplateValidationTool()
 
@@ -484,6 +338,7 @@ class GDDTemplateTools:
         return [
             self.template_reader,
             self.design_guide_search,
+            self.knowledge_search,
             self.knowledge_explorer,
             self.template_validator
         ]
@@ -0,0 +1,245 @@
+"""
+Local Vector Search for the GameDevs Tools
+
+Semantic search without an embedding service: texts are embedded with hashed
+TF-IDF, computed locally with NumPy.
+
+- features are stemmed words and word pairs, hashed into a fixed number of
+  dimensions with a sign bit (so collisions tend to cancel out rather than
+  add up), weighted by sublinear term frequency
+- document frequencies, and from them IDF weights, come from the indexed
+  chunks themselves
+- the chunk x dimension matrix of term frequencies is stored as a float32
+  `.npy` file and memory-mapped, with the IDF vector and the row norms next
+  to it, so opening an index reads no vectors up front
+- cosine top-k is one matrix-vector product (a matrix product for a batch of
+  queries) followed by `argpartition`
+
+`VectorIndex.sync` keeps the matrix in step with the knowledge store: rows of
+unchanged files are copied from the previous matrix and only changed files
+are embedded again. `local_embedding_function` exposes the same embedder to
+crewAI memory (chromadb), so memory works offline too.
+"""
+
+import json
+import math
+import os
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from game_devs.tools.search_index import tokenize
+
+DIMENSIONS = 1024
+
+# Bump when the features or the file layout change, so old vector indexes are rebuilt
+FORMAT_VERSION = 1
+
+# Word pairs count half as much as single words
+BIGRAM_WEIGHT = 0.5
+
+# Features whose hash bucket is remembered (word pairs alone can number in the millions)
+BUCKET_CACHE_SIZE = 200_000
+
+# Rows per block when computing statistics over the whole matrix
+CHUNK_ROWS = 4096
+
+
+def _bucket(feature: str, dimensions: int) -> Tuple[int, float]:
+    # crc32 is stable across processes, unlike hash()
+    value = zlib.crc32(feature.encode('utf-8'))
+    return value % dimensions, (1.0 if value & 0x80000000 else -1.0)
+
+
+class HashedEmbedder:
+    """Hashed term-frequency vectors; weighting by IDF is left to the index."""
+
+    def __init__(self, dimensions: int = DIMENSIONS):
+        self.dimensions = dimensions
+        self._buckets: Dict[str, Tuple[int, float]] = {}
+
+    def term_frequencies(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), dimensions) float32 matrix of signed, sublinear term frequencies."""
+        rows, columns, values = [], [], []
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            weights = {token: 1.0 + math.log(count) for token, count in Counter(tokens).items()}
+            for pair, count in Counter(zip(tokens, tokens[1:])).items():
+                weights[" ".join(pair)] = BIGRAM_WEIGHT * (1.0 + math.log(count))
+            for feature, weight in weights.items():
+                bucket = self._buckets.get(feature)
+                if bucket is None:
+                    bucket = _bucket(feature, self.dimensions)
+                    if len(self._buckets) < BUCKET_CACHE_SIZE:
+                        self._buckets[feature] = bucket
+                rows.append(row)
+                columns.append(bucket[0])
+                values.append(bucket[1] * weight)
+
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        # Colliding features of a row add up
+        np.add.at(matrix, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)), np.array(values, dtype=np.float32))
+        return matrix
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """L2-normalized vectors without IDF weighting (for corpora without statistics, e.g. memory)."""
+        matrix = self.term_frequencies(texts)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+
+def top_k(scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+    """(row, score) of the k highest positive scores, best first."""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return []
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    ranked = candidates[np.lexsort((candidates, -scores[candidates]))]
+    return [(int(row), float(scores[row])) for row in ranked if scores[row] > 0]
+
+
+class VectorIndex:
+    """Memory-mapped hashed TF-IDF vectors of the sections of many files."""
+
+    def __init__(self, directory: Optional[str] = None, dimensions: int = DIMENSIONS):
+        # Without a directory the vectors are kept in memory only
+        self.directory = directory
+        self.embedder = HashedEmbedder(dimensions)
+        # path -> (digest, first row, row count)
+        self.files: Dict[str, Tuple[str, int, int]] = {}
+        self.matrix = np.zeros((0, dimensions), dtype=np.float32)
+        self.idf = np.ones(dimensions, dtype=np.float32)
+        self.norms = np.zeros(0, dtype=np.float32)
+        self._load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self) -> None:
+        if not self.directory or not os.path.exists(self._path("meta.json")):
+            return
+        try:
+            with open(self._path("meta.json"), 'r', encoding='utf-8') as file:
+                meta = json.load(file)
+            if meta.get("version") != FORMAT_VERSION or meta.get("dimensions") != self.embedder.dimensions:
+                return
+            matrix = np.load(self._path("matrix.npy"), mmap_mode='r')
+            idf = np.load(self._path("idf.npy"))
+            norms = np.load(self._path("norms.npy"))
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable vector index in {self.directory} ({e})")
+            return
+        if matrix.shape[0] != norms.shape[0]:
+            return
+        self.files = {path: tuple(entry) for path, entry in meta["files"].items()}
+        self.matrix, self.idf, self.norms = matrix, idf, norms
+
+    def sync(self, files: Dict[str, Tuple[str, List[str]]]) -> bool:
+        """Match the index to `files` (path -> (digest, section texts)); returns whether it changed."""
+        if {path: digest for path, (digest, _) in files.items()} == {
+            path: entry[0] for path, entry in self.files.items()
+        }:
+            return False
+
+        layout, row = {}, 0
+        for path in sorted(files):
+            digest, sections = files[path]
+            layout[path] = (digest, row, len(sections))
+            row += len(sections)
+
+        # Rows are written straight into the new matrix (on disk when persisted), never held twice
+        dimensions = self.embedder.dimensions
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            matrix = np.lib.format.open_memmap(self._temporary("matrix.npy"), mode='w+', dtype=np.float32,
+                                               shape=(row, dimensions))
+        else:
+            matrix = np.zeros((row, dimensions), dtype=np.float32)
+        for path, (digest, start, count) in layout.items():
+            previous = self.files.get(path)
+            if previous and previous[0] == digest and previous[2] == count:
+                matrix[start:start + count] = self.matrix[previous[1]:previous[1] + count]
+            elif count:
+                matrix[start:start + count] = self.embedder.term_frequencies(files[path][1])
+
+        document_frequency = np.zeros(dimensions, dtype=np.int64)
+        for first in range(0, row, CHUNK_ROWS):
+            document_frequency += np.count_nonzero(matrix[first:first + CHUNK_ROWS], axis=0)
+        idf = (np.log((1 + row) / (1 + document_frequency)) + 1).astype(np.float32)
+        squared_idf = np.square(idf)
+        norms = np.zeros(row, dtype=np.float32)
+        for first in range(0, row, CHUNK_ROWS):
+            norms[first:first + CHUNK_ROWS] = np.sqrt(np.square(matrix[first:first + CHUNK_ROWS]) @ squared_idf)
+
+        self.files, self.idf, self.norms = layout, idf, norms
+        self.matrix = self._save(matrix) if self.directory else matrix
+        return True
+
+    def _temporary(self, name: str) -> str:
+        return self._path(f"{name}.{os.getpid()}.tmp")
+
+    def _save(self, matrix: np.memmap) -> np.ndarray:
+        """Write the rest of the index next to the matrix, swap it in atomically and return the matrix re-opened read-only."""
+        matrix.flush()
+        del matrix
+        for name, array in (("idf.npy", self.idf), ("norms.npy", self.norms)):
+            with open(self._temporary(name), 'wb') as file:
+                np.save(file, array)
+        with open(self._temporary("meta.json"), 'w', encoding='utf-8') as file:
+            json.dump({"version": FORMAT_VERSION, "dimensions": self.embedder.dimensions, "files": self.files}, file)
+        for name in ("matrix.npy", "idf.npy", "norms.npy", "meta.json"):
+            os.replace(self._temporary(name), self._path(name))
+        return np.load(self._path("matrix.npy"), mmap_mode='r')
+
+    def rows_of(self, paths: List[str]) -> np.ndarray:
+        """Row numbers of the sections of `paths`."""
+        ranges = [np.arange(start, start + count) for _, start, count in (self.files[path] for path in paths)]
+        return np.concatenate(ranges) if ranges else np.zeros(0, dtype=np.int64)
+
+    def search_many(self, queries: Sequence[str], k: int = 5,
+                    rows: Optional[np.ndarray] = None) -> List[List[Tuple[str, int, float]]]:
+        """Cosine top-k (path, section id, score) for a batch of queries, optionally within `rows`."""
+        if not self.matrix.shape[0]:
+            return [[] for _ in queries]
+        frequencies = self.embedder.term_frequencies(queries)
+        weighted = frequencies * np.square(self.idf)
+        query_norms = np.linalg.norm(frequencies * self.idf, axis=1)
+
+        matrix, norms = self.matrix, self.norms
+        if rows is not None:
+            matrix, norms = matrix[rows], norms[rows]
+        # cos(tf_i * idf, tf_q * idf) = tf_i . (tf_q * idf^2) / (|tf_i * idf| |tf_q * idf|)
+        scores = (matrix @ weighted.T).T
+        scores /= np.where(norms == 0, 1, norms) * np.where(query_norms == 0, 1, query_norms)[:, None]
+
+        starts = sorted((start, path) for path, (_, start, _) in self.files.items())
+        first_rows = [start for start, _ in starts]
+        results = []
+        for query_scores in scores:
+            hits = []
+            for position, score in top_k(query_scores, k):
+                row = int(rows[position]) if rows is not None else position
+                index = int(np.searchsorted(first_rows, row, side='right')) - 1
+                start, path = starts[index]
+                hits.append((path, row - start, score))
+            results.append(hits)
+        return results
+
+    def search(self, query: str, k: int = 5, rows: Optional[np.ndarray] = None) -> List[Tuple[str, int, float]]:
+        return self.search_many([query], k, rows)[0]
+
+
+def local_embedding_function():
+    """chromadb embedding function backed by the hashed embedder, for crewAI memory."""
+    from chromadb import Documents, EmbeddingFunction, Embeddings
+
+    class LocalEmbeddingFunction(EmbeddingFunction[Documents]):
+        def __init__(self):
+            self.embedder = HashedEmbedder()
+
+        def __call__(self, input: Documents) -> Embeddings:
+            return list(self.embedder.embed(list(input)))
+
+    return LocalEmbeddingFunction()
@@ -0,0 +1,429 @@
+"""
+GDD Structure Validation for the GameDevs Crew
+
+Checks generated Game Design Documents against the GDD template. The template
+is compiled once into lookup tables (normalized header -> section, template
+order, placeholder lines), so validating a document is a single pass over its
+lines plus dictionary lookups. Besides missing sections the validator reports
+required sections written at the wrong header level, sections left empty,
+placeholder text copied from the template and sections out of template order.
+Structured GDDs (see schemas.py) are checked the same way from their list of
+sections, without going through markdown, including the `*_gdd.json` files
+written with structured outputs on.
+
+`validate_paths` validates every matching file under a set of directories in
+parallel worker processes; it backs the `validate` command.
+"""
+
+import bisect
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from fnmatch import fnmatch
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from game_devs.tools.knowledge import (
+    TEMPLATE_RELATIVE_PATH,
+    TemplateModel,
+    get_template_model,
+    knowledge_cache,
+    resolve_knowledge_path,
+)
+
+_NON_ALPHANUMERIC = re.compile(r'[^a-z0-9\s]')
+_WHITESPACE = re.compile(r'\s+')
+_LIST_MARKER = re.compile(r'^(?:[-*+]|\d+[.)])\s+')
+
+# Comma-separated; structured runs write the GDD as JSON (see schemas.py)
+DEFAULT_PATTERN = "*_gdd.md,*_gdd.json"
+
+
+def normalize_header(title: str) -> str:
+    """Canonical form of a header title used for every comparison."""
+    return _WHITESPACE.sub(' ', _NON_ALPHANUMERIC.sub('', title.lower())).strip()
+
+
+def _normalize_line(line: str) -> str:
+    return normalize_header(_LIST_MARKER.sub('', line.strip()))
+
+
+@dataclass
+class DocumentHeader:
+    """A markdown header of a validated document."""
+
+    level: int
+    title: str
+    key: str
+    line: int
+    index: int
+    has_content: bool = False
+
+
+def parse_headers(content: str) -> List[DocumentHeader]:
+    """Headers of a markdown document, each flagged with whether any text follows it."""
+    headers: List[DocumentHeader] = []
+    in_code_block = False
+    for number, line in enumerate(content.split('\n'), start=1):
+        stripped = line.strip()
+        if stripped.startswith('```'):
+            in_code_block = not in_code_block
+            continue
+        if in_code_block:
+            if headers:
+                headers[-1].has_content = True
+            continue
+        if stripped.startswith('#'):
+            title = stripped.lstrip('#').strip()
+            level = len(stripped) - len(stripped.lstrip('#'))
+            headers.append(DocumentHeader(level, title, normalize_header(title), number, len(headers)))
+        elif stripped and headers:
+            headers[-1].has_content = True
+    return headers
+
+
+@dataclass
+class ValidationResult:
+    """Outcome of validating one document."""
+
+    path: Optional[str] = None
+    required_count: int = 0
+    section_count: int = 0
+    missing_sections: List[str] = field(default_factory=list)
+    extra_sections: List[str] = field(default_factory=list)
+    level_issues: List[str] = field(default_factory=list)
+    empty_sections: List[str] = field(default_factory=list)
+    placeholders: List[str] = field(default_factory=list)
+    out_of_order: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def is_valid(self) -> bool:
+        """Valid documents have every section, no empty sections and no template placeholders."""
+        return not (self.error or self.missing_sections or self.empty_sections or self.placeholders)
+
+    @property
+    def warning_count(self) -> int:
+        return len(self.level_issues) + len(self.out_of_order) + len(self.extra_sections)
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["valid"] = self.is_valid
+        return data
+
+    def to_report(self) -> str:
+        """Human-readable report in the style of the template tools."""
+        report = ["📋 Template Structure Validation Report", "=" * 50]
+        if self.error:
+            report.append(f"❌ {self.error}")
+            return "\n".join(report)
+
+        if self.is_valid and not self.warning_count:
+            report.append("✅ Document structure is complete and follows template!")
+
+        if self.missing_sections:
+            report.append(f"❌ Missing {len(self.missing_sections)} required section(s):")
+            report.extend(f"  • {section}" for section in self.missing_sections)
+        if self.empty_sections:
+            report.append(f"❌ {len(self.empty_sections)} section(s) have no content:")
+            report.extend(f"  • {section}" for section in self.empty_sections)
+        if self.placeholders:
+            report.append(f"❌ {len(self.placeholders)} line(s) still contain template placeholder text:")
+            report.extend(f"  • {placeholder}" for placeholder in self.placeholders)
+        if self.level_issues:
+            report.append(f"⚠️  {len(self.level_issues)} section(s) at an unexpected header level:")
+            report.extend(f"  • {issue}" for issue in self.level_issues)
+        if self.out_of_order:
+            report.append(f"⚠️  {len(self.out_of_order)} section(s) out of template order:")
+            report.extend(f"  • {section}" for section in self.out_of_order)
+        if self.extra_sections:
+            report.append(f"ℹ️  Found {len(self.extra_sections)} additional section(s):")
+            report.extend(f"  • {section}" for section in self.extra_sections)
+
+        report.append("")
+        report.append("📊 Section Coverage:")
+        report.append(f"Required sections: {self.required_count}")
+        report.append(f"Document sections: {self.section_count}")
+        report.append(f"Missing sections: {len(self.missing_sections)}")
+        return "\n".join(report)
+
+
+class GDDValidator:
+    """Template compiled into lookup tables for fast repeated validation."""
+
+    SECTION_LEVEL = 2
+
+    def __init__(self, template: TemplateModel):
+        self.required: List[str] = list(template.section_names)
+        # Normalized title -> template position of each required section
+        self.order: Dict[str, int] = {}
+        for position, title in enumerate(self.required):
+            self.order.setdefault(normalize_header(title), position)
+
+        # Template sections with explanatory text are expected to be filled in;
+        # bare grouping headers ('Game Mechanics') may legitimately stay empty.
+        self.expects_content = set()
+        for title in self.required:
+            body = (template.extract(title) or "").split('\n')[1:]
+            if any(line.strip() and not line.lstrip().startswith('#') for line in body):
+                self.expects_content.add(normalize_header(title))
+
+        # Lines and 'Label: value' values copied verbatim from the template
+        self.placeholder_lines = set()
+        self.placeholder_values = set()
+        for line in template.content.split('\n'):
+            stripped = line.strip()
+            if not stripped or stripped.startswith('#'):
+                continue
+            label, separator, value = stripped.partition(':')
+            if separator and not normalize_header(value):
+                # Bare labels ('Design Pillar 1:') are fine as lead-ins to written content
+                continue
+            self.placeholder_lines.add(_normalize_line(stripped))
+            if separator:
+                self.placeholder_values.add(normalize_header(value))
+        self.placeholder_lines.discard('')
+
+    def _match(self, key: str, unmatched: Dict[str, int]) -> Optional[str]:
+        """Required section a header stands for: exact lookup, then containment either way."""
+        if not key:
+            return None
+        if key in self.order:
+            return key
+        for required_key in unmatched:
+            if required_key in key or key in required_key:
+                return required_key
+        return None
+
+    def validate(self, content: str, path: Optional[str] = None) -> ValidationResult:
+        result = ValidationResult(path=path, required_count=len(self.required))
+        headers = parse_headers(content)
+        sections = [header for header in headers if header.level == self.SECTION_LEVEL]
+        result.section_count = len(sections)
+
+        unmatched = dict(self.order)
+        found: Dict[str, DocumentHeader] = {}
+        # Required sections first from level-2 headers, then from any other level
+        for header in sections + [header for header in headers if header.level != self.SECTION_LEVEL]:
+            required_key = self._match(header.key, unmatched)
+            if required_key is None or required_key in found:
+                if header.level == self.SECTION_LEVEL and required_key is None:
+                    result.extra_sections.append(header.title)
+                continue
+            found[required_key] = header
+            unmatched.pop(required_key, None)
+
+        for title in self.required:
+            key = normalize_header(title)
+            header = found.get(key)
+            if header is None:
+                result.missing_sections.append(title)
+                continue
+            if header.level != self.SECTION_LEVEL:
+                result.level_issues.append(
+                    f"{title} (line {header.line}) is a level-{header.level} header, "
+                    f"template expects level {self.SECTION_LEVEL}"
+                )
+            if key in self.expects_content and not self._has_content(header, headers):
+                result.empty_sections.append(title)
+
+        result.out_of_order = self._out_of_order(found)
+        result.placeholders = self._find_placeholders(content)
+        return result
+
+    def validate_sections(self, sections: List[Tuple[str, str]], path: Optional[str] = None) -> ValidationResult:
+        """Validate a structured GDD from its (heading, content) sections, without parsing markdown."""
+        result = ValidationResult(path=path, required_count=len(self.required), section_count=len(sections))
+
+        unmatched = dict(self.order)
+        found: Dict[str, DocumentHeader] = {}
+        for index, (heading, content) in enumerate(sections):
+            key = normalize_header(heading)
+            required_key = self._match(key, unmatched)
+            if required_key is None:
+                result.extra_sections.append(heading)
+                continue
+            if required_key in found:
+                continue
+            found[required_key] = DocumentHeader(
+                self.SECTION_LEVEL, heading, key, line=index + 1, index=index, has_content=bool(content.strip())
+            )
+            unmatched.pop(required_key, None)
+
+        for title in self.required:
+            key = normalize_header(title)
+            header = found.get(key)
+            if header is None:
+                result.missing_sections.append(title)
+            elif key in self.expects_content and not header.has_content:
+                result.empty_sections.append(title)
+
+        result.out_of_order = self._out_of_order(found)
+        result.placeholders = self._find_placeholders("\n".join(content for _, content in sections))
+        return result
+
+    @staticmethod
+    def _has_content(header: DocumentHeader, headers: List[DocumentHeader]) -> bool:
+        """Text directly under the header or under any nested subheader."""
+        if header.has_content:
+            return True
+        for nested in headers[header.index + 1:]:
+            if nested.level <= header.level:
+                break
+            if nested.has_content:
+                return True
+        return False
+
+    def _out_of_order(self, found: Dict[str, DocumentHeader]) -> List[str]:
+        """Sections outside the longest run that already follows template order."""
+        ordered = sorted(found.items(), key=lambda item: item[1].line)
+        positions = [self.order[key] for key, _ in ordered]
+
+        # Longest increasing subsequence with predecessor links, O(n log n)
+        tails: List[int] = []
+        tail_indices: List[int] = []
+        previous = [-1] * len(positions)
+        for index, position in enumerate(positions):
+            slot = bisect.bisect_left(tails, position)
+            if slot == len(tails):
+                tails.append(position)
+                tail_indices.append(index)
+            else:
+                tails[slot] = position
+                tail_indices[slot] = index
+            previous[index] = tail_indices[slot - 1] if slot else -1
+
+        in_order = set()
+        index = tail_indices[-1] if tail_indices else -1
+        while index != -1:
+            in_order.add(index)
+            index = previous[index]
+
+        return [self.required[positions[index]] for index in range(len(positions)) if index not in in_order]
+
+    def _find_placeholders(self, content: str) -> List[str]:
+        placeholders = []
+        for line in content.split('\n'):
+            stripped = line.strip()
+            if not stripped or stripped.startswith('#'):
+                continue
+            label, separator, value = stripped.partition(':')
+            if _normalize_line(stripped) in self.placeholder_lines or (
+                separator and normalize_header(value) in self.placeholder_values
+            ):
+                placeholders.append(stripped)
+        return placeholders
+
+
+def _compile_validator(content: str) -> GDDValidator:
+    return GDDValidator(TemplateModel(content))
+
+
+def get_validator() -> GDDValidator:
+    """Shared validator, recompiled only when template.mdx changes on disk."""
+    template_path = resolve_knowledge_path(TEMPLATE_RELATIVE_PATH)
+    if template_path is None:
+        raise FileNotFoundError(
+            f"Template file not found at {TEMPLATE_RELATIVE_PATH} or alternative paths"
+        )
+    return knowledge_cache.get(template_path, _compile_validator, kind="validator")
+
+
+def find_documents(paths: Iterable[str], pattern: str = DEFAULT_PATTERN) -> List[str]:
+    """Files matching any of the comma-separated `pattern`s under the given files or directories, sorted."""
+    patterns = [part.strip() for part in pattern.split(',') if part.strip()]
+    documents = []
+    for path in paths:
+        if os.path.isfile(path):
+            documents.append(path)
+            continue
+        for root, _, files in os.walk(path):
+            documents.extend(os.path.join(root, name) for name in files
+                             if any(fnmatch(name, part) for part in patterns))
+    return sorted(set(documents))
+
+
+_worker_validator: Optional[GDDValidator] = None
+
+
+def _init_worker(template_content: str) -> None:
+    global _worker_validator
+    _worker_validator = _compile_validator(template_content)
+
+
+def _validate_chunk(paths: List[str]) -> List[ValidationResult]:
+    # Imported here: schemas.py loads crewAI, which markdown-only runs never need
+    from pydantic import ValidationError
+
+    from game_devs.schemas import GDD
+
+    results = []
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                content = file.read()
+        except (OSError, UnicodeDecodeError) as e:
+            results.append(ValidationResult(path=path, error=f"Cannot read document: {e}"))
+            continue
+        if not path.endswith('.json'):
+            results.append(_worker_validator.validate(content, path))
+            continue
+        # Structured GDDs are checked from their fields, not parsed as markdown
+        try:
+            document = GDD.model_validate_json(content)
+        except ValidationError as e:
+            error = f"Not a structured GDD: {e.error_count()} schema error(s)"
+            results.append(ValidationResult(path=path, error=error))
+            continue
+        results.append(_worker_validator.validate_sections(document.section_pairs(), path))
+    return results
+
+
+def validate_paths(
+    paths: Iterable[str],
+    pattern: str = DEFAULT_PATTERN,
+    workers: Optional[int] = None,
+) -> Tuple[List[ValidationResult], float]:
+    """Validate every matching document in parallel. Returns results in path order and elapsed seconds."""
+    start = time.perf_counter()
+    documents = find_documents(paths, pattern)
+    template_content = get_template_model().content
+    workers = max(1, workers or os.cpu_count() or 1)
+
+    if workers == 1 or len(documents) < 2 * workers:
+        _init_worker(template_content)
+        results = _validate_chunk(documents)
+    else:
+        # A few chunks per worker amortizes process hand-off without starving the pool
+        chunk_size = max(1, len(documents) // (workers * 4))
+        chunks = [documents[index:index + chunk_size] for index in range(0, len(documents), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(template_content,)) as executor:
+            results = [result for chunk in executor.map(_validate_chunk, chunks) for result in chunk]
+
+    return results, time.perf_counter() - start
+
+
+def summary_lines(results: List[ValidationResult], elapsed: float) -> List[str]:
+    """Console summary of a bulk validation run."""
+    valid = sum(1 for result in results if result.is_valid)
+    lines = [f"{'Document':<60} {'Status':<8} {'Missing':>7} {'Empty':>5} {'Placeh.':>7} {'Warn':>4}"]
+    for result in results:
+        status = "ERROR" if result.error else ("ok" if result.is_valid else "invalid")
+        lines.append(
+            f"{(result.path or '')[-60:]:<60} {status:<8} {len(result.missing_sections):>7} "
+            f"{len(result.empty_sections):>5} {len(result.placeholders):>7} {result.warning_count:>4}"
+        )
+
+    missing = Counter(section for result in results for section in result.missing_sections)
+    if missing:
+        lines.append("")
+        lines.append("Most frequently missing sections:")
+        lines.extend(f"  {count:>4} × {section}" for section, count in missing.most_common(5))
+
+    rate = len(results) / elapsed if elapsed > 0 else 0.0
+    lines.append("")
+    lines.append(f"{valid}/{len(results)} documents valid in {elapsed:.2f}s ({rate:.0f} docs/s)")
+    return lines
@@ -0,0 +1,135 @@
+"""
+Queue Worker for Distributed GDD Generation
+
+A worker process (`uv run queue work`) pulls game specs from the shared job
+queue (see job_queue.py) and runs the GameDevs crew for each, like a batch job
+(see batch.py) under `<output_root>/<job_id>`. Start as many workers as the
+rate limits allow, on as many hosts as share the queue database and the
+output root.
+
+While a crew runs, a heartbeat extends the job's lease every third of the
+visibility timeout. The job is acked when the crew completes, and failed
+(retried later, or given up after `max_attempts`) when it raises. If the
+worker dies, the lease runs out and another worker picks the job up. A worker
+stopped with Ctrl-C or SIGTERM hands its running jobs back to the queue
+before it exits.
+"""
+
+import asyncio
+import os
+import signal
+import threading
+from typing import Dict, Optional
+
+from game_devs.batch import BatchJobResult, BatchRunner
+from game_devs.job_queue import (
+    DEFAULT_RETRY_DELAY,
+    DEFAULT_VISIBILITY_TIMEOUT,
+    JobQueue,
+    QueuedJob,
+    worker_name,
+)
+
+
+class QueueWorker:
+    """Claims jobs from a JobQueue and runs up to `concurrency` crews at once."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        output_root: str = "outputs/queue/jobs",
+        concurrency: int = 1,
+        parallel: bool = False,
+        visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+        poll_interval: float = 5.0,
+        exit_when_empty: bool = False,
+    ):
+        if visibility_timeout <= 0 or poll_interval <= 0:
+            raise ValueError("visibility_timeout and poll_interval must be positive")
+        self.queue = queue
+        self.runner = BatchRunner([], concurrency, output_root, parallel)
+        self.visibility_timeout = visibility_timeout
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.exit_when_empty = exit_when_empty
+        self.name = worker_name()
+        self.completed = 0
+        self.failed = 0
+        self._active: Dict[str, QueuedJob] = {}
+        self._lock = threading.Lock()
+
+    def run(self) -> None:
+        """Blocking entry point; returns once the queue is drained with `exit_when_empty`."""
+        # Crew threads cannot be cancelled, and asyncio would wait for them on shutdown
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self._shutdown)
+        try:
+            asyncio.run(self.run_async())
+        finally:
+            self.runner.close()
+
+    def _shutdown(self, signum: int, frame: Optional[object]) -> None:
+        with self._lock:
+            jobs = list(self._active.values())
+        released = sum(self.queue.release(job) for job in jobs)
+        print(f"\n👋 Worker {self.name} stopping; {released} running job(s) handed back to the queue")
+        os._exit(128 + signum)
+
+    async def run_async(self) -> None:
+        semaphore = asyncio.Semaphore(self.runner.concurrency)
+        await asyncio.gather(*(self._slot(semaphore) for _ in range(self.runner.concurrency)))
+
+    async def _slot(self, semaphore: asyncio.Semaphore) -> None:
+        """Claim and run jobs one at a time until the queue is drained (or forever)."""
+        while True:
+            job = await asyncio.to_thread(self.queue.claim, self.name, self.visibility_timeout)
+            if job is None:
+                # Jobs waiting to retry keep the worker around; running ones may still fail back
+                counts = await asyncio.to_thread(self.queue.counts)
+                if self.exit_when_empty and not (counts["queued"] or counts["running"]):
+                    return
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self._process(semaphore, job)
+
+    async def _process(self, semaphore: asyncio.Semaphore, job: QueuedJob) -> None:
+        with self._lock:
+            self._active[job.job_id] = job
+        print(f"📥 [{job.job_id}] Claimed {job.game} (attempt {job.attempts}/{job.max_attempts})")
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        result = BatchJobResult(
+            job_id=job.job_id,
+            game=job.game,
+            output_dir=os.path.join(self.runner.output_root, job.job_id),
+        )
+        try:
+            await self.runner.run_job(semaphore, result, job.inputs)
+        finally:
+            heartbeat.cancel()
+            with self._lock:
+                self._active.pop(job.job_id, None)
+
+        if result.status == "completed":
+            acked = await asyncio.to_thread(self.queue.ack, job, result.duration)
+            self.completed += acked
+            outcome = "acked" if acked else None
+        else:
+            outcome = await asyncio.to_thread(
+                self.queue.fail, job, result.error or "unknown error", result.duration, self.retry_delay
+            )
+            self.failed += outcome == "failed"
+        if outcome is None:
+            print(f"⚠️  [{job.job_id}] Lease was lost to another worker; its outcome stands")
+        elif outcome == "queued":
+            print(f"🔁 [{job.job_id}] Will be retried "
+                  f"(attempt {job.attempts}/{job.max_attempts} failed: {result.error})")
+        elif outcome == "failed":
+            print(f"🛑 [{job.job_id}] Given up after {job.attempts} attempt(s); `queue retry` requeues it")
+
+    async def _heartbeat(self, job: QueuedJob) -> None:
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            if not await asyncio.to_thread(self.queue.heartbeat, job, self.visibility_timeout):
+                print(f"⚠️  [{job.job_id}] Lease lost (heartbeats too late); another worker may run it")
+                return
@@ -0,0 +1,35 @@
+"""Fixtures shared by the test modules."""
+
+import threading
+
+import pytest
+
+from game_devs.cache_stub import PromptCacheStub, make_server
+
+
+class RecordingStub(PromptCacheStub):
+    """The local Anthropic API stub, remembering the input tokens and breakpoints of each answered request."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.inputs = []
+        self.breakpoints = []
+        self.url = ""
+
+    def usage(self, request, output_tokens):
+        usage = super().usage(request, output_tokens)
+        self.inputs.append(usage["input_tokens"])
+        self.breakpoints.append(len(self._prefixes_of(request)[1]))
+        return usage
+
+
+@pytest.fixture
+def stub():
+    """A `RecordingStub` served on a free local port; point LLMs at `stub.url`."""
+    stub = RecordingStub()
+    server = make_server(stub, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield stub
+    server.shutdown()
+    server.server_close()
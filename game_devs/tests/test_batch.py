@@ -0,0 +1,49 @@
+"""Concurrency of batch jobs (see batch.py)."""
+
+import threading
+
+from game_devs.batch import BatchRunner
+
+
+class _FakeCrew:
+    def __init__(self, barrier: threading.Barrier):
+        self.barrier = barrier
+
+    def crew(self) -> "_FakeCrew":
+        return self
+
+    def kickoff(self, inputs):
+        # Only passes once every job of the batch is running at the same time
+        self.barrier.wait()
+
+    def release(self):
+        pass
+
+
+def test_runs_as_many_crews_at_once_as_the_concurrency(tmp_path):
+    concurrency = 40  # more than the default executor's min(32, cpus + 4) threads
+    barrier = threading.Barrier(concurrency, timeout=10)
+    built_on = []
+
+    def factory(output_dir):
+        built_on.append(threading.current_thread().name)
+        return _FakeCrew(barrier)
+
+    specs = [{"game": f"Game {number}"} for number in range(concurrency)]
+    results = BatchRunner(specs, concurrency, str(tmp_path), crew_factory=factory).run()
+
+    assert [result.status for result in results] == ["completed"] * concurrency
+    assert all(name.startswith("batch-job") for name in built_on)
+
+
+def test_failed_job_keeps_the_others_running(tmp_path):
+    def factory(output_dir):
+        if output_dir.endswith("broken"):
+            raise RuntimeError("no crew")
+        return _FakeCrew(threading.Barrier(1))
+
+    results = BatchRunner([{"game": "Fine"}, {"game": "Broken"}], 2, str(tmp_path), crew_factory=factory).run()
+
+    assert [result.status for result in results] == ["completed", "failed"]
+    assert results[1].error == "no crew"
+    assert (tmp_path / results[1].job_id / "error.log").is_file()
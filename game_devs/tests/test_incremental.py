@@ -0,0 +1,154 @@
+"""Incremental runs: task fingerprints, run plans and checkpoint reuse (see incremental.py)."""
+
+import json
+
+import pytest
+from crewai import Agent, Task
+from crewai.tasks.task_output import TaskOutput
+
+from game_devs.crew import GameDevs
+from game_devs.incremental import output_digest, plan_lines
+from game_devs.llm import GameDevsLLM
+from game_devs.main import get_roguelike_inputs
+from game_devs.options import MODEL_TIERS
+from game_devs.rate_limit import current_priority
+from game_devs.task import GameDevsTask
+
+TASKS = [
+    "pitch_concept_task", "pitch_review_task", "pitch_refinement_task",
+    "gameplay_mechanics_task", "gameplay_review_task", "gameplay_refinement_task",
+    "technical_implementation_task", "gdd_integration_task", "final_gdd_review_task", "final_polish_task",
+]
+# The tasks whose prompts mention {platform} and {scope} (tasks.yaml)
+PLATFORM_TASKS = ["pitch_concept_task", "gameplay_mechanics_task", "technical_implementation_task"]
+
+
+def _isolate(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LLM_CACHE", "off")
+    monkeypatch.setenv("DESIGN_MEMORY", "off")
+
+
+def _fingerprints(monkeypatch, tmp_path, production: str, routing: str):
+    monkeypatch.setenv("USE_PRODUCTION_MODELS", production)
+    monkeypatch.setenv("MODEL_ROUTING", routing)
+    crew = GameDevs(output_root=str(tmp_path / f"{production}-{routing}"))
+    crew.plan_run(get_roguelike_inputs())
+    return crew._fingerprints
+
+
+def test_model_change_changes_fingerprints(monkeypatch, tmp_path):
+    # Unrouted tasks start on their agent's own model, which must count too
+    _isolate(monkeypatch, tmp_path)
+    development = _fingerprints(monkeypatch, tmp_path, "false", "off")
+    production = _fingerprints(monkeypatch, tmp_path, "true", "off")
+
+    assert development.keys() == production.keys()
+    assert all(development[name] != production[name] for name in development)
+
+
+def test_unchanged_settings_keep_fingerprints(monkeypatch, tmp_path):
+    _isolate(monkeypatch, tmp_path)
+    first = _fingerprints(monkeypatch, tmp_path / "first", "false", "on")
+    second = _fingerprints(monkeypatch, tmp_path / "second", "false", "on")
+
+    assert first == second
+
+
+def _completed_run(output_root: str, inputs):
+    """A crew whose tasks all finished and were checkpointed, as after a full run."""
+    crew = GameDevs(output_root=output_root)
+    crew._inputs = dict(inputs)
+    crew.plan_run(inputs)
+    for crew_task in crew.crew().tasks:
+        crew_task.output = TaskOutput(
+            name=crew_task.name, description=crew_task.description, raw=f"Output of {crew_task.name}", agent="",
+        )
+        crew._checkpoint_task(crew_task, crew_task.output)
+    return crew
+
+
+def _actions(output_root: str, inputs):
+    plans = GameDevs(output_root=output_root).plan_run(inputs)
+    return {plan.task: plan.action for plan in plans}, plans
+
+
+def test_unchanged_inputs_reuse_every_task(monkeypatch, tmp_path):
+    _isolate(monkeypatch, tmp_path)
+    _completed_run(str(tmp_path), get_roguelike_inputs())
+
+    actions, plans = _actions(str(tmp_path), get_roguelike_inputs())
+
+    assert actions == {name: "reuse" for name in TASKS}
+    assert plan_lines(plans)[0] == "🗺️  Incremental plan: 0 to run, 0 to check, 10 to reuse"
+
+
+@pytest.mark.parametrize("name, value", [("platform", "Nintendo Switch"), ("scope", "Small scope - one biome")])
+def test_input_change_reruns_only_the_tasks_that_mention_it(monkeypatch, tmp_path, name, value):
+    _isolate(monkeypatch, tmp_path)
+    _completed_run(str(tmp_path), get_roguelike_inputs())
+
+    actions, plans = _actions(str(tmp_path), {**get_roguelike_inputs(), name: value})
+
+    assert [task for task in TASKS if actions[task] == "run"] == PLATFORM_TASKS
+    # The tasks downstream of them keep their outputs unless what they read comes out different
+    assert all(actions[task] == "check" for task in TASKS if task not in PLATFORM_TASKS)
+    assert plans[0].reasons == [f"{{{name}}} changed"]
+
+
+def test_tasks_upstream_of_a_changed_task_are_reused(monkeypatch, tmp_path):
+    _isolate(monkeypatch, tmp_path)
+    _completed_run(str(tmp_path), get_roguelike_inputs())
+    # As after an edit of the technical stage's tasks.yaml entry
+    path = tmp_path / "checkpoints" / "technical_implementation_task.json"
+    checkpoint = json.loads(path.read_text(encoding='utf-8'))
+    path.write_text(json.dumps({**checkpoint, "fingerprint": "stale"}), encoding='utf-8')
+
+    actions, plans = _actions(str(tmp_path), get_roguelike_inputs())
+
+    assert [actions[task] for task in TASKS] == ["reuse"] * 6 + ["run"] + ["check"] * 3
+    assert plan_lines(plans)[0] == "🗺️  Incremental plan: 1 to run, 3 to check, 6 to reuse"
+
+
+def test_checked_task_reuses_its_output_only_for_identical_upstream_outputs():
+    upstream = _task("pitch_concept_task")
+    upstream.output = TaskOutput(description="", raw="Same pitch", agent="")
+    checked = _task("pitch_review_task")
+    stored = {"raw": "Stored review", "upstream": {"pitch_concept_task": output_digest("Same pitch")}}
+
+    checked.track_upstream([upstream], stored)
+    assert checked._reuse_checkpoint().raw == "Stored review"
+
+    upstream.output = TaskOutput(description="", raw="Different pitch", agent="")
+    checked.track_upstream([upstream], stored)
+    assert checked._reuse_checkpoint() is None
+
+
+def _task(name: str, **kwargs) -> GameDevsTask:
+    agent = Agent(role="Pitch Writer", goal="Pitch", backstory="Writes pitches.",
+                  llm=GameDevsLLM(model=MODEL_TIERS["fast"]))
+    return GameDevsTask(name=name, description="Pitch it", expected_output="A pitch", agent=agent, **kwargs)
+
+
+def _async_task(reusable):
+    task = _task("pitch_concept_task", async_execution=True)
+    task.track_upstream([], reusable)
+    return task
+
+
+def test_async_task_reuses_its_checkpoint():
+    task = _async_task({"raw": "Stored pitch", "upstream": {}})
+
+    output = task.execute_async(task.agent).result(timeout=10)
+
+    assert output.raw == "Stored pitch"
+
+
+def test_async_task_runs_with_its_priority(monkeypatch):
+    task = _async_task(None)
+    task.set_priority((0, -10))
+    seen = []
+    monkeypatch.setattr(Task, "execute_sync", lambda self, **kwargs: seen.append(current_priority.get()) or "done")
+
+    assert task.execute_async(task.agent).result(timeout=10) == "done"
+    assert seen == [(0, -10)]
@@ -0,0 +1,40 @@
+"""Stitching fixes of map-reduce GDD integration (see integration.py)."""
+
+from game_devs.integration import MAX_REPLACEMENT_MATCHES, apply_replacements
+
+
+def test_replaces_a_specific_name_everywhere():
+    body = "## Story\n\nCaptain Vael leads.\n\n## Characters\n\nCaptain Vale, the hero."
+    fixed, applied, skipped = apply_replacements(body, [{"find": "Captain Vale", "replace": "Captain Vael"}])
+
+    assert fixed.count("Captain Vael") == 2
+    assert (applied, skipped) == (1, [])
+
+
+def test_skips_short_finds():
+    body = "The map has 30 zones and runs at 30 FPS."
+    fixed, applied, skipped = apply_replacements(body, [{"find": "30", "replace": "40"}])
+
+    assert fixed == body
+    assert applied == 0 and "shorter than" in skipped[0]
+
+
+def test_replaces_whole_words_only():
+    body = "Mana regenerates. Manage your Mana pool."
+    fixed, applied, _ = apply_replacements(body, [{"find": "Mana", "replace": "Aether"}])
+
+    assert fixed == "Aether regenerates. Manage your Aether pool."
+    assert applied == 1
+
+
+def test_skips_finds_with_too_many_matches():
+    body = " ".join(["enemy wave"] * (MAX_REPLACEMENT_MATCHES + 1))
+    fixed, applied, skipped = apply_replacements(body, [{"find": "enemy wave", "replace": "enemy horde"}])
+
+    assert fixed == body
+    assert applied == 0 and "matches" in skipped[0]
+
+
+def test_ignores_incomplete_edits():
+    body = "Nothing to fix here."
+    assert apply_replacements(body, [{"find": "Nothing"}, {"replace": "x"}]) == (body, 0, [])
@@ -0,0 +1,147 @@
+"""Leases, acks, failures and retries of the SQLite job queue (see job_queue.py and worker.py)."""
+
+import threading
+
+from game_devs.job_queue import JobQueue
+from game_devs.worker import QueueWorker
+
+
+def _queue(tmp_path) -> JobQueue:
+    return JobQueue(str(tmp_path / "jobs.db"))
+
+
+def _specs(count):
+    return [{"game": f"Game {number}"} for number in range(count)]
+
+
+def _job(queue, job_id):
+    return next(job for job in queue.jobs() if job.job_id == job_id)
+
+
+def test_two_workers_never_claim_the_same_job(tmp_path):
+    _queue(tmp_path).enqueue(_specs(40))
+    claimed, lock = [], threading.Lock()
+
+    def work(name):
+        # A connection of its own, as in a separate worker process
+        queue = _queue(tmp_path)
+        while (job := queue.claim(name)) is not None:
+            with lock:
+                claimed.append(job.job_id)
+
+    workers = [threading.Thread(target=work, args=(f"worker-{number}",)) for number in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert len(claimed) == 40
+    assert len(set(claimed)) == 40
+
+
+def test_expired_lease_is_requeued(tmp_path):
+    queue = _queue(tmp_path)
+    [job_id] = queue.enqueue(_specs(1), max_attempts=2)
+    queue.claim("dead-worker", visibility_timeout=0)
+
+    job = queue.claim("live-worker")
+
+    assert job.job_id == job_id
+    assert job.worker == "live-worker" and job.attempts == 2
+
+
+def test_expired_lease_fails_once_attempts_run_out(tmp_path):
+    queue = _queue(tmp_path)
+    [job_id] = queue.enqueue(_specs(1), max_attempts=1)
+    queue.claim("dead-worker", visibility_timeout=0)
+
+    assert queue.claim("live-worker") is None
+    job = _job(queue, job_id)
+    assert job.status == "failed" and "lease expired" in job.error
+
+
+def test_stale_token_cannot_ack_or_fail(tmp_path):
+    queue = _queue(tmp_path)
+    queue.enqueue(_specs(1), max_attempts=3)
+    stale = queue.claim("slow-worker", visibility_timeout=0)
+    current = queue.claim("other-worker")
+
+    assert queue.ack(stale, 1.0) is False
+    assert queue.fail(stale, "boom", retry_delay=0) is None
+    assert queue.heartbeat(stale) is False
+    assert queue.release(stale) is False
+    assert queue.ack(current, 1.0) is True
+    assert _job(queue, current.job_id).status == "completed"
+
+
+def test_failed_attempt_is_retried_until_max_attempts(tmp_path):
+    queue = _queue(tmp_path)
+    [job_id] = queue.enqueue(_specs(1), max_attempts=2)
+
+    assert queue.fail(queue.claim("worker"), "first", retry_delay=0) == "queued"
+    assert queue.fail(queue.claim("worker"), "second", retry_delay=0) == "failed"
+    assert queue.claim("worker") is None
+    job = _job(queue, job_id)
+    assert (job.status, job.attempts, job.error) == ("failed", 2, "second")
+
+
+def test_failed_attempt_waits_for_its_backoff(tmp_path):
+    queue = _queue(tmp_path)
+    queue.enqueue(_specs(1), max_attempts=3)
+
+    assert queue.fail(queue.claim("worker"), "boom", retry_delay=60) == "queued"
+    assert queue.claim("worker") is None
+
+
+def test_release_does_not_use_up_an_attempt(tmp_path):
+    queue = _queue(tmp_path)
+    [job_id] = queue.enqueue(_specs(1), max_attempts=1)
+
+    assert queue.release(queue.claim("stopping-worker")) is True
+    assert _job(queue, job_id).attempts == 0
+    job = queue.claim("next-worker")
+    assert job.job_id == job_id and job.attempts == 1
+
+
+def test_retry_resets_attempts(tmp_path):
+    queue = _queue(tmp_path)
+    first, second = queue.enqueue(_specs(2), max_attempts=1)
+    for _ in range(2):
+        queue.fail(queue.claim("worker"), "boom", retry_delay=0)
+
+    assert queue.retry([first]) == 1
+    job = _job(queue, first)
+    assert (job.status, job.attempts, job.error) == ("queued", 0, None)
+    assert _job(queue, second).status == "failed"
+    assert queue.retry() == 1
+    assert queue.counts() == {"queued": 2, "running": 0, "completed": 0, "failed": 0}
+
+
+class _FakeCrew:
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+
+    def crew(self):
+        return self
+
+    def kickoff(self, inputs):
+        if inputs["game"] == "Broken":
+            raise RuntimeError("crew failed")
+
+    def release(self):
+        pass
+
+
+def test_worker_acks_completed_jobs_and_fails_broken_ones(tmp_path):
+    queue = _queue(tmp_path)
+    queue.enqueue([{"game": "Fine"}, {"game": "Broken"}], max_attempts=1)
+    worker = QueueWorker(queue, output_root=str(tmp_path / "jobs"), concurrency=2,
+                         poll_interval=0.05, exit_when_empty=True)
+    worker.runner.crew_factory = _FakeCrew
+
+    worker.run()
+
+    jobs = {job.game: job for job in queue.jobs()}
+    assert jobs["Fine"].status == "completed"
+    assert jobs["Broken"].status == "failed" and jobs["Broken"].error == "crew failed"
+    assert (worker.completed, worker.failed) == (1, 1)
@@ -0,0 +1,55 @@
+"""Persistence of the knowledge index (see tools/knowledge_store.py)."""
+
+import json
+import os
+import pickle
+
+from game_devs.tools.knowledge_store import KnowledgeStore
+
+
+def _knowledge(tmp_path):
+    root = tmp_path / "knowledge"
+    (root / "genres").mkdir(parents=True)
+    (root / "genres" / "roguelike.md").write_text(
+        "# Roguelike\n\n## Permadeath\n\nEvery run ends for good.\n\n## Procedural Levels\n\nFloors change.\n",
+        encoding='utf-8',
+    )
+    (root / "notes.txt").write_text("Players loved the relic economy.\n\nKeep runs under an hour.", encoding='utf-8')
+    return str(root)
+
+
+def _search(store, query):
+    return [(hit.source, hit.header, round(hit.score, 6)) for hit in store.search(query, mode="keyword")]
+
+
+def test_index_is_saved_as_json_and_loaded_without_reparsing(tmp_path):
+    root, index_path = _knowledge(tmp_path), str(tmp_path / "cache" / "knowledge_index.json")
+    first = KnowledgeStore(root, index_path=index_path)
+    first.refresh(force=True)
+
+    with open(index_path, 'r', encoding='utf-8') as file:
+        saved = json.load(file)
+    assert sorted(entry["path"] for entry in saved["files"]) == ["genres/roguelike.md", "notes.txt"]
+
+    second = KnowledgeStore(root, index_path=index_path)
+    assert second.refresh(force=True) == {"added": 0, "updated": 0, "removed": 0, "unchanged": 2}
+    assert _search(second, '"every run" permadeath') == _search(first, '"every run" permadeath')
+    assert _search(second, "relic economy")[0][0] == "notes.txt"
+
+
+def test_index_files_are_never_unpickled(tmp_path):
+    root, index_path = _knowledge(tmp_path), str(tmp_path / "knowledge_index.json")
+    marker = tmp_path / "executed"
+
+    class Payload:
+        def __reduce__(self):
+            return (open, (str(marker), 'w'))
+
+    with open(index_path, 'wb') as file:
+        pickle.dump({"version": 2, "files": Payload()}, file)
+
+    store = KnowledgeStore(root, index_path=index_path)
+
+    assert not marker.exists()
+    assert store.refresh(force=True)["added"] == 2
+    assert os.path.exists(index_path)
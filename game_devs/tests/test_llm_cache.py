@@ -0,0 +1,100 @@
+"""Request keys and LRU eviction of the persistent response cache (see llm_cache.py)."""
+
+import itertools
+
+import pytest
+
+from game_devs import llm_cache
+from game_devs.llm import GameDevsLLM
+from game_devs.llm_cache import LLMResponseCache, request_key
+from game_devs.options import MODEL_TIERS
+
+PARAMS = {
+    "model": "anthropic/claude-3-5-haiku-20241022",
+    "temperature": 0.7,
+    "messages": [{"role": "system", "content": "You are a game designer."},
+                 {"role": "user", "content": "Name the core gameplay loop."}],
+}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """One second per call of time.time(), so access order never ties."""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(llm_cache.time, "time", lambda: float(next(ticks)))
+
+
+def test_key_is_stable_across_parameter_order():
+    reordered = dict(reversed(list(PARAMS.items())))
+
+    assert request_key(reordered) == request_key(PARAMS)
+    assert request_key(dict(PARAMS)) == request_key(PARAMS)
+
+
+def test_key_ignores_transport_parameters():
+    transport = {"api_key": "secret", "base_url": "http://127.0.0.1:8765", "timeout": 30, "stream": True}
+
+    assert request_key({**PARAMS, **transport}) == request_key(PARAMS)
+
+
+@pytest.mark.parametrize("change", [
+    {"model": "anthropic/claude-sonnet-4-20250514"},
+    {"temperature": 0.2},
+    {"messages": PARAMS["messages"][:1] + [{"role": "user", "content": "Name the win condition."}]},
+    {"max_tokens": 1024},
+])
+def test_key_changes_with_the_content(change):
+    assert request_key({**PARAMS, **change}) != request_key(PARAMS)
+
+
+def test_entries_are_evicted_least_recently_used(tmp_path, clock):
+    cache = LLMResponseCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.put("a", "first")
+    cache.put("b", "second")
+    assert cache.get("a") == "first"  # b is now the least recently used
+
+    cache.put("c", "third")
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("first", "third")
+    assert cache.stats()["entries"] == 2
+
+
+def test_entries_are_evicted_over_the_size_limit(tmp_path, clock):
+    cache = LLMResponseCache(str(tmp_path / "cache.db"), max_bytes=10)
+    cache.put("a", "12345")
+    cache.put("b", "12345")
+    cache.put("c", "123456")
+
+    assert cache.get("a") is None and cache.get("b") is None
+    assert cache.get("c") == "123456"
+    assert cache.stats()["size_bytes"] == 6
+
+
+def test_entries_survive_a_new_process(tmp_path):
+    LLMResponseCache(str(tmp_path / "cache.db")).put("a", "first")
+
+    cache = LLMResponseCache(str(tmp_path / "cache.db"))
+
+    assert cache.get("a") == "first"
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_bypass_skips_lookups_but_stores(tmp_path):
+    LLMResponseCache(str(tmp_path / "cache.db"), bypass=True).put("a", "fresh")
+
+    assert LLMResponseCache(str(tmp_path / "cache.db"), bypass=True).get("a") is None
+    assert LLMResponseCache(str(tmp_path / "cache.db")).get("a") == "fresh"
+
+
+def test_llm_answers_a_repeated_request_from_the_cache(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.db"))
+    # Nothing listens there: a call reaching the provider would fail
+    llm = GameDevsLLM(model=MODEL_TIERS["fast"], response_cache=cache, base_url="http://127.0.0.1:9", api_key="x")
+    messages = [{"role": "user", "content": "Name the core gameplay loop."}]
+    # Keyed without cache breakpoints or the endpoint
+    plain = GameDevsLLM(model=MODEL_TIERS["fast"], prompt_caching=False)
+    cache.put(request_key(plain._prepare_completion_params(messages)), "Explore, fight, loot.")
+
+    assert llm.call(messages) == "Explore, fight, loot."
+    assert cache.hits == 1
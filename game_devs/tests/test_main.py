@@ -0,0 +1,40 @@
+"""Command line options shared by the crew-running commands (see main.py)."""
+
+import argparse
+import os
+
+import pytest
+
+from game_devs.main import PIPELINE_TOGGLES, add_pipeline_flags, apply_pipeline_flags
+
+
+@pytest.fixture
+def clean_environment(monkeypatch):
+    # Registered first, so that monkeypatch restores whatever apply_pipeline_flags sets
+    for variable, _, _ in PIPELINE_TOGGLES.values():
+        monkeypatch.setenv(variable, "unset")
+    for variable in ("LLM_BACKEND", "RATE_LIMIT"):
+        monkeypatch.setenv(variable, "unset")
+
+
+def _parse(*argv):
+    parser = argparse.ArgumentParser()
+    add_pipeline_flags(parser)
+    return parser.parse_args(list(argv))
+
+
+def test_every_toggle_sets_its_environment_variable(clean_environment):
+    apply_pipeline_flags(_parse(*PIPELINE_TOGGLES, "--no-rate-limit"))
+
+    for variable, value, _ in PIPELINE_TOGGLES.values():
+        assert os.environ[variable] == value
+    assert os.environ["RATE_LIMIT"] == "off"
+    assert os.environ["LLM_BACKEND"] == "live"
+
+
+def test_flags_left_out_leave_the_environment_alone(clean_environment):
+    apply_pipeline_flags(_parse("--no-cache"))
+
+    assert os.environ["LLM_CACHE"] == "off"
+    assert os.environ["MODEL_ROUTING"] == "unset"
+    assert os.environ["DESIGN_MEMORY"] == "unset"
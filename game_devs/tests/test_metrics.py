@@ -0,0 +1,24 @@
+"""Per-task and per-agent run metrics (see metrics.py)."""
+
+from game_devs.crew import GameDevs
+
+
+def test_agents_are_summarized_by_their_config_name(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LLM_CACHE", "off")
+    monkeypatch.setenv("DESIGN_MEMORY", "off")
+    crew_base = GameDevs(output_root=str(tmp_path))
+    crew = crew_base.crew()
+    crew_base.metrics.start_run()
+    for crew_task in crew.tasks:
+        # As rendered with the inputs at kickoff
+        crew_task.agent.role = crew_task.agent.role.replace("{game}", "Casual RTS Commander")
+        crew_base.metrics.task_reused(crew_task)
+
+    agents = crew_base.metrics.by_agent()
+    lines = crew_base.metrics.summary_lines()
+
+    assert set(agents) == {"pitch_writer", "gameplay_designer", "technical_architect", "chief_editor"}
+    assert sum(totals["tasks"] for totals in agents.values()) == 10
+    assert not any("Casual RTS Commander" in line for line in lines)
+    assert any(line.startswith("  chief_editor ") for line in lines)
@@ -0,0 +1,66 @@
+"""Prompt cache breakpoints checked against the local Anthropic API stub (see prompt_cache.py, cache_stub.py)."""
+
+import pytest
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+
+from game_devs.llm import GameDevsLLM
+from game_devs.options import MODEL_TIERS
+from game_devs.prompt_cache import MAX_BREAKPOINTS, PromptCacheUsageEvent
+
+SYSTEM = "You are Dungeon Codex Pitch Writer. " + "Write vivid, specific game pitches. " * 40
+TASK = "Write the core pitch of Dungeon Codex, a roguelike for PC and mobile."
+
+
+@pytest.fixture
+def llm(stub, monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT", "off")
+    # Short test prompts still count as cacheable prefixes
+    stub.min_tokens = 100
+    return GameDevsLLM(model=MODEL_TIERS["fast"], base_url=stub.url, api_key="stub", prompt_caching=True)
+
+
+def _agent_loop(turns: int):
+    """Messages of an agent loop after `turns` tool calls."""
+    messages = [{"role": "system", "content": SYSTEM}, {"role": "user", "content": TASK}]
+    for turn in range(turns):
+        messages.append({"role": "assistant", "content": f"Thought: check the guide\nAction: Knowledge Search {turn}"})
+        messages.append({"role": "user", "content": f"Observation: design guide excerpt {turn}. " * 20})
+    return messages
+
+
+def test_agent_loop_reads_its_prefix_from_the_cache(llm, stub):
+    usage = []
+    with crewai_event_bus.scoped_handlers():
+        crewai_event_bus.on(PromptCacheUsageEvent)(lambda source, event: usage.append(event))
+        for turns in range(3):
+            llm.call(_agent_loop(turns))
+
+    assert stub.errors == []
+    assert stub.breakpoints == [1, 2, 2]
+    # The system prompt is written once, then every iteration reads the previous one's prefix
+    assert [event.cache_read_tokens > 0 for event in usage] == [False, True, True]
+    assert usage[0].cache_write_tokens > 0
+    assert usage[2].cache_read_tokens > usage[1].cache_read_tokens
+    assert stub.stats["hits"] == 2
+
+
+def test_marked_requests_stay_within_the_breakpoint_limit(llm, stub):
+    # Blocks that already carry breakpoints leave room for one more
+    marked = [
+        {"type": "text", "text": f"Part {part}. " * 30, "cache_control": {"type": "ephemeral"}} for part in range(3)
+    ]
+    messages = _agent_loop(1)
+    messages[1] = {"role": "user", "content": marked}
+
+    llm.call(messages)
+
+    assert stub.errors == []
+    assert stub.breakpoints == [MAX_BREAKPOINTS]
+
+
+def test_repeated_prompt_is_read_from_the_cache(llm, stub):
+    llm.call(_agent_loop(0))
+    llm.call(_agent_loop(0))
+
+    assert stub.errors == []
+    assert stub.stats["hits"] == 1 and stub.stats["read_tokens"] > 0
@@ -0,0 +1,119 @@
+"""Token buckets, priority queueing and 429 backoff of the shared rate limiter (see rate_limit.py)."""
+
+import threading
+import time
+
+import pytest
+
+from game_devs import llm as llm_module
+from game_devs.cache_stub import FINAL_ANSWER
+from game_devs.llm import GameDevsLLM
+from game_devs.options import MODEL_TIERS
+from game_devs.rate_limit import (
+    ModelBudget,
+    ModelLimiter,
+    RateLimiter,
+    TokenBucket,
+    critical_path_priorities,
+    parse_rate_limits,
+)
+
+UNLIMITED = ModelBudget(10 ** 6, 10 ** 9, 10 ** 9)
+
+
+def test_bucket_starts_full_and_refills_continuously():
+    bucket = TokenBucket(60, now=0.0)
+    assert bucket.wait_time(60, now=0.0) == 0
+
+    bucket.take(60, now=0.0)
+    assert bucket.wait_time(1, now=0.0) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now=0.5) == pytest.approx(0.5)
+    assert bucket.wait_time(1, now=1.0) == 0
+
+
+def test_bucket_caps_refill_and_carries_debt():
+    bucket = TokenBucket(60, now=0.0)
+    # More than the capacity waits for a full bucket, never forever
+    bucket.take(90, now=0.0)
+    assert bucket.wait_time(600, now=0.0) == pytest.approx(90.0)
+    bucket.take(-1000, now=0.0)
+    assert bucket.level == 60
+
+
+def test_limiter_waits_for_its_input_tokens():
+    limiter = ModelLimiter("claude-test", ModelBudget(1000, 6000, 10 ** 6))
+    # 5714 tokens plus the estimate's headroom reserve exactly the 6000 of the bucket
+    first = limiter.acquire(5714, 1)
+    assert first.input_tokens == 6000 and first.waited < 0.05
+
+    second = limiter.acquire(19, 1)
+    assert second.waited == pytest.approx(0.2, abs=0.1)
+    assert limiter.stats()["waited_calls"] == 1
+
+
+def test_back_off_pauses_every_call_of_the_model():
+    limiter = ModelLimiter("claude-test", UNLIMITED)
+    limiter.back_off(429, 0.2)
+
+    ticket = limiter.acquire(10, 1)
+
+    assert ticket.waited >= 0.15
+    stats = limiter.stats()
+    assert (stats["rate_limited"], stats["retries"]) == (1, 1)
+
+
+def test_waiting_calls_go_out_by_priority():
+    limiter = ModelLimiter("claude-test", UNLIMITED)
+    limiter.back_off(529, 0.3)
+    granted, threads = [], []
+    for priority in [(2, 0), (0, -3), (0, -1), (1, 0)]:
+        thread = threading.Thread(target=lambda p=priority: granted.append(limiter.acquire(10, 1, p).priority))
+        thread.start()
+        threads.append(thread)
+        # Arrive one after the other
+        while len(limiter._queue) < len(threads):
+            time.sleep(0.001)
+    for thread in threads:
+        thread.join()
+
+    assert granted == [(0, -3), (0, -1), (1, 0), (2, 0)]
+
+
+def test_critical_path_goes_first():
+    # a -> b -> d is the critical path; c has one unit of slack
+    priorities = critical_path_priorities({"a": [], "b": ["a"], "c": [], "d": ["b", "c"]})
+
+    assert priorities["a"] == (0, -3)
+    assert priorities["b"] == (0, -2)
+    assert priorities["c"] == (1, -2)
+    assert sorted(priorities, key=priorities.get) == ["a", "b", "d", "c"]
+
+
+def test_budgets_match_the_longest_pattern():
+    limiter = RateLimiter(parse_rate_limits("claude=50/40000/8000,claude-3-5-haiku=100/50000/10000"))
+
+    assert limiter.budget_for("anthropic/claude-3-5-haiku-20241022").requests == 100
+    assert limiter.budget_for("anthropic/claude-sonnet-4-20250514").requests == 50
+    assert limiter.for_model("openai/gpt-4o") is None
+    with pytest.raises(ValueError):
+        parse_rate_limits("claude=50/40000")
+
+
+def test_429_from_the_stub_is_retried_after_its_retry_after(stub, monkeypatch):
+    # Unpaced: the crew's limiter does not know the stub's limits, so the stub answers 429
+    rate_limiter = RateLimiter({"claude": UNLIMITED}, max_retries=2)
+    monkeypatch.setattr(llm_module, "get_rate_limiter", lambda: rate_limiter)
+    llm = GameDevsLLM(model=MODEL_TIERS["fast"], base_url=stub.url, api_key="stub", prompt_caching=False)
+    messages = [{"role": "user", "content": "Name the core gameplay loop."}]
+    llm.call(messages)
+    # Room for one more request, and a refill to the next within a second
+    stub.limits["input_tokens"] = 2 * stub.inputs[0] - 1
+
+    start = time.monotonic()
+    answers = [llm.call(messages), llm.call(messages)]
+
+    assert answers == [FINAL_ANSWER] * 2
+    assert stub.stats["rate_limited"] == 1
+    assert time.monotonic() - start >= 1.0  # the stub's retry-after, rounded up to a second
+    stats = rate_limiter.stats()[MODEL_TIERS["fast"]]
+    assert (stats["calls"], stats["rate_limited"], stats["retries"]) == (4, 1, 1)
@@ -0,0 +1,54 @@
+"""Per-task model routing and escalation (see routing.py)."""
+
+from crewai import Agent, Task
+from crewai.tasks.task_output import TaskOutput
+
+from game_devs.llm import GameDevsLLM
+from game_devs.options import MODEL_TIERS
+from game_devs.routing import ModelRouter
+
+
+def _routed_task():
+    agent = Agent(
+        role="Chief Editor",
+        goal="Integrate the GDD",
+        backstory="Edits game design documents.",
+        llm=GameDevsLLM(model=MODEL_TIERS["fast"]),
+    )
+    task = Task(name="gdd_integration_task", description="Write the GDD", expected_output="A GDD", agent=agent)
+    router = ModelRouter(enabled=True)
+    router.route(task, {"model_tier": "fast", "escalation_tier": "strong"})
+    return router, task
+
+
+def _incomplete_gdd(task):
+    return TaskOutput(description=task.description, agent=task.agent.role, raw="# GDD\n\n## Overview\n\nTODO")
+
+
+def test_escalates_once_to_the_escalation_tier():
+    router, task = _routed_task()
+    router.apply(task)
+    assert task.agent.llm.model == MODEL_TIERS["fast"]
+
+    passed, feedback = task.guardrail(_incomplete_gdd(task))
+    assert not passed and "template section" in feedback
+    task.retry_count += 1  # as crewAI does before retrying
+    router.apply(task)
+    assert task.agent.llm.model == MODEL_TIERS["strong"]
+
+    passed, _ = task.guardrail(_incomplete_gdd(task))
+    assert passed
+
+
+def test_next_kickoff_starts_on_the_task_tier_again():
+    router, task = _routed_task()
+    router.apply(task)
+    task.guardrail(_incomplete_gdd(task))
+    task.retry_count += 1
+    router.apply(task)
+    assert task.agent.llm.model == MODEL_TIERS["strong"]
+
+    router.start_run([task])
+    router.apply(task)
+    assert task.retry_count == 0
+    assert task.agent.llm.model == MODEL_TIERS["fast"]
@@ -0,0 +1,67 @@
+"""Dependency-graph scheduling (see scheduler.py)."""
+
+import pytest
+from crewai import Agent, Crew, Task
+from crewai.utilities.events import CrewKickoffFailedEvent
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+
+from game_devs.llm import GameDevsLLM
+from game_devs.options import MODEL_TIERS
+from game_devs.scheduler import CrewInternals, DependencyScheduler, ScheduleReport, execution_waves
+
+
+def test_waves_follow_the_context_edges():
+    graph = {"pitch": [], "mechanics": ["pitch"], "tech": ["pitch"], "gdd": ["mechanics", "tech"]}
+
+    assert execution_waves(graph) == [["pitch"], ["mechanics", "tech"], ["gdd"]]
+    with pytest.raises(ValueError):
+        execution_waves({"a": ["b"], "b": ["a"]})
+
+
+def test_report_labels_the_sequential_time_an_estimate():
+    report = ScheduleReport(wall_clock=6.0, task_durations={"a": 4.0, "b": 4.0}, waves=[["a", "b"]])
+
+    lines = report.summary_lines()
+
+    assert "  Sequential estimate (sum of task times): 8.0s" in lines
+    assert "  Estimated time saved: 2.0s (25%)" in lines
+
+
+def test_internals_are_checked_against_the_crewai_version():
+    assert CrewInternals.unsupported_reason() is None
+    assert "not one of the tested versions" in CrewInternals.unsupported_reason("0.140.0")
+
+
+def _failing_crew():
+    llm = GameDevsLLM(model=MODEL_TIERS["fast"])
+    agent = Agent(role="Pitch Writer", goal="Pitch", backstory="Writes pitches.", llm=llm)
+    task = Task(name="pitch_concept_task", description="Pitch it", expected_output="A pitch", agent=agent)
+    return Crew(agents=[agent], tasks=[task])
+
+
+def test_failed_run_emits_the_kickoff_failed_event(monkeypatch):
+    crew = _failing_crew()
+    monkeypatch.setattr(Task, "execute_sync", _raise)
+    failures = []
+    with crewai_event_bus.scoped_handlers():
+        crewai_event_bus.on(CrewKickoffFailedEvent)(lambda source, event: failures.append(event.error))
+
+        with pytest.raises(RuntimeError):
+            DependencyScheduler(crew).kickoff()
+
+    assert failures == ["crew failed"]
+
+
+def test_unsupported_crewai_falls_back_to_sequential_kickoff(monkeypatch):
+    crew = _failing_crew()
+    monkeypatch.setattr(CrewInternals, "unsupported_reason", classmethod(lambda cls: "crewAI 9.9 is too new"))
+    kicked_off = []
+    monkeypatch.setattr(Crew, "kickoff", lambda self, inputs=None: kicked_off.append(inputs) or "done")
+
+    with pytest.warns(UserWarning, match="running the tasks sequentially"):
+        assert DependencyScheduler(crew).kickoff({"game": "Dungeon Codex"}) == "done"
+    assert kicked_off == [{"game": "Dungeon Codex"}]
+
+
+def _raise(*args, **kwargs):
+    raise RuntimeError("crew failed")
@@ -0,0 +1,101 @@
+"""Parsing and repair of structured stage outputs (see schemas.py)."""
+
+from crewai.utilities.converter import ConverterError
+
+from game_devs.schemas import GDD, GDDSection, Pitch, StructuredConverter, parse_output
+
+PITCH = {
+    "core_pitch": "Delve, die, learn.", "hook": "Every death rewrites the codex.",
+    "target_audience": "Roguelike fans", "platform_strategy": ["PC first"],
+    "design_pillars": [{"name": "Mastery", "description": "Skill over stats"}],
+    "objectives_and_win_lose_conditions": "Reach floor 20.",
+}
+
+
+def test_gdd_from_markdown_splits_title_summary_and_sections():
+    gdd = GDD.from_markdown(
+        "# Dungeon Codex GDD\n\n## Executive Summary\n\nA roguelike.\n\n"
+        "## Core Concept\n\nDelve and die.\n\n## Key Systems\n\nRelics.\n"
+    )
+
+    assert gdd.title == "Dungeon Codex GDD"
+    assert gdd.executive_summary == "A roguelike."
+    assert gdd.section_pairs() == [("Core Concept", "Delve and die."), ("Key Systems", "Relics.")]
+
+
+def test_gdd_from_markdown_keeps_headings_in_code_fences():
+    gdd = GDD.from_markdown(
+        "# Dungeon Codex\n\n## Key Systems\n\n```markdown\n# Save file\n## Slots\n```\nThree slots.\n"
+    )
+
+    assert gdd.title == "Dungeon Codex"
+    assert gdd.section_pairs() == [("Key Systems", "```markdown\n# Save file\n## Slots\n```\nThree slots.")]
+
+
+def test_gdd_from_markdown_without_title():
+    gdd = GDD.from_markdown("## Core Concept\n\nDelve.\n")
+
+    assert gdd.title == "Game Design Document"
+    assert gdd.executive_summary == ""
+
+
+def test_repeated_heading_is_stripped_from_the_section_body():
+    assert GDDSection(heading="Key Systems", content="## Key Systems\n\nRelics.").content == "Relics."
+    assert GDDSection(heading="Key Systems", content="### key systems:\nRelics.").content == "Relics."
+    # Another heading is part of the body
+    assert GDDSection(heading="Key Systems", content="### Combat\nTurns.").content == "### Combat\nTurns."
+
+
+def test_markdown_round_trip():
+    gdd = GDD.from_markdown("# Dungeon Codex\n\n## Executive Summary\n\nA roguelike.\n\n## Core Concept\n\nDelve.\n")
+
+    assert GDD.from_markdown(gdd.to_markdown()) == gdd
+
+
+def test_parse_output_finds_the_json_object_in_chatter():
+    text = "Here is the pitch:\n```json\n" + Pitch(**PITCH).model_dump_json() + "\n```\nHope it helps!"
+
+    assert parse_output(Pitch, text) == Pitch(**PITCH)
+    assert parse_output(Pitch, "No JSON at all") is None
+    assert parse_output(Pitch, '{"core_pitch": "Only one field"}') is None
+
+
+class _RepairLLM:
+    def __init__(self, answer):
+        self.answer = answer
+        self.calls = []
+
+    def call(self, messages):
+        self.calls.append(messages)
+        if isinstance(self.answer, Exception):
+            raise self.answer
+        return self.answer
+
+
+def _converter(llm):
+    return StructuredConverter(llm=llm, text="pitch: delve, die", model=Pitch, instructions="Answer as JSON.")
+
+
+def test_repair_call_parses_the_repaired_answer():
+    llm = _RepairLLM(Pitch(**PITCH).model_dump_json())
+
+    assert _converter(llm).to_pydantic() == Pitch(**PITCH)
+    assert llm.calls == [[{"role": "system", "content": "Answer as JSON."},
+                          {"role": "user", "content": "pitch: delve, die"}]]
+
+
+def test_repair_answer_that_still_fails_to_parse_is_a_converter_error():
+    llm = _RepairLLM('{"core_pitch": "still incomplete"}')
+
+    result = _converter(llm).to_pydantic()
+
+    assert isinstance(result, ConverterError)
+    assert "could not be repaired into a Pitch" in str(result)
+    assert len(llm.calls) == 1
+
+
+def test_failed_repair_call_is_a_converter_error():
+    result = _converter(_RepairLLM(RuntimeError("overloaded"))).to_pydantic()
+
+    assert isinstance(result, ConverterError)
+    assert "overloaded" in str(result)
@@ -0,0 +1,106 @@
+"""Stemming, phrase queries and BM25 ranking of the knowledge search index (see tools/search_index.py)."""
+
+import pytest
+
+from game_devs.tools.search_index import SearchIndex, parse_query, split_markdown_sections, stem, tokenize
+
+GUIDE = """# Design Guide
+
+## Core Gameplay Loop
+
+Describe what the player repeats every session: explore, fight, collect loot.
+
+## Combat Systems
+
+Combat should reward positioning. The gameplay loop of a fight is short.
+
+## Level Design
+
+Levels teach mechanics one at a time. Loop back to earlier areas with new abilities.
+
+## Monetization
+
+Premium games avoid loot boxes; the core loop must not depend on purchases.
+"""
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("mechanics", "mechanic"),
+    ("designing", "design"),
+    ("running", "run"),
+    ("planned", "plan"),
+    ("games", "gam"),
+    ("game", "gam"),
+    ("abilities", "ability"),
+    ("optimization", "optimiz"),
+    ("class", "class"),
+    ("status", "status"),
+    ("analysis", "analysis"),
+    ("fall", "fall"),
+    ("2048", "2048"),
+    ("bus", "bus"),
+])
+def test_stemmer(word, expected):
+    assert stem(word) == expected
+
+
+def test_related_forms_share_a_stem():
+    assert stem("mechanics") == stem("mechanic")
+    assert stem("designing") == stem("designed") == stem("design")
+    assert stem("games") == stem("game")
+
+
+def test_tokenize_drops_stop_words_unless_asked_not_to():
+    assert tokenize("The Core Loop of the Game") == ["cor", "loop", "gam"]
+    assert tokenize("the loop", drop_stop_words=False) == ["the", "loop"]
+
+
+def test_quoted_phrases_are_parsed_apart_from_terms():
+    terms, phrases = parse_query('combat "gameplay loop" for beginners')
+
+    assert phrases == [["gameplay", "loop"]]
+    assert terms == ["combat", "begin", "gameplay", "loop"]
+    # A query of stop words only still searches for them
+    assert parse_query("what is it") == (["what", "is", "it"], [])
+
+
+def test_phrase_must_appear_as_consecutive_words():
+    index = SearchIndex.from_markdown(GUIDE)
+    headers = [header for header, _ in index.sections]
+
+    found = [headers[doc_id] for _, doc_id in index.search('"gameplay loop"', top_k=10)]
+
+    assert found == ["## Core Gameplay Loop", "## Combat Systems"]
+    # Both words, but never next to each other
+    assert "## Level Design" not in found
+
+
+def test_header_words_outrank_body_mentions():
+    index = SearchIndex.from_markdown(GUIDE)
+
+    score, doc_id = index.search("combat", top_k=1)[0]
+
+    assert index.sections[doc_id][0] == "## Combat Systems"
+    assert score > 0
+
+
+def test_bm25_prefers_sections_where_the_term_is_denser():
+    index = SearchIndex([
+        ("## Short", "Loot drops."),
+        ("## Long", "Loot drops. " + "Other words about quests and maps. " * 20),
+    ])
+
+    assert [doc_id for _, doc_id in index.search("loot")] == [0, 1]
+
+
+def test_unknown_terms_find_nothing():
+    index = SearchIndex.from_markdown(GUIDE)
+
+    assert index.search("spaceship") == []
+    assert index.search('"loot level"') == []
+
+
+def test_markdown_splits_at_every_header():
+    sections = split_markdown_sections("Intro\n# Title\nBody\n### Nested\nMore")
+
+    assert sections == [("", "Intro"), ("# Title", "Body"), ("### Nested", "More")]
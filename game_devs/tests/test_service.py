@@ -0,0 +1,77 @@
+"""Job bookkeeping of the GDD service (see service.py)."""
+
+import gc
+import time
+import weakref
+from types import SimpleNamespace
+
+from game_devs import service as service_module
+from game_devs.crew import GameDevs
+from game_devs.service import GDDService
+
+
+class _FakeCrew:
+    released = []
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.stream = False
+        self.tasks = [SimpleNamespace(name="pitch_concept_task", output_file=None)]
+        self.metrics = SimpleNamespace(records=[])
+
+    def crew(self):
+        return self
+
+    def kickoff(self, inputs):
+        self.metrics.records = [SimpleNamespace(
+            task="pitch_concept_task", status="completed", duration=1.0, llm_calls=2, cost=0.01,
+        )]
+
+    def release(self):
+        _FakeCrew.released.append(self.output_dir)
+
+
+def _wait(jobs):
+    deadline = time.monotonic() + 10
+    while not all(job.finished and job.finished_at for job in jobs) and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def test_finished_jobs_keep_metrics_release_crews_and_expire(monkeypatch, tmp_path):
+    monkeypatch.setattr(service_module, "GameDevs", _FakeCrew)
+    monkeypatch.setattr(service_module, "get_knowledge_store", lambda: None)
+    _FakeCrew.released = []
+    service = GDDService(lambda spec: dict(spec), concurrency=2, output_root=str(tmp_path), max_finished=2)
+    service.start()
+    try:
+        jobs = [service.submit({"game": f"Game {number}"}) for number in range(3)]
+        _wait(jobs)
+    finally:
+        service.stop()
+
+    assert [job.status for job in jobs] == ["completed"] * 3
+    assert service._crews == {}
+    assert len(_FakeCrew.released) == 4  # the warm-up crew and one per job
+    assert len(service.jobs) == 2 and jobs[0].job_id not in service.jobs
+    snapshot = service.snapshot(jobs[2])
+    assert snapshot["tasks"][0]["status"] == "completed"
+    assert snapshot["progress"] == {"done": 1, "total": 1, "running": []}
+
+
+def test_released_crew_is_garbage_collected(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LLM_CACHE", "off")
+    monkeypatch.setenv("DESIGN_MEMORY", "off")
+    monkeypatch.setenv("LLM_STREAM", "true")
+
+    def build_and_release():
+        # In a frame of its own, so that no local variable of the test keeps the crew alive
+        crew_base = GameDevs(str(tmp_path / "job"))
+        crew_base.crew()
+        crew_base.release()
+        return weakref.ref(crew_base)
+
+    reference = build_and_release()
+    gc.collect()
+
+    assert reference() is None
@@ -0,0 +1,177 @@
+"""GDD template validation (see validation.py)."""
+
+from game_devs.schemas import GDD, GDDSection
+from game_devs.tools.knowledge import TemplateModel, get_template_model
+from game_devs.validation import GDDValidator, find_documents, parse_headers, validate_paths
+
+TEMPLATE = """# GDD Template
+
+## Core Concept
+
+- Game Title: Enter the name of your game
+- Genre: Specify the genre
+
+## Design Pillars
+
+List up to five key elements that define your game's experience.
+
+Design Pillar 1:
+
+## Game Mechanics
+
+## Key Systems
+
+Outline the core gameplay systems.
+
+## Development Timeline
+
+Outline the rough development milestones.
+"""
+
+
+def _validator() -> GDDValidator:
+    return GDDValidator(TemplateModel(TEMPLATE))
+
+
+def _document(*sections: str) -> str:
+    return "# Dungeon Codex\n\n" + "\n\n".join(sections) + "\n"
+
+
+COMPLETE = [
+    "## Core Concept\n\n- Game Title: Dungeon Codex\n- Genre: Roguelike",
+    "## Design Pillars\n\nDesign Pillar 1: Every run tells a story.",
+    "## Game Mechanics",
+    "## Key Systems\n\nProcedural floors, permadeath and a relic economy.",
+    "## Development Timeline\n\nPrototype in month 3, release in month 12.",
+]
+
+
+def test_complete_document_is_valid():
+    result = _validator().validate(_document(*COMPLETE))
+
+    assert result.is_valid and result.warning_count == 0
+    assert (result.required_count, result.section_count) == (5, 5)
+
+
+def test_headers_in_code_blocks_are_content_not_sections():
+    headers = parse_headers("## Key Systems\n\n```python\n# not a header\n```\n## Development Timeline\n")
+
+    assert [header.title for header in headers] == ["Key Systems", "Development Timeline"]
+    assert headers[0].has_content and not headers[1].has_content
+
+
+def test_headers_match_exactly_or_by_containment():
+    validator = _validator()
+    unmatched = dict(validator.order)
+
+    assert validator._match("key systems", unmatched) == "key systems"
+    assert validator._match("core concept and vision", unmatched) == "core concept"
+    assert validator._match("timeline", unmatched) == "development timeline"
+    assert validator._match("monetization", unmatched) is None
+    assert validator._match("", unmatched) is None
+
+
+def test_missing_and_extra_sections():
+    sections = [section for section in COMPLETE if not section.startswith("## Key Systems")]
+    result = _validator().validate(_document(*sections, "## Monetization\n\nPremium, no ads."))
+
+    assert result.missing_sections == ["Key Systems"]
+    assert result.extra_sections == ["Monetization"]
+    assert not result.is_valid
+
+
+def test_required_section_at_the_wrong_level_is_a_warning():
+    sections = [section.replace("## Key Systems", "### Key Systems") for section in COMPLETE]
+    result = _validator().validate(_document(*sections))
+
+    assert result.is_valid and not result.missing_sections
+    assert result.level_issues == ["Key Systems (line 14) is a level-3 header, template expects level 2"]
+
+
+def test_sections_the_template_asks_to_fill_in_must_not_be_empty():
+    sections = [section.split("\n\n")[0] if "Key Systems" in section else section for section in COMPLETE]
+    result = _validator().validate(_document(*sections))
+
+    # 'Game Mechanics' is a bare grouping header in the template and may stay empty
+    assert result.empty_sections == ["Key Systems"]
+
+
+def test_content_under_a_subsection_fills_its_section():
+    sections = [
+        "## Key Systems\n\n### Combat\n\nTurn-based, on a grid." if "Key Systems" in section else section
+        for section in COMPLETE
+    ]
+
+    assert _validator().validate(_document(*sections)).is_valid
+
+
+def test_template_placeholders_left_in_are_reported():
+    sections = [section.replace("- Genre: Roguelike", "- Genre: Specify the genre") for section in COMPLETE]
+    sections[3] = "## Key Systems\n\nOutline the core gameplay systems."
+    result = _validator().validate(_document(*sections))
+
+    assert result.placeholders == ["- Genre: Specify the genre", "Outline the core gameplay systems."]
+    # Bare labels from the template are lead-ins to written content
+    assert "Design Pillar 1: Every run tells a story." not in result.placeholders
+
+
+def test_only_sections_outside_the_longest_ordered_run_are_out_of_order():
+    core, pillars, mechanics, systems, timeline = COMPLETE
+    result = _validator().validate(_document(systems, core, pillars, mechanics, timeline))
+
+    assert result.out_of_order == ["Key Systems"]
+    assert result.is_valid
+
+
+def test_structured_sections_get_the_same_checks():
+    result = _validator().validate_sections([
+        ("Core Concept", "Game Title: Dungeon Codex"),
+        ("Design Pillars", "Every run tells a story."),
+        ("Key Systems", ""),
+        ("Development Timeline", "Outline the rough development milestones."),
+    ])
+
+    assert result.empty_sections == ["Key Systems"]
+    assert result.placeholders == ["Outline the rough development milestones."]
+    assert result.missing_sections == ["Game Mechanics"]
+
+
+def _complete_gdd() -> GDD:
+    sections = [
+        GDDSection(heading=name, content=f"What {name} means for Dungeon Codex.")
+        for name in get_template_model().section_names
+    ]
+    return GDD(title="Dungeon Codex", executive_summary="A roguelike.", sections=sections)
+
+
+def test_structured_gdd_is_validated_from_its_sections(tmp_path):
+    gdd = _complete_gdd()
+    (tmp_path / "Dungeon_Codex_complete_gdd.json").write_text(gdd.model_dump_json(), encoding='utf-8')
+    (tmp_path / "Dungeon_Codex_complete_gdd.md").write_text(gdd.to_markdown(), encoding='utf-8')
+    incomplete = gdd.model_copy(update={"sections": gdd.sections[1:]})
+    (tmp_path / "Broken_complete_gdd.json").write_text(incomplete.model_dump_json(), encoding='utf-8')
+
+    results, _ = validate_paths([str(tmp_path)], workers=1)
+
+    by_name = {result.path.split('/')[-1]: result for result in results}
+    assert by_name["Dungeon_Codex_complete_gdd.json"].is_valid
+    assert by_name["Dungeon_Codex_complete_gdd.md"].is_valid
+    assert by_name["Broken_complete_gdd.json"].missing_sections == ["Core Concept"]
+
+
+def test_json_that_is_not_a_gdd_is_an_error(tmp_path):
+    path = tmp_path / "notes_gdd.json"
+    path.write_text('{"title": "Dungeon Codex"}', encoding='utf-8')
+
+    [result] = validate_paths([str(path)], workers=1)[0]
+
+    assert not result.is_valid and result.error.startswith("Not a structured GDD")
+
+
+def test_default_pattern_finds_markdown_and_json_gdds(tmp_path):
+    for name in ["a_gdd.md", "b_gdd.json", "c_gdd.md.partial", "metrics.json"]:
+        (tmp_path / name).write_text("", encoding='utf-8')
+
+    found = [path.split('/')[-1] for path in find_documents([str(tmp_path)])]
+
+    assert found == ["a_gdd.md", "b_gdd.json"]